@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+
+"""
+This script benchmarks the startup time of `simmate workflows` commands, which
+is paid on every compute node when a workflow is started from the command line.
+Each command is run in a new python process, and we compare the following:
+    - the first call, where the workflow registry manifest is built (and every
+      app's workflows are imported)
+    - later calls, where the saved manifest is used and only the app for the
+      requested workflow is imported
+
+To see which modules a command imports (and how long each takes), run it
+with `python -X importtime`.
+
+Note, the `simmate` command may not be on your path in a development install,
+so we call the typer app directly.
+"""
+
+import shutil
+import subprocess
+import sys
+from timeit import default_timer as time
+
+import pandas
+
+from simmate.workflows.utilities import WORKFLOW_REGISTRY_DIRECTORY
+
+# the number total trials to run for each command
+ntrials = 5
+
+commands = {
+    "--help": ["--help"],
+    "list-all": ["workflows", "list-all"],
+    "show-config": ["workflows", "show-config", "static-energy.vasp.matproj"],
+    "bader show-config": [
+        "workflows",
+        "show-config",
+        "population-analysis.bader.bader",
+    ],
+}
+
+script = (
+    "from simmate.command_line.base_command import simmate_app;"
+    "simmate_app(prog_name='simmate')"
+)
+
+
+def run_command(arguments):
+    start = time()
+    subprocess.run(
+        [sys.executable, "-c", script, *arguments],
+        check=True,
+        capture_output=True,
+    )
+    stop = time()
+    return stop - start
+
+
+all_results = []
+for name, arguments in commands.items():
+
+    cold_times = []
+    warm_times = []
+    for _ in range(ntrials):
+        # remove the saved manifest so that it must be rebuilt
+        shutil.rmtree(WORKFLOW_REGISTRY_DIRECTORY, ignore_errors=True)
+        cold_times.append(run_command(arguments))
+        warm_times.append(run_command(arguments))
+
+    all_results.append(
+        {
+            "command": name,
+            "first call": sum(cold_times) / ntrials,
+            "with manifest": sum(warm_times) / ntrials,
+        }
+    )
+
+# ----------------------------------------------------------------------------
+
+# PRINT RESULTS (average seconds per command)
+
+dataframe = pandas.DataFrame(all_results).set_index("command")
+print(dataframe.to_string())
+
+# ----------------------------------------------------------------------------
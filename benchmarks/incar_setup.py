@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+
+"""
+This script benchmarks writing INCAR files for many structures, which is the
+main cost of `VaspWorkflow.setup` (aside from the POTCAR) during high-throughput
+screening. We use the settings from `relaxation.vasp.matproj`, which include
+the slowest keyword modifiers (smart_ldau, smart_magmom, and smart_ismear),
+and compare the following:
+    - evaluating INCARs for 10k unique structures (every write is a cache miss)
+    - rewriting the INCAR for each of those structures (e.g. after a correction
+      from an error handler), where evaluated modifiers are loaded from cache
+    - the same rewrite with the cache disabled
+    - reading each INCAR back in with `Incar.from_file`
+"""
+
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from timeit import default_timer as time
+
+from simmate.calculators.vasp.inputs import Incar
+from simmate.toolkit import Structure
+from simmate.calculators.vasp.workflows.relaxation.matproj import (
+    Relaxation__Vasp__Matproj as workflow,
+)
+
+# the number of unique structures to write INCARs for
+nstructures = 10_000
+
+# build a list of unique structures by slightly perturbing a Fe2O3 supercell
+base_structure = Structure(
+    lattice=[[5.04, 0, 0], [-2.52, 4.36, 0], [0, 0, 13.75]],
+    species=["Fe", "Fe", "O", "O", "O"],
+    coords=[
+        [0, 0, 0.355],
+        [0, 0, 0.145],
+        [0.306, 0, 0.25],
+        [0, 0.306, 0.25],
+        [0.694, 0.694, 0.25],
+    ],
+)
+structures = []
+for _ in range(nstructures):
+    structure = base_structure.copy()
+    structure.perturb(0.01)
+    structures.append(structure)
+
+incar = Incar(**workflow.incar)
+
+
+def run_trials():
+    start = time()
+    for structure in structures:
+        incar.to_evaluated_str(structure)
+    stop = time()
+    return stop - start
+
+
+# ----------------------------------------------------------------------------
+
+Incar.evaluation_cache_size = nstructures
+Incar._evaluation_cache.clear()
+
+cold_time = run_trials()
+cached_time = run_trials()
+
+Incar.evaluation_cache_size = 0
+Incar._evaluation_cache.clear()
+uncached_time = run_trials()
+
+# ----------------------------------------------------------------------------
+
+with TemporaryDirectory() as directory:
+    filename = Path(directory) / "INCAR"
+    incar.to_file(filename, structures[0])
+    start = time()
+    for _ in range(nstructures):
+        Incar.from_file(filename)
+    stop = time()
+    parse_time = stop - start
+
+# ----------------------------------------------------------------------------
+
+print(f"INCAR setup for {nstructures} structures (seconds)")
+print(f"    first write:               {cold_time:.2f}")
+print(f"    rewrite (cached):          {cached_time:.2f}")
+print(f"    rewrite (cache disabled):  {uncached_time:.2f}")
+print(f"    from_file:                 {parse_time:.2f}")
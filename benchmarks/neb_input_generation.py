@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+
+"""
+This script benchmarks generating NEB inputs (the IDPP-relaxed images of every
+distinct pathway) with `MigrationImages.from_structure`, which is the first
+step when screening Li/Na conductors. We compare the following over a set of
+battery-material structures:
+    - the original implementation, which finds the supercell matrix again for
+      every hop and converts each hop serially
+    - the serial mode, which shares the supercell matrix between hops
+    - the parallel mode, which streams hops back from a Dask process pool
+
+Note, the Dask process pool requires the `__main__` guard below.
+"""
+
+from timeit import default_timer as time
+
+import pandas
+from pymatgen.analysis.diffusion.neb.pathfinder import DistinctPathFinder
+
+from simmate.configuration.dask import get_dask_client
+from simmate.toolkit import Structure
+from simmate.toolkit.diffusion import MigrationImages
+
+# settings passed to every conversion. These are smaller than the defaults
+# so that the benchmark finishes in a few minutes.
+kwargs = dict(min_nsites=40, max_nsites=120, min_length=8)
+
+structures = {
+    "LiCoO2": Structure(
+        lattice=[[2.82, 0, 0], [-1.41, 2.44, 0], [0, 0, 14.05]],
+        species=["Li"] * 3 + ["Co"] * 3 + ["O"] * 6,
+        coords=[
+            [0, 0, 0],
+            [2 / 3, 1 / 3, 1 / 3],
+            [1 / 3, 2 / 3, 2 / 3],
+            [0, 0, 0.5],
+            [2 / 3, 1 / 3, 5 / 6],
+            [1 / 3, 2 / 3, 1 / 6],
+            [0, 0, 0.24],
+            [0, 0, 0.76],
+            [2 / 3, 1 / 3, 0.573],
+            [2 / 3, 1 / 3, 0.093],
+            [1 / 3, 2 / 3, 0.907],
+            [1 / 3, 2 / 3, 0.427],
+        ],
+    ),
+    "Li2O": Structure(
+        lattice=[[4.61, 0, 0], [0, 4.61, 0], [0, 0, 4.61]],
+        species=["Li"] * 8 + ["O"] * 4,
+        coords=[
+            [x, y, z] for x in [0.25, 0.75] for y in [0.25, 0.75] for z in [0.25, 0.75]
+        ]
+        + [[0, 0, 0], [0.5, 0.5, 0], [0.5, 0, 0.5], [0, 0.5, 0.5]],
+    ),
+    "NaCl": Structure(
+        lattice=[[5.69, 0, 0], [0, 5.69, 0], [0, 0, 5.69]],
+        species=["Na"] * 4 + ["Cl"] * 4,
+        coords=[
+            [0, 0, 0],
+            [0.5, 0.5, 0],
+            [0.5, 0, 0.5],
+            [0, 0.5, 0.5],
+            [0.5, 0, 0],
+            [0, 0.5, 0],
+            [0, 0, 0.5],
+            [0.5, 0.5, 0.5],
+        ],
+    ),
+    "Na2O": Structure(
+        lattice=[[5.55, 0, 0], [0, 5.55, 0], [0, 0, 5.55]],
+        species=["Na"] * 8 + ["O"] * 4,
+        coords=[
+            [x, y, z] for x in [0.25, 0.75] for y in [0.25, 0.75] for z in [0.25, 0.75]
+        ]
+        + [[0, 0, 0], [0.5, 0.5, 0], [0.5, 0, 0.5], [0, 0.5, 0.5]],
+    ),
+}
+
+
+def legacy_from_structure(structure, migrating_specie):
+    # copy of the original from_structure + from_migration_hop methods
+    structure_lll = structure.get_sanitized_structure()
+    pathways = DistinctPathFinder(
+        structure_lll,
+        migrating_specie=migrating_specie,
+    ).get_paths()
+    migration_paths = []
+    for pathway in pathways:
+        start, end, _ = pathway.get_sc_structures(
+            vac_mode=True,
+            min_atoms=kwargs["min_nsites"],
+            max_atoms=kwargs["max_nsites"],
+            min_length=kwargs["min_length"],
+        )
+        nimages = MigrationImages.get_nimages(pathway.length)
+        migration_paths.append(
+            MigrationImages.from_endpoints(start, end, nimages=nimages)
+        )
+    return migration_paths
+
+
+def run_trials(method):
+    start = time()
+    npaths = 0
+    for name, structure in structures.items():
+        migrating_specie = "Li" if "Li" in name else "Na"
+        npaths += len(method(structure, migrating_specie))
+    stop = time()
+    return stop - start, npaths
+
+
+if __name__ == "__main__":
+
+    # start the Dask cluster up front so that its startup isn't timed
+    get_dask_client()
+
+    methods = {
+        "legacy": legacy_from_structure,
+        "serial": lambda s, m: MigrationImages.from_structure(s, m, **kwargs),
+        "parallel": lambda s, m: MigrationImages.from_structure(
+            s, m, parallel=True, **kwargs
+        ),
+    }
+
+    all_results = []
+    for name, method in methods.items():
+        MigrationImages._supercell_matrix_cache.clear()
+        total_time, npaths = run_trials(method)
+        all_results.append({"method": name, "npaths": npaths, "seconds": total_time})
+
+    # ------------------------------------------------------------------------
+
+    # PRINT RESULTS (total seconds for all structures)
+
+    dataframe = pandas.DataFrame(all_results).set_index("method")
+    print(dataframe.to_string())
+
+    # ------------------------------------------------------------------------
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+
+"""
+This script benchmarks parent selection, which is called by every steady-state
+source each time a new individual is submitted. We compare the original pandas
+implementations of tournament and truncated selection to the numpy versions
+for searches of increasing size. Each trial selects 2 parents (e.g. for a
+heredity mutation).
+"""
+
+from timeit import default_timer as time
+
+import numpy
+import pandas
+
+from simmate.toolkit.structure_prediction.evolution.selectors import (
+    TournamentSelection,
+    TruncatedSelection,
+)
+
+# the number total trials to run for each population size
+ntrials = 200
+
+
+# copies of the original select methods
+def legacy_tournament(nselect, individuals, fitness_column):
+    ntournament = int(len(individuals) * 0.20)
+    if ntournament < 3:
+        ntournament = 3
+    tournament_winners = []
+    for n in range(nselect):
+        df_tourn = individuals.sample(ntournament, replace=False)
+        winner = df_tourn.nsmallest(1, fitness_column).iloc[0]
+        tournament_winners.append(winner)
+    df_parents = pandas.DataFrame(tournament_winners)
+    return df_parents.reset_index(drop=True)
+
+
+def legacy_truncated(nselect, individuals, fitness_column):
+    ntruncate = int(len(individuals) * 0.05)
+    ntruncate = min(max(ntruncate, 5), 50)
+    df_truncated = individuals.nsmallest(ntruncate, fitness_column)
+    return df_truncated.sample(nselect, replace=True)
+
+
+def run_trials(select_function, **kwargs):
+    start = time()
+    for _ in range(ntrials):
+        select_function(nselect=2, **kwargs)
+    stop = time()
+    return (stop - start) / ntrials
+
+
+all_results = []
+for nindividuals in [100, 1_000, 10_000, 50_000]:
+
+    fitness = numpy.random.normal(size=nindividuals)
+    individuals = pandas.DataFrame(
+        {"id": numpy.arange(nindividuals), "energy_per_atom": fitness}
+    )
+    dataframe_kwargs = dict(individuals=individuals, fitness_column="energy_per_atom")
+    generator = numpy.random.default_rng(12345)
+
+    row = {
+        "nindividuals": nindividuals,
+        "tournament_pandas": run_trials(legacy_tournament, **dataframe_kwargs),
+        "tournament_numpy": run_trials(
+            TournamentSelection.select_from_arrays,
+            fitness=fitness,
+            seed=generator,
+        ),
+        "truncated_pandas": run_trials(legacy_truncated, **dataframe_kwargs),
+        "truncated_numpy": run_trials(
+            TruncatedSelection.select_from_arrays,
+            fitness=fitness,
+            seed=generator,
+        ),
+    }
+    all_results.append(row)
+
+# ----------------------------------------------------------------------------
+
+# PRINT RESULTS (average seconds per selection)
+
+dataframe = pandas.DataFrame(all_results).set_index("nindividuals")
+print(dataframe.to_string())
+
+# ----------------------------------------------------------------------------
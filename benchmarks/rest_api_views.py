@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+
+"""
+This script benchmarks request throughput for the REST API endpoints, which
+scripted clients can hit thousands of times per hour. We compare the following
+for a few endpoints (with format=json):
+    - the original dynamic path, where a new serializer and viewset class are
+      built for every request
+    - the cached path, where views are built on the first request and reused
+
+Note, this requires a database that is set up with `simmate database reset`.
+Small pages are used so that view construction is not hidden behind the query.
+"""
+
+from timeit import default_timer as time
+
+import pandas
+
+from simmate.database import connect  # this sets up django
+from django.test import Client  # must come after the connect
+
+from simmate.website.core_components import base_api_view
+from simmate.website.core_components.base_api_view import SimmateAPIViewSet
+
+# the number of requests to make for each endpoint
+nrequests = 500
+
+urls = {
+    "symmetry list": "/core-components/symmetry/?format=json&limit=5",
+    "symmetry retrieve": "/core-components/symmetry/166/?format=json",
+    "provider list": "/third-parties/MatprojStructure/?format=json&limit=5",
+    "workflow list": "/workflows/static-energy/vasp/matproj/?format=json&limit=5",
+}
+
+
+def run_trials(client, url):
+    start = time()
+    for _ in range(nrequests):
+        response = client.get(url)
+        assert response.status_code == 200
+    stop = time()
+    return nrequests / (stop - start)
+
+
+client = Client()
+
+all_results = []
+for name, url in urls.items():
+
+    # the original behavior: a new view (and serializer) for every request
+    SimmateAPIViewSet.cache_views = False
+    cached_serializer = base_api_view.get_table_serializer
+    base_api_view.get_table_serializer = cached_serializer.__wrapped__
+    dynamic_rate = run_trials(client, url)
+
+    SimmateAPIViewSet.cache_views = True
+    base_api_view.get_table_serializer = cached_serializer
+    SimmateAPIViewSet._view_cache.clear()
+    cached_rate = run_trials(client, url)
+
+    all_results.append(
+        {
+            "endpoint": name,
+            "dynamic": dynamic_rate,
+            "cached": cached_rate,
+        }
+    )
+
+# ----------------------------------------------------------------------------
+
+# PRINT RESULTS (requests per second)
+
+dataframe = pandas.DataFrame(all_results).set_index("endpoint")
+print(dataframe.to_string())
+
+# ----------------------------------------------------------------------------
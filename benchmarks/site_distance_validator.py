@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+
+"""
+This script benchmarks the SiteDistanceMatrix validator, which is called
+thousands of times for every structure accepted during random structure
+creation. We compare the following for NaCl supercells of increasing size:
+    - the original implementation that loops over every element pair and
+      site-site combination in python
+    - the vectorized distance-matrix check
+    - the batched neighbor-list check
+
+Half of the structures are "bad" (two sites pushed on top of each other), so
+we see the benefit of exiting early as well.
+"""
+
+import itertools
+from timeit import default_timer as time
+
+import numpy
+import pandas
+
+from simmate.toolkit import Composition, Structure
+from simmate.toolkit.validators.structure import SiteDistanceMatrix
+
+# the number total trials to run for each structure size
+ntrials = 50
+
+
+class LegacySiteDistanceMatrix(SiteDistanceMatrix):
+    # copy of the original check_structure method
+    def check_structure(self, structure):
+        dm = structure.distance_matrix
+        for i1, element1 in enumerate(self.composition):
+            element1_indicies = structure.indices_from_symbol(element1.symbol)
+            for i2, element2 in enumerate(self.composition):
+                dist_cutoff = self.element_distance_matrix[i1][i2]
+                element2_indicies = structure.indices_from_symbol(element2.symbol)
+                combos = itertools.product(element1_indicies, element2_indicies)
+                for s1, s2 in combos:
+                    if s1 == s2:
+                        continue
+                    distance = dm[s1][s2]
+                    if distance < dist_cutoff:
+                        return False
+        return True
+
+
+def run_trials(validator, structures):
+    trial_times = []
+    results = []
+    for structure in structures:
+        start = time()
+        results.append(validator.check_structure(structure))
+        stop = time()
+        trial_times.append(stop - start)
+    return numpy.mean(trial_times), results
+
+
+nacl = Structure(
+    lattice=[[5.69, 0, 0], [0, 5.69, 0], [0, 0, 5.69]],
+    species=["Na"] * 4 + ["Cl"] * 4,
+    coords=[
+        [0, 0, 0],
+        [0.5, 0.5, 0],
+        [0.5, 0, 0.5],
+        [0, 0.5, 0.5],
+        [0.5, 0, 0],
+        [0, 0.5, 0],
+        [0, 0, 0.5],
+        [0.5, 0.5, 0.5],
+    ],
+)
+
+all_results = []
+for supercell_size in [1, 2, 3, 4, 6]:
+
+    supercell = nacl * supercell_size
+    composition = Composition(supercell.composition)
+
+    structures = []
+    for n in range(ntrials):
+        structure = supercell.copy()
+        structure.perturb(0.05)
+        # make every other structure fail by moving a site onto another one
+        if n % 2:
+            site = numpy.random.randint(1, structure.num_sites)
+            structure.replace(site, structure[site].specie, structure[0].frac_coords)
+        structures.append(structure)
+
+    validators = {
+        "legacy": LegacySiteDistanceMatrix(composition),
+        "distance_matrix": SiteDistanceMatrix(composition, method="distance_matrix"),
+        "neighbor_list": SiteDistanceMatrix(composition, method="neighbor_list"),
+    }
+
+    row = {"nsites": supercell.num_sites}
+    checks = []
+    for name, validator in validators.items():
+        row[name], results = run_trials(validator, structures)
+        checks.append(results)
+
+    # all methods must give the same answer
+    assert checks[0] == checks[1] == checks[2]
+
+    all_results.append(row)
+
+# ----------------------------------------------------------------------------
+
+# PRINT RESULTS (average seconds per check)
+
+dataframe = pandas.DataFrame(all_results).set_index("nsites")
+print(dataframe)
+
+# ----------------------------------------------------------------------------
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+
+"""
+This script benchmarks the parameter handling that happens each time a workflow
+is submitted with `run_cloud` (and again when a worker starts the run). We
+compare the following for a typical set of inputs:
+    - the original serialization, which probes every value with `json.dumps`
+      and falls back to `as_dict`, `to_dict` or cloudpickle
+    - the type-based serializers from `simmate.workflow_engine.serialization`
+    - deserializing the same inputs repeatedly, with and without a
+      `parameter_cache` (as is done for sub-workflows within a run)
+
+Database steps (registering the calculation and adding the WorkItem) are not
+included, so this does not require a database.
+"""
+
+import json
+from pathlib import Path
+from timeit import default_timer as time
+
+import cloudpickle
+import pandas
+from pymatgen.analysis.diffusion.neb.pathfinder import DistinctPathFinder
+
+from simmate.toolkit import Composition, Structure
+from simmate.toolkit.diffusion import MigrationHop
+from simmate.workflow_engine import Workflow
+from simmate.workflow_engine.serialization import parameter_cache
+
+# the number of submissions to time for each method
+nsubmissions = 500
+
+
+def serialize_legacy(**parameters) -> dict:
+    # a copy of Workflow._serialize_parameters before the serialization module
+    parameters_serialized = {}
+    for parameter_key, parameter_value in parameters.items():
+        try:
+            json.dumps(parameter_value)
+        except TypeError:
+            if parameter_key == "directory":
+                parameter_value = str(parameter_value)
+            elif parameter_key == "source" and isinstance(parameter_value, dict):
+                parameter_value = serialize_legacy(**parameter_value)
+            elif parameter_key == "composition":
+                parameter_value = str(parameter_value)
+            elif hasattr(parameter_value, "as_dict"):
+                parameter_value = parameter_value.as_dict()
+            elif hasattr(parameter_value, "to_dict"):
+                parameter_value = parameter_value.to_dict()
+            else:
+                parameter_value = cloudpickle.dumps(parameter_value)
+        parameters_serialized[parameter_key] = parameter_value
+    return parameters_serialized
+
+
+# Build a typical set of inputs, including a diffusion pathway
+structure = Structure(
+    lattice=[[4.6, 0, 0], [0, 4.6, 0], [0, 0, 4.6]],
+    species=["Li"] * 8 + ["O"] * 4,
+    coords=[
+        [0.25, 0.25, 0.25],
+        [0.75, 0.75, 0.25],
+        [0.75, 0.25, 0.75],
+        [0.25, 0.75, 0.75],
+        [0.25, 0.25, 0.75],
+        [0.75, 0.75, 0.75],
+        [0.75, 0.25, 0.25],
+        [0.25, 0.75, 0.25],
+        [0, 0, 0],
+        [0.5, 0.5, 0],
+        [0.5, 0, 0.5],
+        [0, 0.5, 0.5],
+    ],
+)
+pathfinder = DistinctPathFinder(structure, migrating_specie="Li", max_path_length=3)
+path = pathfinder.get_paths()[0]
+migration_hop = MigrationHop(path.isite, path.esite, path.symm_structure)
+
+parameters = {
+    "structure": structure,
+    "supercell_start": structure,
+    "migration_hop": migration_hop,
+    "composition": Composition("Li2O"),
+    "directory": Path("example-directory"),
+    "source": {"directory": Path("previous-directory"), "database_id": 123},
+    "command": "vasp_std > vasp.out",
+    "is_restart": False,
+}
+
+
+def time_function(function) -> float:
+    start = time()
+    for _ in range(nsubmissions):
+        function()
+    stop = time()
+    return (stop - start) / nsubmissions * 1000  # in ms
+
+
+# MigrationHop can't be converted back from a dictionary (due to a bug in
+# pymatgen-diffusion), so it is left out when timing deserialization
+serialized = Workflow._serialize_parameters(**parameters)
+serialized.pop("migration_hop")
+
+
+def deserialize_many():
+    # a parent workflow and 3 sub-workflows that are given the same inputs
+    for _ in range(4):
+        Workflow._deserialize_parameters(add_defaults=False, **serialized)
+
+
+def deserialize_many_cached():
+    with parameter_cache():
+        deserialize_many()
+
+
+results = {
+    "serialize (legacy)": time_function(lambda: serialize_legacy(**parameters)),
+    "serialize (typed)": time_function(
+        lambda: Workflow._serialize_parameters(**parameters)
+    ),
+    "deserialize x4 (no cache)": time_function(deserialize_many),
+    "deserialize x4 (run cache)": time_function(deserialize_many_cached),
+}
+
+# ----------------------------------------------------------------------------
+
+# PRINT RESULTS (milliseconds per submission)
+
+dataframe = pandas.DataFrame(
+    {"time (ms)": results.values()},
+    index=results.keys(),
+)
+print(dataframe.to_string())
+
+# ----------------------------------------------------------------------------
@@ -1,12 +1,9 @@
 # -*- coding: utf-8 -*-
 
-import importlib.metadata
 import logging
 
 from rich.logging import RichHandler
 
-__version__ = importlib.metadata.version("simmate")
-
 # Configure our logger to output timestamps and "SIMMATE" with logs
 # Also changes the logging level to info
 logging.basicConfig(
@@ -21,3 +18,14 @@ logging.basicConfig(
         )
     ],
 )
+
+
+def __getattr__(name: str):
+    # Reading the package metadata is slow, and this module is imported by
+    # every `simmate` command (including tab-completion). We therefore only
+    # look up the version when it is asked for.
+    if name == "__version__":
+        import importlib.metadata
+
+        return importlib.metadata.version("simmate")
+    raise AttributeError(f"module 'simmate' has no attribute '{name}'")
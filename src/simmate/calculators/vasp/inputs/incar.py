@@ -1,5 +1,8 @@
 # -*- coding: utf-8 -*-
 
+import threading
+from collections import OrderedDict
+
 from simmate.calculators.vasp.inputs.incar_modifiers import (
     keyword_modifier_density,
     keyword_modifier_density_a,
@@ -13,6 +16,155 @@ from simmate.calculators.vasp.inputs.incar_modifiers import (
 )
 
 
+def _parse_int(value: str) -> int:
+    # sometimes "1." was written to indicate an integer so check for
+    # this and remove it if needed.
+    if value[-1] == ".":
+        value = value[:-1]
+    return int(value)
+
+
+def _parse_bool(value: str) -> bool:
+    # Python is weird where bool("FALSE") will return True... So I need
+    # to convert the string to lowercase and read it to know what to
+    # return here.
+    value = value.lower()
+    if "t" in value:
+        return True
+    elif "f" in value:
+        return False
+
+
+def _parse_vector_list(value: str) -> list[list[float]]:
+    # convert a string of...
+    #   "x1 y1 z1 x2 y2 z2 x3 y3 z3"
+    # to...
+    #   [x1,y1,z1,x2,y2,z2,x3,y3,z3] (list of floats)
+    # and then to...
+    #   [[x1,y1,z1],[x2,y2,z2],[x3,y3,z3]]
+    value = [float(item) for item in value.split()]
+    return [value[i : i + 3] for i in range(0, len(value), 3)]
+
+
+def _parse_float_list(value: str) -> list[float]:
+    final_list = []
+    for item in value.split():
+        # Sometimes, the values are given as "3*0.1 2*0.5" where the "*"
+        # means to include that value that many times. For example, this
+        # input would be the same as "0.1 0.1 0.1 0.5 0.5". We need to
+        # account for this when parsing.
+        if "*" in item:
+            nsubitems, subitem = item.split("*")
+            final_list += [float(subitem)] * int(nsubitems)
+        else:
+            final_list.append(float(item))
+    return final_list
+
+
+def _parse_int_list(value: str) -> list[int]:
+    return [int(item) for item in value.split()]
+
+
+# I outline the most common keys to what their expected data types are. These
+# are combined into INCAR_SCHEMA below, which maps each key to the function
+# that converts its string value (e.g. from an INCAR file) to the proper python
+# datatype. Keys that aren't listed here are left as strings.
+
+INT_KEYS = (
+    "NSW",
+    "NBANDS",
+    "NELMIN",
+    "ISIF",
+    "IBRION",
+    "ISPIN",
+    "ICHARG",
+    "NELM",
+    "ISMEAR",
+    "NPAR",
+    "LDAUPRINT",
+    "LMAXMIX",
+    "ENCUT",
+    "NSIM",
+    "NKRED",
+    "NUPDOWN",
+    "ISPIND",
+    "LDAUTYPE",
+    "IVDW",
+    "ISTART",
+    "NELMDL",
+    "IMIX",
+    "ISYM",
+)
+
+FLOAT_KEYS = (
+    "EDIFF",
+    "SIGMA",
+    "TIME",
+    "ENCUTFOCK",
+    "HFSCREEN",
+    "POTIM",
+    "EDIFFG",
+    "AGGAC",
+    "PARAM1",
+    "PARAM2",
+    "KSPACING",
+    "SYMPREC",
+    "AMIX",
+    "BMIX",
+    "AMIN",
+    "SMASS",
+    "AMIX_MAG",
+    "BMIX_MAG",
+)
+
+BOOL_KEYS = (
+    "LDAU",
+    "LWAVE",
+    "LSCALU",
+    "LCHARG",
+    "LPLANE",
+    "LUSE_VDW",
+    "LHFCALC",
+    "ADDGRID",
+    "LSORBIT",
+    "LNONCOLLINEAR",
+    "KGAMMA",
+)
+
+VECTOR_LIST_KEYS = (
+    # "MAGMOM",  # depends on other args -- see notes in init
+    "DIPOL",
+)
+
+FLOAT_LIST_KEYS = (
+    "LDAUU",
+    "LDAUJ",
+    "MAGMOM",  # depends on other args -- see notes in init
+    "LANGEVIN_GAMMA",
+    "QUAD_EFG",
+    "EINT",
+)
+
+INT_LIST_KEYS = (
+    "LDAUL",
+    "LDAUJ",
+    "EINT",
+)
+
+# Some keys are listed twice (e.g. LDAUJ is both a float and int list), so
+# the order here matters. Later entries take priority, which means a key
+# is parsed with the first matching type from int, float, bool, vector,
+# float-list, then int-list.
+INCAR_SCHEMA = {
+    **{key: _parse_int_list for key in INT_LIST_KEYS},
+    **{key: _parse_float_list for key in FLOAT_LIST_KEYS},
+    **{key: _parse_vector_list for key in VECTOR_LIST_KEYS},
+    **{key: _parse_bool for key in BOOL_KEYS},
+    **{key: float for key in FLOAT_KEYS},
+    **{key: _parse_int for key in INT_KEYS},
+}
+
+
 class Incar(dict):
     """
     INCAR object for reading and writing INCAR files. This behaves exactly like
@@ -28,6 +180,19 @@ class Incar(dict):
     as LDAUJ, LDAUU, LDAUL, LDAUTYPE, and LDAUPRINT.
     """
 
+    evaluation_cache_size: int = 1024
+    """
+    Keyword modifiers (such as `smart_ldau` or `smart_magmom`) can be slow to
+    evaluate, and the same INCAR is often written several times for a single
+    structure (e.g. when error handlers rewrite the INCAR). We therefore cache
+    the evaluated modifiers for each unique structure and set of modifiers.
+    This sets the max number of entries to keep, and setting it to 0 will
+    disable the cache.
+    """
+
+    _evaluation_cache: OrderedDict = OrderedDict()
+    _evaluation_cache_lock: threading.Lock = threading.Lock()
+
     def __init__(self, **kwargs):
 
         # The kwargs are a dictionary of parameters (e.g. {"PREC": "accurate"})
@@ -86,72 +251,43 @@ class Incar(dict):
         # Let's start with an empty string and build from there
         final_str = ""
 
-        # First we need to iterate through all parameters and check if we have
-        # ones that are structure-specific. For example, we would need to
-        # evaluate "ENCUT__per_atom". We go through all these and collect the
-        # parameters into a final settings list.
+        # First we need to evaluate all parameters that are structure-specific.
+        # For example, we would need to evaluate "ENCUT__per_atom".
+        modifier_values = self._evaluate_modifiers(structure)
+
+        # We then go through all these and collect the parameters into a final
+        # settings list (keeping the original order of parameters).
         final_settings = {}
         for parameter, value in self.items():
 
             # if there is no modifier attached to the parameter, we just keep it as-is
             if "__" not in parameter:
                 final_settings[parameter] = value
+                continue
 
-            # Otherwise we have a modifier like "__density" and need to evaluate it
-            else:
+            # Otherwise we have a modifier like "__density" and use the
+            # evaluated value. This also overwrites what our paramter value is.
+            value = modifier_values[parameter]
+            parameter = parameter.split("__")[0]
 
-                # make sure we have a structure supplied because all modifiers
-                # require one.
-                if not structure:
-                    raise Exception(
-                        "It looks like you used a keyword modifier but didn't "
-                        f"supply a structure! If you want to use {parameter}, "
-                        "then you need to make sure you provide a structure so "
-                        "that the modifier can be evaluated."
-                    )
-
-                # separate the input into the base parameter and modifier.
-                # This also overwrites what our paramter value is.
-                parameter, modifier_tag = parameter.split("__")
-
-                # check that this class has this modifier supported. It should
-                # be a method named "keyword_modifier_mymodifier".
-                # If everything looks good, we grab the modifier function
-                modifier_fxn_name = "keyword_modifier_" + modifier_tag
-                if hasattr(self, modifier_fxn_name):
-                    modifier_fxn = getattr(self, modifier_fxn_name)
-                else:
-                    raise AttributeError(
-                        """
-                        It looks like you used a keyword modifier that hasn't
-                        been defined yet! If you want something like ENCUT__smart_encut,
-                        then you need to make sure there is a keyword_modifier_smart_encut
-                        method available.
-                        """
-                    )
-
-                # now that we have the modifier function, let's use it to update
-                # our value for this keyword.
-                value = modifier_fxn(structure, value)
-
-                # sometimes the modifier returns None. In this case we don't
-                # set anything in the INCAR, but leave it to the programs
-                # default value.
-                if not value:
-                    continue
-                # BUG: Are there cases where None is return but we still want
-                # to write it to the INCAR? If so, it'd be skipped here.
-
-                # if the "parameter" is actually "multiple_keywords", then we
-                # have our actual parameters as a dictionary. We need to
-                # pull these out of the "value" we have.
-                if parameter == "multiple_keywords":
-                    for subparameter, subvalue in value.items():
-                        final_settings[subparameter] = subvalue
-
-                # otherwise we were just given back an update value
-                else:
-                    final_settings[parameter] = value
+            # sometimes the modifier returns None. In this case we don't
+            # set anything in the INCAR, but leave it to the programs
+            # default value.
+            if not value:
+                continue
+            # BUG: Are there cases where None is return but we still want
+            # to write it to the INCAR? If so, it'd be skipped here.
+
+            # if the "parameter" is actually "multiple_keywords", then we
+            # have our actual parameters as a dictionary. We need to
+            # pull these out of the "value" we have.
+            if parameter == "multiple_keywords":
+                for subparameter, subvalue in value.items():
+                    final_settings[subparameter] = subvalue
+
+            # otherwise we were just given back an update value
+            else:
+                final_settings[parameter] = value
 
         # Now that we have all of our parameters evaluated for the structure, we
         # iterate through each parameter and its set value. Each one will be
@@ -190,6 +326,86 @@ class Incar(dict):
         # we now have our final string and can return it!
         return final_str
 
+    def _evaluate_modifiers(self, structure=None) -> dict:
+        """
+        Evaluates all parameters that have a keyword modifier attached (e.g.
+        "ENCUT__per_atom") and gives a dictionary of the original parameter
+        names mapped to their evaluated values. Results are cached for each
+        unique structure, set of modifier settings, and modifier functions.
+        """
+
+        modifier_settings = {
+            parameter: value for parameter, value in self.items() if "__" in parameter
+        }
+        if not modifier_settings:
+            return {}
+
+        # make sure we have a structure supplied because all modifiers
+        # require one.
+        if not structure:
+            raise Exception(
+                "It looks like you used a keyword modifier but didn't "
+                f"supply a structure! If you want to use {list(modifier_settings)}, "
+                "then you need to make sure you provide a structure so "
+                "that the modifier can be evaluated."
+            )
+
+        # grab the function used to evaluate each parameter
+        modifier_fxns = {}
+        for parameter in modifier_settings:
+
+            # separate the input into the base parameter and modifier.
+            modifier_tag = parameter.split("__")[1]
+
+            # check that this class has this modifier supported. It should
+            # be a method named "keyword_modifier_mymodifier".
+            # If everything looks good, we grab the modifier function
+            modifier_fxn_name = "keyword_modifier_" + modifier_tag
+            if hasattr(self, modifier_fxn_name):
+                modifier_fxn = getattr(self, modifier_fxn_name)
+            else:
+                raise AttributeError(
+                    """
+                    It looks like you used a keyword modifier that hasn't
+                    been defined yet! If you want something like ENCUT__smart_encut,
+                    then you need to make sure there is a keyword_modifier_smart_encut
+                    method available.
+                    """
+                )
+            modifier_fxns[parameter] = modifier_fxn
+
+        # check if we've evaluated these settings for this structure already.
+        # The modifier settings can include nested dictionaries, so we use
+        # their string representation to make them hashable. The functions
+        # are part of the key too, because subclasses or newly added modifiers
+        # can give a different result for the same settings.
+        cache_key = (
+            _get_structure_key(structure),
+            repr(sorted(modifier_settings.items())),
+            tuple(modifier_fxns.values()),
+        )
+        cache = self._evaluation_cache
+        with self._evaluation_cache_lock:
+            if cache_key in cache:
+                cache.move_to_end(cache_key)
+                return cache[cache_key]
+
+        # now that we have the modifier functions, let's use them to evaluate
+        # our value for each keyword.
+        modifier_values = {
+            parameter: modifier_fxns[parameter](structure, value)
+            for parameter, value in modifier_settings.items()
+        }
+
+        # save the result and remove the oldest entries if we're over the limit
+        if self.evaluation_cache_size:
+            with self._evaluation_cache_lock:
+                cache[cache_key] = modifier_values
+                while len(cache) > self.evaluation_cache_size:
+                    cache.popitem(last=False)
+
+        return modifier_values
+
     def to_file(self, filename="INCAR", structure=None):
         """
         Write Incar to a file.
@@ -238,159 +454,19 @@ class Incar(dict):
         When given a vasp parameter and it's value as a string, this helper
         function will use the key (parameter) to determine how to convert the
         val string to the proper python datatype (int, float, bool, list...).
-        I have the most common keys mapped out, but if a parameter is given that
-        isn't mapped, I simply leave it as a string.
+        The most common keys are mapped out in `INCAR_SCHEMA`, but if a parameter
+        is given that isn't mapped, I simply leave it as a string.
         """
 
-        # I outline the most common keys to what their expected data types are.
-
-        # OPTIMIZE -- I should set these elsewhere so that these lists are not
-        # initialized every time I call this function. Maybe have a dictionary
-        # of {Parameter: Value_datatype} in the main enviornment for use.
-
-        vector_list_keys = (
-            # "MAGMOM",  # depends on other args -- see notes in init
-            "DIPOL",
-        )
-
-        float_list_keys = (
-            "LDAUU",
-            "LDAUJ",
-            "MAGMOM",  # depends on other args -- see notes in init
-            "LANGEVIN_GAMMA",
-            "QUAD_EFG",
-            "EINT",
-        )
-        int_list_keys = (
-            "LDAUL",
-            "LDAUJ",
-            "EINT",
-        )
-
-        bool_keys = (
-            "LDAU",
-            "LWAVE",
-            "LSCALU",
-            "LCHARG",
-            "LPLANE",
-            "LUSE_VDW",
-            "LHFCALC",
-            "ADDGRID",
-            "LSORBIT",
-            "LNONCOLLINEAR",
-            "KGAMMA",
-        )
-        float_keys = (
-            "EDIFF",
-            "SIGMA",
-            "TIME",
-            "ENCUTFOCK",
-            "HFSCREEN",
-            "POTIM",
-            "EDIFFG",
-            "AGGAC",
-            "PARAM1",
-            "PARAM2",
-            "KSPACING",
-            "SYMPREC",
-            "AMIX",
-            "BMIX",
-            "AMIN",
-            "SMASS",
-            "AMIX_MAG",
-            "BMIX_MAG",
-        )
-        int_keys = (
-            "NSW",
-            "NBANDS",
-            "NELMIN",
-            "ISIF",
-            "IBRION",
-            "ISPIN",
-            "ICHARG",
-            "NELM",
-            "ISMEAR",
-            "NPAR",
-            "LDAUPRINT",
-            "LMAXMIX",
-            "ENCUT",
-            "NSIM",
-            "NKRED",
-            "NUPDOWN",
-            "ISPIND",
-            "LDAUTYPE",
-            "IVDW",
-            "ISTART",
-            "NELMDL",
-            "IMIX",
-            "ISYM",
-        )
-
         # If the value is not a string, then assume we are already in the
         # correct format. Note, an incorrect format will throw an error
         # somewhere below, which may be tricky for beginners to traceback.
         if not isinstance(value, str):
             return value
 
-        # if the parameter is in int_keys
-        if parameter in int_keys:
-            # sometimes "1." was written to indicate an integer so check for
-            # this and remove it if needed.
-            if value[-1] == ".":
-                value = value[:-1]
-            # return the value integer
-            return int(value)
-
-        # if the parameter is in float_keys, we convert value to a float
-        elif parameter in float_keys:
-            # return the value float
-            return float(value)
-
-        # if the parameter is in bool_keys
-        elif parameter in bool_keys:
-            # Python is weird where bool("FALSE") will return True... So I need
-            # to convert the string to lowercase and read it to know what to
-            # return here.
-            if "t" in value.lower():
-                return True
-            elif "f" in value.lower():
-                return False
-
-        # if the parameter is in vector_list_keys
-        # These vectors are always floats
-        elif parameter in vector_list_keys:
-            # convert a string of...
-            #   "x1 y1 z1 x2 y2 z2 x3 y3 z3"
-            # to...
-            #   [x1,y1,z1,x2,y2,z2,x3,y3,z3] (list of floats)
-            # and then to...
-            #   [[x1,y1,z1],[x2,y2,z2],[x3,y3,z3]]
-            value = [float(item) for item in value.split()]
-            return [value[i : i + 3] for i in range(0, len(value), 3)]
-
-        # if the parameter is in float_list_keys
-        elif parameter in float_list_keys:
-            final_list = []
-            for item in value.split():
-                # Sometimes, the values are given as "3*0.1 2*0.5" where the "*"
-                # means to include that value that many times. For example, this
-                # input would be the same as "0.1 0.1 0.1 0.5 0.5". We need to
-                # account for this when parsing.
-                if "*" in item:
-                    nsubitems, subitem = item.split("*")
-                    for n in range(int(nsubitems)):
-                        final_list.append(float(subitem))
-                else:
-                    final_list.append(float(item))
-            return final_list
-
-        # if the parameter is in int_list_keys
-        elif parameter in int_list_keys:
-            return [int(item) for item in value.split()]
-
         # If it is not in the common keys listed, just leave it as a string.
-        else:
-            return value
+        parser = INCAR_SCHEMA.get(parameter)
+        return parser(value) if parser else value
 
     def compare_incars(self, other_incar):
         """
@@ -502,6 +578,19 @@ class Incar(dict):
         setattr(cls, keyword_modifier.__name__, staticmethod(keyword_modifier))
 
 
+def _get_structure_key(structure) -> tuple:
+    """
+    Gives a hashable key that is unique to the structure. Two structures with
+    the same lattice, sites, and site properties will give the same key.
+    """
+    return (
+        structure.lattice.matrix.tobytes(),
+        structure.frac_coords.tobytes(),
+        tuple(str(site.species) for site in structure),
+        repr(structure.site_properties),
+    )
+
+
 # set some default keyword modifiers
 for modifier in [
     keyword_modifier_density,
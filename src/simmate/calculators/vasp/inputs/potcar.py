@@ -1,5 +1,12 @@
 # -*- coding: utf-8 -*-
 
+import hashlib
+import os
+import shutil
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+
 # These are dictionaries that tell us which POTCARs we should grab based on
 # the type of calculation as well as where to find them
 from simmate.calculators.vasp.inputs.potcar_mappings import (  # TODO: LDA_ELEMENT_MAPPINGS
@@ -10,8 +17,26 @@ from simmate.calculators.vasp.inputs.potcar_mappings import (  # TODO: LDA_ELEME
 
 
 class Potcar:
-    @staticmethod
+
+    cache_directory: Path = Path.home() / "simmate" / "vasp" / "potcar_cache"
+    """
+    Where assembled POTCAR files are cached on disk. In high-throughput runs,
+    the same few chemical systems are written thousands of times, so we
+    assemble each POTCAR once and then copy it into each new calculation
+    directory. If your home directory is on a slow shared
+    filesystem, point this to a node-local disk. Set to None to disable the
+    disk cache (the in-memory cache is always used).
+    """
+
+    cache_max_entries: int = 500
+    """
+    The maximum number of assembled POTCARs to keep in `cache_directory`.
+    When exceeded, the least-recently-used files are removed.
+    """
+
+    @classmethod
     def to_file_from_type(
+        cls,
         elements,
         functional,
         filename="POTCAR",
@@ -22,6 +47,42 @@ class Potcar:
         # desired functional ("PBE", "LDA", or "PBE_GW")
         # The order of the elements list MUST match the POSCAR!
 
+        filename = Path(filename)
+
+        potcar_symbols = cls.get_potcar_symbols(
+            elements,
+            functional,
+            element_mappings,
+        )
+
+        # VASP expect all POTCAR files to be combined into one and in the same
+        # order as the POSCAR elements. We only do this once per unique set of
+        # potentials and reuse the result every call after.
+        if filename.exists():
+            filename.unlink()
+
+        if cls.cache_directory:
+            # We copy rather than hardlink. A hardlink would share the cached
+            # file, so edits to a calculation's POTCAR would corrupt the cache
+            # (and updating the cache's access time would change every POTCAR
+            # linked to it).
+            cached_filename = cls._get_cached_file(functional, potcar_symbols)
+            shutil.copyfile(cached_filename, filename)
+        else:
+            with filename.open("w") as combinedfile:
+                combinedfile.write(cls._get_combined_text(functional, potcar_symbols))
+
+    @staticmethod
+    def get_potcar_symbols(
+        elements,
+        functional,
+        element_mappings=None,
+    ) -> tuple[str]:
+        """
+        Gives the POTCAR symbols (e.g. "Ca_sv" or "Y_sv") for each element,
+        in the same order as the elements given.
+        """
+
         # If the user wants to override the ELEMENT_MAPPINGS and use different
         # VASP potentials than what we have picked, then they can provide their
         # own dictionary OR pass in an update version of our. For example, they
@@ -42,34 +103,135 @@ class Potcar:
             if functional == "PBE_GW":
                 element_mappings = PBE_GW_ELEMENT_MAPPINGS
 
-        # based on the functional, grab the proper folder location of all POTCARs
-        folder_loc = FOLDER_MAPPINGS[functional]
+        # grab the proper POTCAR symbol based on the functional and element
+        return tuple(element_mappings[element.symbol] for element in elements)
 
-        # we mow need to iterate through each element and find it's POTCAR location
-        # we also keep a list of where these are located
-        potcar_locations = []
-        for element in elements:
+    @staticmethod
+    def _get_single_filename(functional: str, potcar_symbol: str) -> Path:
+        # based on the functional, grab the proper folder location of all
+        # POTCARs. The file will be located at /folder_loc/element_symbol/POTCAR
+        return FOLDER_MAPPINGS[functional] / potcar_symbol / "POTCAR"
 
-            # grab the proper POTCAR symbol based on the functional and element
-            potcar_symbol = element_mappings[element.symbol]
+    @classmethod
+    def _get_combined_text(cls, functional: str, potcar_symbols: tuple[str]) -> str:
+        """
+        Gives the full POTCAR content for a series of potentials. Note, the
+        potential library is only read once per potential thanks to caching.
+        """
+        return "".join(
+            _read_file(cls._get_single_filename(functional, symbol))
+            for symbol in potcar_symbols
+        )
 
-            # now let's combine this information for the full path to the POTCAR.
-            # The file will be located at /folder_loc/element_symbol/POTCAR
-            potcar_loc = folder_loc / potcar_symbol / "POTCAR"
+    @classmethod
+    def _get_cached_file(cls, functional: str, potcar_symbols: tuple[str]) -> Path:
+        """
+        Gives the path to the assembled POTCAR in the disk cache, creating
+        it if it doesn't exist yet. Files are content-addressed by the
+        functional, library folder, and ordered potential symbols.
+        """
 
-            # add it to our list
-            potcar_locations.append(potcar_loc)
+        cache_directory = Path(cls.cache_directory)
+        cache_directory.mkdir(parents=True, exist_ok=True)
 
-        # VASP expect all POTCAR files to be combined into one and in the same
-        # order as the POSCAR elements. Let's do that here.
-        with filename.open("w") as combinedfile:
-            for potcar in potcar_locations:
-                with potcar.open() as singlefile:
-                    combinedfile.write(singlefile.read())
+        key = "|".join([functional, str(FOLDER_MAPPINGS[functional]), *potcar_symbols])
+        key_hash = hashlib.sha256(key.encode()).hexdigest()
+        cached_filename = cache_directory / f"{key_hash}.POTCAR"
+
+        if cached_filename.exists():
+            # update the access time so LRU eviction keeps this file
+            os.utime(cached_filename)
+            return cached_filename
+
+        # write to a temporary file and then move it into place. This keeps
+        # other workers from ever reading a partially-written file. The
+        # temporary file has a unique name, so threads and processes never
+        # write to the same one.
+        file_descriptor, temp_filename = tempfile.mkstemp(
+            suffix=".tmp",
+            dir=cache_directory,
+        )
+        try:
+            with os.fdopen(file_descriptor, "w") as file:
+                file.write(cls._get_combined_text(functional, potcar_symbols))
+            os.replace(temp_filename, cached_filename)
+        except BaseException:
+            Path(temp_filename).unlink(missing_ok=True)
+            raise
+
+        cls._evict_cache(cache_directory)
+        return cached_filename
+
+    @classmethod
+    def _evict_cache(cls, cache_directory: Path):
+        cached_files = list(cache_directory.glob("*.POTCAR"))
+        if len(cached_files) <= cls.cache_max_entries:
+            return
+        cached_files.sort(key=lambda file: file.stat().st_mtime)
+        for file in cached_files[: len(cached_files) - cls.cache_max_entries]:
+            # another worker may have already removed this file
+            file.unlink(missing_ok=True)
+
+    @classmethod
+    def get_metadata(
+        cls,
+        elements,
+        functional,
+        element_mappings=None,
+    ) -> list[dict]:
+        """
+        Gives the ENMAX and ZVAL of each potential, in the same order as the
+        elements given. This is parsed once per potential and then cached,
+        so it is cheap to call when building INCAR settings.
+
+        For example, NaCl with PBE gives...
+        ``` python
+        [
+            {"symbol": "Na_pv", "ENMAX": 259.561, "ZVAL": 7.0},
+            {"symbol": "Cl", "ENMAX": 262.472, "ZVAL": 7.0},
+        ]
+        ```
+        """
+        potcar_symbols = cls.get_potcar_symbols(
+            elements,
+            functional,
+            element_mappings,
+        )
+        return [
+            dict(
+                symbol=symbol,
+                **_parse_metadata(cls._get_single_filename(functional, symbol)),
+            )
+            for symbol in potcar_symbols
+        ]
 
     # TODO
     # from_symbol_and_functional --> returns Potential object
     # from_file --> returns Potential object
     # write_from_potential --> takes a Potential object and write file in POTCAR format
-    # symbols --> gives list of potcar symbols (Ca, Y_sv, etc.)
     # nelect --> gives total electron count from potcar
+
+
+@lru_cache(maxsize=256)
+def _read_file(filename: Path) -> str:
+    with filename.open() as file:
+        return file.read()
+
+
+@lru_cache(maxsize=256)
+def _parse_metadata(filename: Path) -> dict:
+    # These lines look like...
+    #   ENMAX  =  400.000; ENMIN  =  300.000 eV
+    #   POMASS =   12.011; ZVAL   =    4.000    mass and valenz
+    metadata = {}
+    for line in _read_file(filename).splitlines():
+        for entry in line.split(";"):
+            if "=" not in entry:
+                continue
+            key, value = entry.split("=", 1)
+            key = key.strip()
+            if key in ("ENMAX", "ZVAL") and key not in metadata:
+                metadata[key] = float(value.split()[0])
+        if len(metadata) == 2:
+            break
+    return metadata
@@ -1,5 +1,8 @@
 # -*- coding: utf-8 -*-
 
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
 from simmate.calculators.vasp.inputs import Incar
 
 
@@ -329,3 +332,83 @@ def test_custom_keyword_modifier(tmp_path, sample_structures):
 
     incar2 = Incar.from_file(incar_filename)
     assert incar2.get("ENCUT", None) == 8
+
+
+def test_incar_evaluation_cache(sample_structures, mocker):
+
+    structure = sample_structures["C_mp-48_primitive"]
+    mocker.patch.object(Incar, "_evaluation_cache", OrderedDict())
+    mocker.patch.object(Incar, "evaluation_cache_size", 1)
+    spy = mocker.spy(Incar, "keyword_modifier_per_atom")
+
+    # the modifier is only evaluated once for the same structure + settings
+    incar = Incar(EDIFF__per_atom=1e-5, NSW=10)
+    for _ in range(3):
+        assert incar.to_evaluated_str(structure) == (
+            f"EDIFF = {1e-5 * structure.num_sites}\nNSW = 10\n"
+        )
+    assert spy.call_count == 1
+
+    # new settings or structures are evaluated again
+    Incar(EDIFF__per_atom=1e-4).to_evaluated_str(structure)
+    assert spy.call_count == 2
+    Incar(EDIFF__per_atom=1e-4).to_evaluated_str(structure * [2, 1, 1])
+    assert spy.call_count == 3
+
+    # and old entries are removed when the cache is full
+    assert len(Incar._evaluation_cache) == 1
+    incar.to_evaluated_str(structure)
+    assert spy.call_count == 4
+
+
+def test_incar_evaluation_cache_modifiers(sample_structures, mocker):
+
+    structure = sample_structures["C_mp-48_primitive"]
+    mocker.patch.object(Incar, "_evaluation_cache", OrderedDict())
+
+    # a subclass with a different modifier function never reuses the result
+    # of the original one
+    class CustomIncar(Incar):
+        @staticmethod
+        def keyword_modifier_per_atom(structure, per_atom_value):
+            return per_atom_value * structure.num_sites * 2
+
+    Incar(NSW__per_atom=10).to_evaluated_str(structure)
+    assert CustomIncar(NSW__per_atom=10).to_evaluated_str(structure) == (
+        f"NSW = {20 * structure.num_sites}\n"
+    )
+
+    # the cache can be shared between threads
+    structures = [structure * [n, 1, 1] for n in range(1, 5)]
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(
+            executor.map(
+                lambda s: Incar(NSW__per_atom=10).to_evaluated_str(s),
+                structures * 25,
+            )
+        )
+    assert results == [f"NSW = {10 * s.num_sites}\n" for s in structures * 25]
+
+
+def test_incar_parsing(tmp_path):
+
+    incar_filename = tmp_path / "INCAR"
+    incar_filename.write_text(
+        "# comment line\n"
+        "ENCUT = 520.\n"
+        "EDIFF = 1e-05; LWAVE = .FALSE.\n"
+        "MAGMOM = 2*0.6 1.0\n"
+        "LDAUL = 2 0\n"
+        "DIPOL = 0.5 0.5 0.5\n"
+        "ALGO = Fast\n"
+    )
+    incar = Incar.from_file(incar_filename)
+    assert incar == dict(
+        ENCUT=520,
+        EDIFF=1e-5,
+        LWAVE=False,
+        MAGMOM=[0.6, 0.6, 1.0],
+        LDAUL=[2, 0],
+        DIPOL=[[0.5, 0.5, 0.5]],
+        ALGO="Fast",
+    )
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+
+from simmate.calculators.vasp.inputs import Potcar
+from simmate.calculators.vasp.inputs.potcar_mappings import FOLDER_MAPPINGS
+from simmate.toolkit import Composition
+
+
+def make_potential_library(directory):
+    for symbol, enmax, zval in [("Na_pv", 259.561, 7), ("Cl", 262.472, 7)]:
+        folder = directory / symbol
+        folder.mkdir(parents=True)
+        (folder / "POTCAR").write_text(
+            f"  PAW_PBE {symbol}\n"
+            f"   ENMAX  =  {enmax}; ENMIN  =  194.671 eV\n"
+            f"   POMASS =   22.990; ZVAL   =    {zval}.000    mass and valenz\n"
+        )
+
+
+def test_potcar(tmp_path, mocker):
+
+    library = tmp_path / "library"
+    make_potential_library(library)
+    mocker.patch.dict(FOLDER_MAPPINGS, {"PBE": library})
+    mocker.patch.object(Potcar, "cache_directory", tmp_path / "cache")
+    mocker.patch.object(Potcar, "cache_max_entries", 1)
+
+    elements = Composition("NaCl").elements
+    mappings = {"Na": "Na_pv", "Cl": "Cl"}
+
+    # write the file twice, where the second time uses the cached file
+    for n in range(2):
+        filename = tmp_path / f"POTCAR_{n}"
+        Potcar.to_file_from_type(elements, "PBE", filename, mappings)
+        content = filename.read_text()
+        assert content.count("PAW_PBE") == len(elements)
+        assert content.index("Na_pv") < content.index(" Cl")
+    assert len(list((tmp_path / "cache").iterdir())) == 1
+
+    # edits to a written file never change the cached file
+    (tmp_path / "POTCAR_1").write_text("edited")
+    Potcar.to_file_from_type(elements, "PBE", tmp_path / "POTCAR_2", mappings)
+    assert (tmp_path / "POTCAR_2").read_text() == content
+
+    # a different ordering is a new entry, and the old one is evicted
+    Potcar.to_file_from_type(elements[::-1], "PBE", tmp_path / "POTCAR", mappings)
+    assert len(list((tmp_path / "cache").iterdir())) == 1
+
+    # disabling the disk cache writes the file directly
+    mocker.patch.object(Potcar, "cache_directory", None)
+    Potcar.to_file_from_type(elements, "PBE", tmp_path / "POTCAR", mappings)
+    assert (tmp_path / "POTCAR").read_text() == (tmp_path / "POTCAR_0").read_text()
+
+    metadata = Potcar.get_metadata(elements, "PBE", mappings)
+    assert metadata == [
+        {"symbol": "Na_pv", "ENMAX": 259.561, "ZVAL": 7.0},
+        {"symbol": "Cl", "ENMAX": 262.472, "ZVAL": 7.0},
+    ]
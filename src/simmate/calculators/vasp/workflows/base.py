@@ -1,5 +1,7 @@
 # -*- coding: utf-8 -*-
 
+import filecmp
+import logging
 import shutil
 from pathlib import Path
 
@@ -142,6 +144,24 @@ class VaspWorkflow(S3Workflow):
     if the angles between sites are symmetrically equivalent. (in Degrees)
     """
 
+    wavecar_compatibility_keys: list[str] = [
+        "ENCUT",
+        "PREC",
+        "KSPACING",
+        "KGAMMA",
+        "ISPIN",
+        "NBANDS",
+        "LSORBIT",
+        "LNONCOLLINEAR",
+    ]
+    """
+    When warm-starting from a past calculation, a WAVECAR is only reused if
+    all of these INCAR settings match between the two calculations (along with
+    the KPOINTS file, if there is one). These settings determine the basis set
+    and k-point mesh that the wavefunctions are stored on. If any of them
+    differ, we fall back to reusing the CHGCAR only.
+    """
+
     @classmethod
     def _get_clean_structure(
         cls,
@@ -209,7 +229,29 @@ class VaspWorkflow(S3Workflow):
             return structure_cleaned
 
     @classmethod
-    def setup(cls, directory: Path, structure: Structure, **kwargs):
+    def setup(
+        cls,
+        directory: Path,
+        structure: Structure,
+        **kwargs,
+    ):
+        """
+        Writes the POSCAR, INCAR, KPOINTS (if needed), and POTCAR files.
+
+        #### Parameters
+
+        - `directory`:
+            The directory to write input files to. Must exist already.
+
+        - `structure`:
+            The structure to use for the calculation.
+
+        Note, staged workflows (such as `Relaxation__Vasp__Staged`) can also
+        pass the private parameters `_warm_start_directory` and
+        `_write_warm_start_files`. These reuse the WAVECAR/CHGCAR of a past
+        calculation (see `_setup_warm_start`) and force LWAVE/LCHARG to True
+        so that this calculation can be reused by the next one.
+        """
 
         # run cleaning and standardizing on structure (based on class attributes)
         structure_cleaned = cls._get_clean_structure(structure, **kwargs)
@@ -220,6 +262,8 @@ class VaspWorkflow(S3Workflow):
         # Combine our base incar settings with those of our parallelization settings
         # and then write the incar file
         incar = Incar(**cls.incar) + Incar(**cls.incar_parallel_settings)
+        if kwargs.get("_write_warm_start_files"):
+            incar.update(LWAVE=True, LCHARG=True)
         incar.to_file(
             filename=directory / "INCAR",
             structure=structure_cleaned,
@@ -242,6 +286,115 @@ class VaspWorkflow(S3Workflow):
             cls.potcar_mappings,
         )
 
+        # if requested, reuse the wavefunctions/charge density of a past calc
+        # and then rewrite the INCAR so that VASP reads the copied file
+        warm_start_directory = kwargs.get("_warm_start_directory")
+        if warm_start_directory:
+            warm_start_settings = cls._setup_warm_start(
+                directory=directory,
+                warm_start_directory=Path(warm_start_directory),
+                structure=structure_cleaned,
+            )
+            if warm_start_settings:
+                incar.update(warm_start_settings)
+                incar.to_file(
+                    filename=directory / "INCAR",
+                    structure=structure_cleaned,
+                )
+
+    @classmethod
+    def _setup_warm_start(
+        cls,
+        directory: Path,
+        warm_start_directory: Path,
+        structure: Structure,
+    ) -> dict:
+        """
+        Copies the WAVECAR or CHGCAR of a past calculation into a directory
+        that has already been setup, and gives the INCAR settings needed for
+        VASP to read the copied file. The files are only reused when it is safe:
+
+        1. the past calculation must have the same POTCAR and the same sites
+           (in the same order). Otherwise nothing is copied.
+        2. the WAVECAR is used if settings in `wavecar_compatibility_keys` and
+           the KPOINTS file match. VASP reads it by default (ISTART=1).
+        3. otherwise the CHGCAR is used and ICHARG=1 is set. VASP interpolates
+           the charge density if the FFT grid changed.
+
+        If ISTART or ICHARG are already set in the new INCAR, we leave the
+        user's choice alone and do not copy anything.
+
+        Gives an empty dictionary when the calculation will be started cold.
+        """
+
+        previous_poscar = warm_start_directory / "POSCAR"
+        previous_incar = warm_start_directory / "INCAR"
+        previous_potcar = warm_start_directory / "POTCAR"
+        new_potcar = directory / "POTCAR"
+
+        if not previous_poscar.exists() or not previous_incar.exists():
+            logging.info("No past calculation found for warm-start. Starting cold.")
+            return {}
+
+        incar_old = Incar.from_file(previous_incar)
+        incar_new = Incar.from_file(directory / "INCAR")
+        if "ISTART" in incar_new or "ICHARG" in incar_new:
+            logging.info("ISTART or ICHARG set manually. Skipping warm-start.")
+            return {}
+
+        # the wavefunction and charge files are stored per-site and per-potential
+        # so these must be identical between the two calculations.
+        previous_structure = Structure.from_file(previous_poscar)
+        is_same_sites = [site.specie.symbol for site in previous_structure] == [
+            site.specie.symbol for site in structure
+        ]
+        is_same_potcar = (
+            previous_potcar.exists()
+            and new_potcar.exists()
+            and filecmp.cmp(previous_potcar, new_potcar, shallow=False)
+        )
+        if not is_same_sites or not is_same_potcar:
+            logging.info(
+                "Past calculation has different sites or POTCAR. "
+                "Skipping warm-start."
+            )
+            return {}
+
+        # KPOINTS is only written when KSPACING isn't used, so we just need
+        # both files to either be missing or identical
+        previous_kpoints = warm_start_directory / "KPOINTS"
+        new_kpoints = directory / "KPOINTS"
+        is_same_kpoints = (previous_kpoints.exists() == new_kpoints.exists()) and (
+            not new_kpoints.exists()
+            or filecmp.cmp(previous_kpoints, new_kpoints, shallow=False)
+        )
+        is_same_basis = is_same_kpoints and all(
+            incar_old.get(key) == incar_new.get(key)
+            for key in cls.wavecar_compatibility_keys
+        )
+
+        # empty files are written when LWAVE/LCHARG are False in some versions
+        # of VASP, so we check the file size as well.
+        def is_usable(filename: Path):
+            return filename.exists() and filename.stat().st_size > 0
+
+        previous_wavecar = warm_start_directory / "WAVECAR"
+        previous_chgcar = warm_start_directory / "CHGCAR"
+        if is_same_basis and is_usable(previous_wavecar):
+            filename = "WAVECAR"
+            new_settings = {"ISTART": 1}
+        elif is_usable(previous_chgcar):
+            filename = "CHGCAR"
+            new_settings = {"ICHARG": 1}
+        else:
+            logging.info("No compatible WAVECAR or CHGCAR found. Starting cold.")
+            return {}
+
+        shutil.copyfile(warm_start_directory / filename, directory / filename)
+
+        logging.info(f"Warm-starting from {filename} of {warm_start_directory}")
+        return new_settings
+
     @classmethod
     def setup_restart(cls, directory: Path, **kwargs):
         """
@@ -8,6 +8,7 @@ import numpy
 import plotly.graph_objects as plotly_go
 from plotly.subplots import make_subplots
 
+from simmate.calculators.vasp.inputs import Incar
 from simmate.toolkit import Structure
 from simmate.visualization.plotting import PlotlyFigure
 from simmate.workflow_engine import Workflow
@@ -58,27 +59,56 @@ class Relaxation__Vasp__Staged(Workflow):
         source: dict = None,
         directory: Path = None,
         copy_previous_directory: bool = False,
+        warm_start: bool = False,
         **kwargs,
     ):
+        """
+        Runs each subworkflow one after another, where each stage starts from
+        the final structure of the stage before it.
+
+        #### Parameters
+
+        - `warm_start`:
+            Whether to carry the WAVECAR/CHGCAR of each stage over to the next
+            one, so that electronic convergence does not start from scratch.
+            Files are only reused when compatible, and stages fall back to a
+            cold start otherwise. The file that was reused is stored in the
+            `warm_start_file` column of each stage. Note, this requires
+            every stage (except the last) to write its WAVECAR and CHGCAR,
+            which uses more disk space. Defaults to False.
+        """
 
         # Our first relaxation is directly from our inputs.
         current_task = cls.subworkflows[0]
+        current_directory = directory / current_task.name_full
         state = current_task.run(
             structure=structure,
             command=command,
-            directory=directory / current_task.name_full,
+            directory=current_directory,
+            **cls._get_warm_start_kwargs(warm_start, current_task),
         )
         result = state.result()
 
         # The remaining tasks continue and use the past results as an input
         for i, current_task in enumerate(cls.subworkflows[1:]):
+            previous_directory = current_directory
+            current_directory = directory / current_task.name_full
             state = current_task.run(
                 structure=result,  # this is the result of the last run
                 command=command,
-                directory=directory / current_task.name_full,
+                directory=current_directory,
+                **cls._get_warm_start_kwargs(
+                    warm_start,
+                    current_task,
+                    previous_directory,
+                ),
             )
             result = state.result()
 
+            if warm_start:
+                result.warm_start_file = cls._get_warm_start_file(current_directory)
+                result.save()
+
         # when updating the original entry, we want to use the data from the
         # final result.
         final_result = {
@@ -100,6 +130,40 @@ class Relaxation__Vasp__Staged(Workflow):
     def subworkflows(cls):
         return [get_workflow(name) for name in cls.subworkflow_names]
 
+    @classmethod
+    def _get_warm_start_kwargs(
+        cls,
+        warm_start: bool,
+        current_task,  # VaspWorkflow
+        previous_directory: Path = None,
+    ) -> dict:
+        """
+        Gives the extra parameters to pass to a subworkflow's `run` method
+        when warm-starting is requested.
+        """
+        if not warm_start:
+            return {}
+        kwargs = {}
+        # the last stage doesn't need to write files for anyone
+        if current_task != cls.subworkflows[-1]:
+            kwargs["_write_warm_start_files"] = True
+        # directory is saved as a string so metadata files remain readable
+        if previous_directory:
+            kwargs["_warm_start_directory"] = str(previous_directory)
+        return kwargs
+
+    @staticmethod
+    def _get_warm_start_file(directory: Path) -> str:
+        """
+        Gives the file (WAVECAR or CHGCAR) that a completed calculation was
+        warm-started from, or None if it was started cold.
+        """
+        incar = Incar.from_file(directory / "INCAR")
+        if incar.get("ISTART") == 1:
+            return "WAVECAR"
+        elif incar.get("ICHARG") == 1:
+            return "CHGCAR"
+
     @classmethod
     def get_series(cls, value: str, **filter_kwargs):
 
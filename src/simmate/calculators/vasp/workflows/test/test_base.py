@@ -2,6 +2,7 @@
 
 import pytest
 
+from simmate.calculators.vasp.inputs import Incar, Potcar
 from simmate.calculators.vasp.inputs.potcar_mappings import PBE_ELEMENT_MAPPINGS
 from simmate.calculators.vasp.workflows.base import VaspWorkflow
 from simmate.conftest import SimmateMockHelper, copy_test_files
@@ -33,7 +34,7 @@ DummyWorkflow = Testing__Vasp__Dummy
 
 def test_base_setup(structure, tmp_path, mocker):
 
-    Potcar = SimmateMockHelper.get_mocked_potcar(mocker, tmp_path)
+    MockedPotcar = SimmateMockHelper.get_mocked_potcar(mocker, tmp_path)
 
     # estabilish filenames that we make and commonly reference
     incar_filename = tmp_path / "INCAR"
@@ -45,7 +46,7 @@ def test_base_setup(structure, tmp_path, mocker):
     assert incar_filename.exists()
     assert poscar_filename.exists()
     assert potcar_filename.exists()
-    Potcar.to_file_from_type.assert_called_with(
+    MockedPotcar.to_file_from_type.assert_called_with(
         structure.composition.elements,
         "PBE",
         potcar_filename,
@@ -75,3 +76,67 @@ def test_base_vasp_run(structure, tmp_path, mocker):
         file.writelines(contents[50])
     with pytest.raises(Exception):
         DummyWorkflow.run(tmp_path)
+
+
+def test_base_setup_warm_start(structure, tmp_path, mocker):
+
+    # POTCARs aren't available, so we write the same dummy file each time
+    mocker.patch.object(
+        Potcar,
+        "to_file_from_type",
+        side_effect=lambda elements, functional, filename, mappings: (
+            filename.write_text("dummy potcar")
+        ),
+    )
+
+    # a past calculation that wrote its wavefunction and charge density
+    previous_directory = tmp_path / "previous"
+    previous_directory.mkdir()
+    DummyWorkflow.setup(
+        directory=previous_directory,
+        structure=structure,
+        _write_warm_start_files=True,
+    )
+    incar = Incar.from_file(previous_directory / "INCAR")
+    assert incar["LWAVE"] and incar["LCHARG"]
+    for filename in ["WAVECAR", "CHGCAR"]:
+        (previous_directory / filename).write_text(filename)
+
+    # identical settings reuse the WAVECAR
+    directory = tmp_path / "wavecar"
+    directory.mkdir()
+    DummyWorkflow.setup(
+        directory=directory,
+        structure=structure,
+        _warm_start_directory=previous_directory,
+    )
+    assert (directory / "WAVECAR").exists()
+    assert not (directory / "CHGCAR").exists()
+    assert Incar.from_file(directory / "INCAR")["ISTART"] == 1
+
+    # a different k-point mesh can only reuse the CHGCAR
+    mocker.patch.dict(DummyWorkflow.incar, {"KSPACING": 0.5})
+    directory = tmp_path / "chgcar"
+    directory.mkdir()
+    DummyWorkflow.setup(
+        directory=directory,
+        structure=structure,
+        _warm_start_directory=previous_directory,
+    )
+    assert not (directory / "WAVECAR").exists()
+    assert (directory / "CHGCAR").exists()
+    assert Incar.from_file(directory / "INCAR")["ICHARG"] == 1
+
+    # a different POTCAR falls back to a cold start
+    (previous_directory / "POTCAR").write_text("other potcar")
+    directory = tmp_path / "cold"
+    directory.mkdir()
+    DummyWorkflow.setup(
+        directory=directory,
+        structure=structure,
+        _warm_start_directory=previous_directory,
+    )
+    assert not (directory / "WAVECAR").exists()
+    assert not (directory / "CHGCAR").exists()
+    incar = Incar.from_file(directory / "INCAR")
+    assert "ISTART" not in incar and "ICHARG" not in incar
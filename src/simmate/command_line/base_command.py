@@ -4,17 +4,46 @@
 This defines the base "simmate" command that all other commands stem from.
 """
 
+import importlib
 import logging
 from pathlib import Path
 
 import typer
+from typer.core import TyperGroup
 
-from simmate.command_line.database import database_app
-from simmate.command_line.utilities import utilities_app
-from simmate.command_line.workflow_engine import workflow_engine_app
-from simmate.command_line.workflows import workflows_app
 
-simmate_app = typer.Typer(rich_markup_mode="markdown")
+class LazySubcommandGroup(TyperGroup):
+    """
+    A click group that only imports a group of subcommands when it is used.
+    For example, `simmate workflows run ...` never imports the `database`
+    commands. Subcommands are given as `name: "module.path:typer_app_name"`.
+
+    Note, anything that lists all commands (such as `simmate --help` or
+    tab-completion) will still import each of these modules, so the modules
+    themselves should keep their heavy imports within each command.
+    """
+
+    lazy_subcommands = {
+        "database": "simmate.command_line.database:database_app",
+        "workflows": "simmate.command_line.workflows:workflows_app",
+        "workflow-engine": "simmate.command_line.workflow_engine:workflow_engine_app",
+        "utilities": "simmate.command_line.utilities:utilities_app",
+    }
+
+    def list_commands(self, ctx) -> list[str]:
+        return super().list_commands(ctx) + list(self.lazy_subcommands.keys())
+
+    def get_command(self, ctx, name: str):
+        if name in self.lazy_subcommands and name not in self.commands:
+            module_name, app_name = self.lazy_subcommands[name].split(":")
+            module = importlib.import_module(module_name)
+            group = typer.main.get_group(getattr(module, app_name))
+            group.name = name
+            self.add_command(group, name)
+        return super().get_command(ctx, name)
+
+
+simmate_app = typer.Typer(rich_markup_mode="markdown", cls=LazySubcommandGroup)
 
 
 @simmate_app.callback(no_args_is_help=True)
@@ -124,9 +153,5 @@ def start_project():
     )
 
 
-# # All commands are organized into other files, so we need to manually register
-# # them to our base "simmate" command here.
-simmate_app.add_typer(database_app, name="database")
-simmate_app.add_typer(workflows_app, name="workflows")
-simmate_app.add_typer(workflow_engine_app, name="workflow-engine")
-simmate_app.add_typer(utilities_app, name="utilities")
+# All other commands are organized into other files, and they are registered
+# to our base "simmate" command by the LazySubcommandGroup above.
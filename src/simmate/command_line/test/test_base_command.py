@@ -1,8 +1,48 @@
 # -*- coding: utf-8 -*-
 
+import subprocess
+import sys
+
 from simmate.command_line.base_command import simmate_app
 
 
 def test_base_command(command_line_runner):
     result = command_line_runner.invoke(simmate_app, ["--help"])
     assert result.exit_code == 0
+    for subcommand in ["database", "workflows", "workflow-engine", "utilities"]:
+        assert subcommand in result.stdout
+
+
+# We run the command in a new python process so that modules imported by other
+# tests don't affect the result.
+HELP_SCRIPT = """
+import sys
+from simmate.command_line.base_command import simmate_app
+try:
+    simmate_app(["--help"], prog_name="simmate")
+except SystemExit:
+    pass
+heavy_modules = ["django.db", "pymatgen", "pandas", "plotly", "numpy", "requests"]
+print("IMPORTED:", [m for m in heavy_modules if m in sys.modules])
+"""
+
+
+def test_help_import_cost():
+    # `simmate --help` (as well as tab-completion) should never set up django
+    # or import the large scientific packages.
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", HELP_SCRIPT],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.strip().splitlines()[-1] == "IMPORTED: []"
+
+    # importtime gives lines such as...
+    #   import time: self [us] | cumulative | imported package
+    total_time = sum(
+        int(line.split("|")[0].split(":")[1])
+        for line in result.stderr.splitlines()
+        if line.startswith("import time:") and "self [us]" not in line
+    )
+    assert total_time < 1.5e6  # microseconds
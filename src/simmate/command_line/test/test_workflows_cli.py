@@ -14,6 +14,9 @@ def test_workflows_list_all(command_line_runner):
     result = command_line_runner.invoke(workflows_app, ["list-all"])
     assert result.exit_code == 0
 
+    result = command_line_runner.invoke(workflows_app, ["list-all", "--rebuild"])
+    assert result.exit_code == 0
+
 
 def test_workflows_show_config(command_line_runner):
 
@@ -186,12 +186,21 @@ def explore():
 
 
 @workflows_app.command()
-def list_all():
+def list_all(rebuild: bool = False):
     """
     This lists off all available workflows.
+
+    - `--rebuild`: ignores the saved list of workflows and searches every
+    app again. This is only needed if a workflow you added is missing.
     """
 
-    from simmate.workflows.utilities import get_all_workflow_names
+    from simmate.workflows.utilities import (
+        get_all_workflow_names,
+        get_workflow_registry,
+    )
+
+    if rebuild:
+        get_workflow_registry(rebuild=True)
 
     print("These are the workflows that have been registerd:")
     all_workflows = get_all_workflow_names()
@@ -37,26 +37,29 @@ from simmate.database import connect
 # The settings (including the database) are all set up now, but django doesn't
 # actually connect to the database until a query is made. So here, we do a
 # very simple query that should work for any django database. We don't actaully
-# need the output. We just want make a call that establishes a connection.
+# need the output. We just want make a call that confirms the connection works.
 # Let's just use the ContentType table because it's typically small.
 from django.contrib.contenttypes.models import ContentType
+from simmate.database.utilities import reconnect_on_failure, reset_connections
 
-# and make a quick query
-ContentType.objects.count()
+# and make a quick query (retrying in case the database is briefly unavailable,
+# such as when many workers start at once)
+reconnect_on_failure(ContentType.objects.count)()
 
+# Tasks are run in a separate thread pool, where each thread opens its own
+# connection. The connection made above is therefore never used by tasks, so
+# we close it rather than hold it open for the lifetime of the worker.
+reset_connections()
 
 # --------------------------------------------------------------------------------------
 
-
-# BUG: do I want to make a connection first? It looks like if the connection
-# closes at any point, then all following tasks will fail -- that is, once
-# the connection closes, no following tasks reopen it. Maybe if I don't establish
-# the connection upfront, I can just let every task make their own.
-# The error I get is...
+# NOTE: We previously saw tasks fail with...
 #   Unexpected error: InterfaceError('connection already closed') dask
-# This has only happened when I submit >5,000 flow runs, so there may be too
-# many connections opened at that point. I'm not sure if that's actually the
-# case though.
+# when submitting >5,000 flow runs. Once a worker thread's connection closed,
+# every following task on that thread failed because nothing reopened it.
+# Tasks submitted with `batch_submit` are now run with
+# `run_with_fresh_connections`, which replaces broken or expired connections
+# between tasks (see the CONN_MAX_AGE and DATABASE_POOLER settings as well).
 
 # BUG: for scaling Dask to many workers, I initially ran into issues of "too many
 # files open". This is addressed in Dask's FAQ:
@@ -88,51 +91,3 @@ ContentType.objects.count()
 # files opened by the process. I believe zombie prefect runs are creating
 # a socket leak.
 #
-
-# --------------------------------------------------------------------------------------
-
-# THIS REPRESENTS A PLUGIN FOR A DASK WORKER. I MAY WANT TO SWITCH TO THIS APPROACH
-# IN THE FUTURE. See here: https://distributed.dask.org/en/latest/plugins.html
-
-# from dask.distributed import WorkerPlugin
-
-
-# class DjangoPlugin(WorkerPlugin):
-#     def setup(self, worker):
-
-#         print("PRELOADING DJANGO TO DASK WORKER")
-
-#         # First setup django settings for simmate
-#         from simmate.database import connect  # ensures setup
-
-#         # The settings (including the database) are all set up now, but django doesn't
-#         # actually connect to the database until a query is made. So here, we do a
-#         # very simple query that should work for any django database. We don't actaully
-#         # need the output. We just want make a call that establishes a connection.
-#         # Let's just use the ContentType table because it's typically small.
-#         from django.contrib.contenttypes.models import ContentType
-
-#         # and make a quick query
-#         ContentType.objects.count()
-
-#     def teardown(self, worker):
-
-#         print("SHUTING DOWN DASK WORKER CONNECTIONS TO DJANGO WORKER")
-
-#         # grab all of the existing database connections for this thread
-#         from django.db import connections
-
-#         # close all of these connections to prevent connection leaking
-#         connections.close_all()
-
-
-# REGISTER WITH....
-# # def dask_setup(scheduler):
-# #     plugin = DjangoPlugin()
-# #     client.register_worker_plugin(plugin)  # doctest: +SKIP
-# OR...
-# from dask.distributed import Client
-# client = Client(cluster.scheduler.address)
-# from simmate.configuration.dask.connect_to_database import DjangoPlugin
-# plugin = DjangoPlugin()
-# client.register_worker_plugin(plugin)
@@ -1,5 +1,7 @@
 # -*- coding: utf-8 -*-
 
+from functools import partial
+
 from dask.distributed import TimeoutError, wait
 
 from simmate.configuration.dask.client import get_dask_client
@@ -34,6 +36,10 @@ def batch_submit(
         The timelimit to wait for any given batch before cancelling the remaining
         runs. No error will be raised when jobs are cancelled. The default is
         no timelimit.
+
+    Each call is run with `run_with_fresh_connections`, so broken or expired
+    database connections are replaced between calls rather than failing all
+    of the calls that follow on the same worker.
     """
     # TODO: I'd like to support a list of kwargs as well
     # TODO: should I add an option to return the results?
@@ -41,11 +47,16 @@ def batch_submit(
     # grab the Dask client
     client = get_dask_client()
 
+    # This is a local import because django must be set up first
+    from simmate.database.utilities import run_with_fresh_connections
+
+    function_wrapped = partial(run_with_fresh_connections, function)
+
     # Iterate through our inputs and submit them to the Dask cluster in batches
     for i in range(0, len(args_list), batch_size):
         chunk = args_list[i : i + batch_size]
         futures = client.map(
-            function,
+            function_wrapped,
             chunk,
             pure=False,
         )
@@ -130,6 +130,34 @@ else:
         }
     }
 
+# Connection settings. When many workers (e.g. hundreds of SimmateWorkers or
+# Dask workers) share a single database, each one holding its own connection
+# can exceed the server's `max_connections`. We therefore support two setups:
+#   1. persistent connections that are reused for `CONN_MAX_AGE` seconds
+#      (set with the DATABASE_CONN_MAX_AGE env variable, where "None" means
+#      connections are never closed). Health checks are used so that stale
+#      connections are replaced rather than raising errors.
+#   2. an external connection pooler, such as PgBouncer or DigitalOcean's
+#      "connection pools" (set with DATABASE_POOLER=True). Poolers in
+#      transaction mode don't support server-side cursors, so these are
+#      disabled.
+# These keys can also be set directly in your database.yaml file instead.
+DATABASE_CONN_MAX_AGE = os.getenv("DATABASE_CONN_MAX_AGE", None)
+DATABASE_POOLER = os.getenv("DATABASE_POOLER", "False") == "True"
+# these are not typical Django settings
+
+for database_settings in DATABASES.values():
+    # sqlite does not benefit from connection reuse, as there is no server
+    if "sqlite3" in database_settings.get("ENGINE", ""):
+        continue
+    if DATABASE_CONN_MAX_AGE is not None:
+        database_settings["CONN_MAX_AGE"] = (
+            None if DATABASE_CONN_MAX_AGE == "None" else int(DATABASE_CONN_MAX_AGE)
+        )
+    database_settings.setdefault("CONN_HEALTH_CHECKS", True)
+    if DATABASE_POOLER:
+        database_settings["DISABLE_SERVER_SIDE_CURSORS"] = True
+
 # --------------------------------------------------------------------------------------
 
 # INSTALLED APPS
@@ -347,8 +375,11 @@ REST_FRAMEWORK = {
     # I can consider switching to LimitOffsetPagination in the future, which
     # allows the number of results per page to vary, but I don't do this
     # for now because there's no easy way to set paginator.max_limit in the
-    # settings here.
-    "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
+    # settings here. Our paginator is the same as PageNumberPagination except
+    # that it counts results using each table's `count_strategy`.
+    "DEFAULT_PAGINATION_CLASS": (
+        "simmate.website.core_components.pagination.SearchResultsPagination"
+    ),
     "PAGE_SIZE": 12,
     # To prevent users from querying too much and bringing down our servers,
     # we set a throttle rate on each user. Here, "anon" represents an anonymous
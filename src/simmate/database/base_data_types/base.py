@@ -8,7 +8,11 @@ See the `simmate.database.base_data_types` (which is the parent module of
 this one) for example usage.
 """
 
+import csv
+import hashlib
 import inspect
+import io
+import itertools
 import json
 import logging
 import shutil
@@ -19,6 +23,8 @@ from pathlib import Path
 
 import pandas
 import yaml
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
 from django.db import models  # , transaction
 from django.db import models as table_column
 from django.utils.module_loading import import_string
@@ -35,6 +41,16 @@ from rich.progress import track
 # Experts may find this annoying, so I'm sorry :(
 
 
+class EstimatedCount(int):
+    """
+    A count of results that is only an estimate (see `SearchResults.get_count`).
+    This behaves exactly like a normal integer, but has `is_estimate=True` so
+    that the website and REST API can label it as approximate.
+    """
+
+    is_estimate: bool = True
+
+
 class SearchResults(models.QuerySet):
     """
     This class adds some extra methods to the results returned from a database
@@ -193,6 +209,177 @@ class SearchResults(models.QuerySet):
         # we can now delete the csv file
         csv_filename.unlink()
 
+    def to_stream(
+        self,
+        format: str = "csv",
+        fieldnames: list[str] = None,
+        chunk_size: int = 2000,
+    ):
+        """
+        Converts the search results into a file format, one piece at a time.
+        Rows are read with a server-side cursor (where the database supports it),
+        so memory use stays the same however many results there are. This is
+        what the website uses for exporting tables, but it can also be used
+        to write large files:
+
+        ``` python
+        with open("my_results.csv", "w") as file:
+            for text in MyTable.objects.filter(...).to_stream("csv"):
+                file.write(text)
+        ```
+
+        #### Parameters
+
+        - `format`:
+            The output format. Options are...
+                - `csv`: comma-separated values with a header row
+                - `jsonl`: JSON-lines, where each row is a JSON object
+                - `columns`: JSON-lines, where each line is a JSON object of
+                  `chunk_size` rows that maps column names to lists of values.
+                  This loads faster into pandas and similar tools
+                  (e.g. `pandas.DataFrame(line)` for each line).
+
+        - `fieldnames`:
+            The columns to include. By default, all columns of the table are
+            used, where relations are given by their id (e.g. `spacegroup_id`)
+
+        - `chunk_size`:
+            The number of rows fetched from the database at a time. For the
+            `columns` format, this is also the number of rows per line.
+
+        #### Yields
+
+        Strings that, when joined, give the full file.
+        """
+
+        if format not in ["csv", "jsonl", "columns"]:
+            raise ValueError(
+                f"Unknown format '{format}'. Options are csv, jsonl, or columns"
+            )
+
+        if not fieldnames:
+            fieldnames = [field.attname for field in self.model._meta.concrete_fields]
+
+        # values_list skips building model objects, and iterator() prevents
+        # the queryset from caching every row.
+        rows = self.values_list(*fieldnames).iterator(chunk_size=chunk_size)
+
+        if format == "csv":
+            # the csv module only writes to files, so we use a buffer that is
+            # cleared after each row
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+
+            def write_row(values) -> str:
+                writer.writerow(values)
+                text = buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+                return text
+
+            yield write_row(fieldnames)
+            for row in rows:
+                yield write_row(
+                    [
+                        json.dumps(value, cls=DjangoJSONEncoder)
+                        if isinstance(value, (dict, list))
+                        else value
+                        for value in row
+                    ]
+                )
+
+        elif format == "jsonl":
+            for row in rows:
+                data = dict(zip(fieldnames, row))
+                yield json.dumps(data, cls=DjangoJSONEncoder) + "\n"
+
+        elif format == "columns":
+            for chunk in iter(lambda: list(itertools.islice(rows, chunk_size)), []):
+                data = dict(zip(fieldnames, map(list, zip(*chunk))))
+                yield json.dumps(data, cls=DjangoJSONEncoder) + "\n"
+
+    def get_count(self, strategy: str = None) -> int:
+        """
+        Counts the number of results, where the strategy can be chosen to
+        avoid slow COUNT queries on very large tables.
+
+        #### Parameters
+
+        - `strategy`:
+            How to count the results. Options are...
+                - `exact`: a normal (exact) COUNT query
+                - `cached`: an exact count that is saved in Django's cache
+                  for `count_cache_timeout` seconds. Results are keyed by
+                  the SQL of the query, so each set of filters is cached
+                  separately.
+                - `estimate`: the row estimate from the query planner,
+                  which is nearly instant but can be off by a good amount.
+                  This is only available for Postgres, so other databases
+                  use the `cached` strategy instead. Small estimates are
+                  replaced by exact counts because those are cheap.
+                - `none`: no count is made and None is returned
+            By default, the `count_strategy` of the table is used.
+
+        Estimates are given as an `EstimatedCount`, which is an integer with
+        `is_estimate=True`. You can check any count with
+        `getattr(count, "is_estimate", False)`.
+        """
+
+        strategy = strategy or self.model.count_strategy
+
+        if strategy == "exact":
+            return self.count()
+
+        elif strategy == "none":
+            return None
+
+        elif strategy == "estimate":
+            estimate = self._get_planner_estimate()
+            if estimate is not None:
+                return EstimatedCount(estimate) if estimate > 10_000 else self.count()
+            # otherwise we don't have postgres and use the cache below
+            return self.get_count(strategy="cached")
+
+        elif strategy == "cached":
+            # we import this here because the cache is only set up once
+            # django settings are configured
+            from django.core.cache import cache
+
+            sql, params = self.query.get_compiler(using=self.db).as_sql()
+            cache_key = (
+                "simmate-count-"
+                + hashlib.sha256(f"{self.db}|{sql}|{params}".encode()).hexdigest()
+            )
+            count = cache.get(cache_key)
+            if count is None:
+                count = self.count()
+                cache.set(cache_key, count, self.model.count_cache_timeout)
+            return count
+
+        else:
+            raise ValueError(
+                f"Unknown count strategy '{strategy}'. Options are 'exact', "
+                "'cached', 'estimate', or 'none'."
+            )
+
+    def _get_planner_estimate(self) -> int:
+        """
+        Gives the number of rows that Postgres' query planner expects this
+        query to return. Returns None for all other database backends.
+        """
+        connection = connections[self.db]
+        if connection.vendor != "postgresql":
+            return None
+
+        sql, params = self.query.get_compiler(using=self.db).as_sql()
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            plan = cursor.fetchone()[0]
+        # depending on the driver, the plan is given as a string or as json
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+
     def filter_by_tags(self, tags: list[str]):
         """
         A utility filter() method that
@@ -383,6 +570,19 @@ class DatabaseTable(models.Model):
     See the `api_filterset` property for the final filter object.
     """
 
+    count_strategy: str = "exact"
+    """
+    How the website and REST API count search results for this table. Tables
+    with millions of rows should use a faster strategy, such as "cached" or
+    "estimate". See `SearchResults.get_count` for all options.
+    """
+
+    count_cache_timeout: int = 300
+    """
+    When using the "cached" count strategy, this is how long (in seconds)
+    a count is reused before the query is counted again.
+    """
+
     exclude_from_summary: list[str] = []
     """
     When writing output summaries, these columns will be ignored. This is useful
@@ -122,6 +122,14 @@ class Calculation(DatabaseTable):
     any of those changes here.
     """
 
+    warm_start_file = table_column.CharField(max_length=25, blank=True, null=True)
+    """
+    If this calculation was warm-started from the files of a previous
+    calculation (e.g. reusing a WAVECAR between stages of a staged
+    relaxation), this is the file that was reused (WAVECAR or CHGCAR).
+    This is left empty when the calculation started cold.
+    """
+
     @classmethod
     def from_run_context(
         cls,
@@ -1,7 +1,10 @@
 # -*- coding: utf-8 -*-
 
+import json
+
 import pytest
 
+from simmate.database.base_data_types import SearchResults
 from simmate.website.test_app.models import TestDatabaseTable
 
 
@@ -44,6 +47,82 @@ def test_from_toolkit():
     assert isinstance(y, dict)
 
 
+@pytest.mark.django_db
+def test_get_count(mocker):
+    from django.core.cache import cache
+
+    cache.clear()
+    TestDatabaseTable.objects.bulk_create(
+        [TestDatabaseTable(column1=True, column2=n) for n in range(3)]
+    )
+    search_results = TestDatabaseTable.objects.filter(column2__gte=1)
+
+    assert search_results.get_count() == 2  # default is exact
+    assert search_results.get_count("none") is None
+
+    # cached counts are reused until the timeout, and each filter is separate
+    assert search_results.get_count("cached") == 2
+    TestDatabaseTable(column1=True, column2=5).save()
+    assert search_results.get_count("cached") == 2
+    assert TestDatabaseTable.objects.all().get_count("cached") == 4
+    assert search_results.get_count("exact") == 3
+
+    # sqlite has no planner estimate, so this uses the cache instead
+    assert search_results.get_count("estimate") == 2
+
+    # large estimates are labeled, while small ones are counted exactly
+    mocker.patch.object(SearchResults, "_get_planner_estimate", return_value=50_000)
+    count = search_results.get_count("estimate")
+    assert count == 50_000 and count.is_estimate
+    mocker.patch.object(SearchResults, "_get_planner_estimate", return_value=5)
+    count = search_results.get_count("estimate")
+    assert count == 3 and not getattr(count, "is_estimate", False)
+
+    # the default strategy is set by the table
+    mocker.patch.object(TestDatabaseTable, "count_strategy", "none")
+    assert search_results.get_count() is None
+
+    with pytest.raises(ValueError):
+        search_results.get_count("not-a-strategy")
+
+
+@pytest.mark.django_db
+def test_to_stream():
+    TestDatabaseTable.objects.bulk_create(
+        [TestDatabaseTable(column1=True, column2=n) for n in range(5)]
+    )
+    search_results = TestDatabaseTable.objects.order_by("column2")
+    fieldnames = ["column1", "column2"]
+
+    text = "".join(search_results.to_stream("csv", fieldnames))
+    assert text.splitlines() == ["column1,column2"] + [f"True,{n}.0" for n in range(5)]
+
+    lines = list(search_results.to_stream("jsonl", fieldnames))
+    assert len(lines) == 5
+    assert json.loads(lines[0]) == {"column1": True, "column2": 0}
+
+    # each line of the columns format holds one chunk of rows
+    lines = list(search_results.to_stream("columns", fieldnames, chunk_size=2))
+    assert len(lines) == 3
+    assert json.loads(lines[-1]) == {"column1": [True], "column2": [4]}
+
+    # all columns are given by default
+    header = next(search_results.to_stream("csv"))
+    assert (
+        header.strip().split(",")
+        == [
+            "id",
+            "created_at",
+            "updated_at",
+            "source",
+        ]
+        + fieldnames
+    )
+
+    with pytest.raises(ValueError):
+        next(search_results.to_stream("not-a-format"))
+
+
 @pytest.mark.django_db
 def test_archive():
 
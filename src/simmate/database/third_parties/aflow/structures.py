@@ -20,6 +20,8 @@ class AflowStructure(Structure, Thermodynamics):
     source_long = "The Automatic-FLOW for Materials Discovery"
     homepage = "http://www.aflowlib.org/"
     source_doi = "https://doi.org/10.1016/j.commatsci.2012.02.005"
+    # COUNT queries are slow on large tables, so we use an estimate instead
+    count_strategy = "estimate"
 
     id = table_column.CharField(max_length=25, primary_key=True)
     """
@@ -24,6 +24,8 @@ class CodStructure(Structure):
     homepage = "https://www.crystallography.net/cod/"
     source_doi = "https://doi.org/10.1107/S0021889809016690"
     remote_archive_link = "https://archives.simmate.org/CodStructure-2022-02-20.zip"
+    # COUNT queries are slow on large tables, so we use an estimate instead
+    count_strategy = "estimate"
 
     # These fields overwrite the default Structure fields due to a bug.
     chemical_system = table_column.TextField()
@@ -23,6 +23,8 @@ class JarvisStructure(Structure):
     homepage = "https://jarvis.nist.gov/"
     source_doi = "https://doi.org/10.1038/s41524-020-00440-1"
     remote_archive_link = "https://archives.simmate.org/JarvisStructure-2022-01-26.zip"
+    # COUNT queries are slow on large tables, so we use an estimate instead
+    count_strategy = "estimate"
 
     id = table_column.CharField(max_length=25, primary_key=True)
     """
@@ -37,6 +37,8 @@ class MatprojStructure(Structure, Thermodynamics):
     homepage = "https://materialsproject.org/"
     source_doi = "https://doi.org/10.1063/1.4812323"
     remote_archive_link = "https://archives.simmate.org/MatprojStructure-2022-08-27.zip"
+    # COUNT queries are slow on large tables, so we use an estimate instead
+    count_strategy = "estimate"
 
     id = table_column.CharField(max_length=25, primary_key=True)
     """
@@ -22,6 +22,8 @@ class OqmdStructure(Structure):
     homepage = "https://oqmd.org/"
     source_doi = "https://doi.org/10.1007/s11837-013-0755-4"
     remote_archive_link = "https://archives.simmate.org/OqmdStructure-2022-02-22.zip"
+    # COUNT queries are slow on large tables, so we use an estimate instead
+    count_strategy = "estimate"
 
     id = table_column.CharField(max_length=25, primary_key=True)
     """
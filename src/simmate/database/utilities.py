@@ -1,11 +1,21 @@
 # -*- coding: utf-8 -*-
 
+import contextlib
+import functools
 import logging
 import shutil
+import time
 from pathlib import Path
 
 from django.apps import apps
 from django.core.management import call_command
+from django.db import (
+    DatabaseError,
+    InterfaceError,
+    OperationalError,
+    close_old_connections,
+    connections,
+)
 
 from simmate.configuration.django.settings import DATABASES
 
@@ -131,6 +141,89 @@ def load_database_from_json(filename="database_dump.json"):
     )
 
 
+def reset_connections():
+    """
+    Closes all database connections of the current thread, including ones that
+    are broken. Django reopens a connection with the next query, so this is
+    how we reconnect after a connection is lost.
+    """
+    for connection in connections.all():
+        # closing a connection that the server already dropped can raise
+        # its own error, which we don't care about here
+        with contextlib.suppress(DatabaseError):
+            connection.close()
+
+
+def reconnect_on_failure(
+    function: callable = None,
+    max_retries: int = 3,
+    wait_time: float = 1,
+):
+    """
+    A decorator that reruns a function when its database connection fails
+    (e.g. "connection already closed" or the server restarting). Before each
+    retry, all connections are reset and we wait `wait_time` seconds, doubling
+    each time.
+
+    Only use this on functions that are safe to rerun, such as queries or
+    updates within a single transaction. Retries are also skipped when called
+    within an outer transaction, because reconnecting would lose its changes.
+
+    ``` python
+    @reconnect_on_failure
+    def get_queue_size():
+        return WorkItem.objects.filter(status="P").count()
+
+    @reconnect_on_failure(max_retries=10)
+    def save_result(workitem):
+        ...
+    ```
+    """
+
+    # allows use of the decorator with or without parameters
+    if function is None:
+        return functools.partial(
+            reconnect_on_failure,
+            max_retries=max_retries,
+            wait_time=wait_time,
+        )
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        for attempt in range(max_retries + 1):
+            try:
+                return function(*args, **kwargs)
+            except (InterfaceError, OperationalError) as error:
+                in_transaction = any(c.in_atomic_block for c in connections.all())
+                if attempt == max_retries or in_transaction:
+                    raise
+                logging.warning(
+                    f"Database connection failed ({error}). Reconnecting and "
+                    f"retrying (attempt {attempt + 1} of {max_retries})."
+                )
+                reset_connections()
+                time.sleep(wait_time * 2**attempt)
+
+    return wrapper
+
+
+def run_with_fresh_connections(function: callable, *args, **kwargs):
+    """
+    Runs a function while handling database connections in the same way as
+    Django does for each web request: connections that are broken or older
+    than `CONN_MAX_AGE` are closed both before and after the call.
+
+    This is meant for long-lived processes that run many tasks, such as Dask
+    workers, where a connection would otherwise stay open (or stay broken)
+    for the lifetime of the process.
+    """
+    close_old_connections()
+    try:
+        return function(*args, **kwargs)
+    finally:
+        close_old_connections()
+
+
 # BUG: This function isn't working as intended
 # def graph_database(filename="database_graph.png"):
 
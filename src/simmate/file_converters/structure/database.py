@@ -73,13 +73,21 @@ class DatabaseAdapter:
     #     return ...
 
     @staticmethod
-    def get_toolkit_from_database_dict(structure_dict: dict) -> ToolkitStructure:
+    def get_toolkit_from_database_dict(
+        structure_dict: dict,
+        database_object: DatabaseStructure = None,
+    ) -> ToolkitStructure:
         """
         Loads a structure from the Simmate database from a dictionary of
         metadata.
+
+        If the database entry for this dictionary was already loaded (e.g. as
+        part of a larger query), it can be given as `database_object` to
+        avoid querying the database again.
         """
 
-        database_object = DatabaseStructure.from_dict(structure_dict)
+        if database_object is None:
+            database_object = DatabaseStructure.from_dict(structure_dict)
 
         # In some cases, the structure we want is not within the calculation table.
         # For example, in relaxations the final structure is attached via
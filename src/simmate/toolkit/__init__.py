@@ -1,3 +1,24 @@
 # -*- coding: utf-8 -*-
 
-from .base_data_types import Composition, Structure
+# Structure and Composition pull in pymatgen, which is slow to import. We load
+# them on first use so that importing a light submodule (or the `simmate`
+# command) doesn't pay for this. `from simmate.toolkit import Structure` works
+# exactly as before.
+_lazy_attributes = {
+    "Composition": "simmate.toolkit.base_data_types",
+    "Structure": "simmate.toolkit.base_data_types",
+}
+
+__all__ = list(_lazy_attributes.keys())
+
+
+def __getattr__(name: str):
+    if name in _lazy_attributes:
+        import importlib
+
+        module = importlib.import_module(_lazy_attributes[name])
+        attribute = getattr(module, name)
+        # save the attribute so that this function isn't called again
+        globals()[name] = attribute
+        return attribute
+    raise AttributeError(f"module 'simmate.toolkit' has no attribute '{name}'")
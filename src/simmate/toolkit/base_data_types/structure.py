@@ -149,10 +149,13 @@ class Structure(PymatgenStructure):
     # the method is called -- rather than when this module is initially loaded.
 
     @classmethod
-    def from_database_dict(cls, structure: dict):
+    def from_database_dict(cls, structure: dict, database_object=None):
         from simmate.file_converters.structure.database import DatabaseAdapter
 
-        return DatabaseAdapter.get_toolkit_from_database_dict(structure)
+        return DatabaseAdapter.get_toolkit_from_database_dict(
+            structure,
+            database_object,
+        )
 
     @classmethod
     def from_database_object(cls, structure: dict):
@@ -1,7 +1,12 @@
 # -*- coding: utf-8 -*-
 
+import hashlib
 import logging
+import os
+import tempfile
+from pathlib import Path
 
+import numpy
 from numpy.random import choice, randint
 from rich.progress import track
 
@@ -15,6 +20,16 @@ from simmate.toolkit.symmetry.wyckoff import (
 
 
 class RandomWySites:
+
+    cache_directory: Path = Path.home() / "simmate" / "wyckoff_cache"
+    """
+    Where valid wyckoff combinations are cached on disk. Finding these is pure
+    combinatorics that only depends on the stoichiometry and spacegroup, yet
+    every new-individual workflow rebuilds this class in a fresh worker. We
+    therefore store each (stoichiometry, spacegroup) result as a compressed
+    numpy file that all workers can reuse. Set to None to disable the cache.
+    """
+
     def __init__(
         self,
         composition: Composition,
@@ -223,12 +238,12 @@ class RandomWySites:
             logging.info(
                 f"Generating possible wyckoff combinations for spacegroup {spacegroup}"
             )
-        sg_combo_data = findValidWyckoffCombos(self.stoichiometry, spacegroup)
+        sg_combo_data = self._get_wyckoff_combinations(spacegroup)
         if show_logging:
             logging.info("Done generating combinations.")
         # If the spacegroup + stoich combination has no valid combinations,
         # the generator will not work
-        if not sg_combo_data["ValidCombinations"]:
+        if not len(sg_combo_data["ValidCombinations"]):
             self.spacegroups_invalid.append(spacegroup)
             # we also need to update all the spacegroup_options now that we have
             # a new invalid one.
@@ -275,6 +290,145 @@ class RandomWySites:
         # exit the function -- true indicates we have a valid spacegroup
         return True
 
+    def _get_wyckoff_combinations(self, spacegroup: int) -> dict:
+        """
+        Gives the same output as `findValidWyckoffCombos`, but loads the result
+        from `cache_directory` when another worker has already computed it.
+
+        Files are keyed by the ordered stoichiometry, the spacegroup, and the
+        wyckoff data table. Note, the coords_gen_options are not part of the key
+        because they only affect how coordinates are sampled within the
+        asymmetric unit -- not which wyckoff combinations are valid.
+        """
+
+        if not self.cache_directory:
+            return findValidWyckoffCombos(self.stoichiometry, spacegroup)
+
+        cache_directory = Path(self.cache_directory)
+        cache_directory.mkdir(parents=True, exist_ok=True)
+
+        key = "|".join(
+            [
+                str(_WYCKOFF_DATA_HASH),
+                str(spacegroup),
+                *[str(nsites) for nsites in self.stoichiometry],
+            ]
+        )
+        key_hash = hashlib.sha256(key.encode()).hexdigest()
+        cached_filename = cache_directory / f"{key_hash}.npz"
+
+        if cached_filename.exists():
+            try:
+                return _load_wyckoff_combinations(cached_filename)
+            except Exception:
+                # a corrupted or outdated file -- we just recompute it below
+                logging.warning(f"Ignoring invalid wyckoff cache {cached_filename}")
+
+        sg_combo_data = findValidWyckoffCombos(self.stoichiometry, spacegroup)
+
+        # write to a temporary file and then move it into place. This keeps
+        # other workers from ever reading a partially-written file. The
+        # temporary file has a unique name, so threads and processes never
+        # write to the same one.
+        file_descriptor, temp_filename = tempfile.mkstemp(
+            suffix=".tmp",
+            dir=cache_directory,
+        )
+        try:
+            with os.fdopen(file_descriptor, "wb") as file:
+                _save_wyckoff_combinations(file, sg_combo_data)
+            os.replace(temp_filename, cached_filename)
+        except BaseException:
+            Path(temp_filename).unlink(missing_ok=True)
+            raise
+
+        return sg_combo_data
+
+
+class _CachedWyckoffCombinations:
+    """
+    A read-only list of wyckoff group combinations that is stored as a
+    padded integer array of shape (ncombos, nelements, max_groups_per_element).
+    Combinations are only converted back into tuples of wyckoff groups when
+    they are requested, so loading millions of combinations is cheap.
+    """
+
+    def __init__(self, combos: numpy.ndarray, groups: list[tuple]):
+        self.combos = combos
+        self.groups = groups
+
+    def __len__(self):
+        return len(self.combos)
+
+    def __getitem__(self, index):
+        return tuple(
+            tuple(self.groups[group_id] for group_id in element if group_id >= 0)
+            for element in self.combos[index]
+        )
+
+
+def _save_wyckoff_combinations(file, sg_combo_data: dict):
+    # Wyckoff groups are keys of (MultiplicityPrimitive, Availability) that
+    # point to the wyckoff site indices of the group. We replace each key with
+    # an integer id so that combinations can be stored as a single array.
+    groups = list(sg_combo_data["WyckoffGroups"].keys())
+    group_ids = {group: group_id for group_id, group in enumerate(groups)}
+    site_indices = [
+        numpy.asarray(sg_combo_data["WyckoffGroups"][group]) for group in groups
+    ]
+
+    valid_combos = sg_combo_data["ValidCombinations"]
+    nelements = len(valid_combos[0]) if valid_combos else 0
+    max_groups = max(
+        [len(element) for combo in valid_combos for element in combo],
+        default=0,
+    )
+    combos = numpy.full(
+        (len(valid_combos), nelements, max_groups),
+        fill_value=-1,
+        dtype=numpy.int16,
+    )
+    for i, combo in enumerate(valid_combos):
+        for j, element in enumerate(combo):
+            combos[i, j, : len(element)] = [group_ids[group] for group in element]
+
+    numpy.savez_compressed(
+        file,
+        combos=combos,
+        group_keys=numpy.array(groups, dtype=float).reshape(-1, 2),
+        group_sizes=numpy.array([len(i) for i in site_indices], dtype=int),
+        group_sites=numpy.concatenate(site_indices or [numpy.array([], dtype=int)]),
+    )
+
+
+def _load_wyckoff_combinations(filename: Path) -> dict:
+    with numpy.load(filename) as data:
+        group_keys = data["group_keys"]
+        group_sites = numpy.split(
+            data["group_sites"],
+            numpy.cumsum(data["group_sizes"])[:-1],
+        )
+        combos = data["combos"]
+    # restore the exact keys used by findValidWyckoffCombos, where the
+    # availability is either 1 or infinite
+    groups = [
+        (int(multiplicity), float(availability) if availability == numpy.inf else 1)
+        for multiplicity, availability in group_keys
+    ]
+    return {
+        "WyckoffGroups": dict(zip(groups, group_sites)),
+        "ValidCombinations": _CachedWyckoffCombinations(combos, groups),
+    }
+
+
+def _get_wyckoff_data_hash() -> str:
+    # cached files are invalidated whenever the wyckoff data table changes
+    datafile = Path(__file__).parents[2] / "symmetry" / "wyckoffdata.csv"
+    return hashlib.sha256(datafile.read_bytes()).hexdigest()[:16]
+
+
+_WYCKOFF_DATA_HASH = _get_wyckoff_data_hash()
+
 
 # Grab the boundry conditions for the asymmetric unit of a spacegroup's unitcell
 def asymmetric_unit_boundries(spacegroup, asym_data=loadAsymmetricUnitData()):
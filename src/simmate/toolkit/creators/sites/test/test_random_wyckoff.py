@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+
+from simmate.toolkit import Composition
+from simmate.toolkit.creators.sites.random_wyckoff import RandomWySites
+from simmate.toolkit.symmetry.wyckoff import findValidWyckoffCombos
+
+
+def test_wyckoff_combination_cache(tmp_path, mocker):
+
+    mocker.patch.object(RandomWySites, "cache_directory", tmp_path)
+    composition = Composition("Mg4Si4O12")
+
+    # the first creator writes the cache and a second one loads from it
+    for n in range(2):
+        creator = RandomWySites(composition)
+        combos = creator._get_wyckoff_combinations(spacegroup=62)
+        assert len(list(tmp_path.iterdir())) == 1
+
+    # the cached result must match a fresh calculation
+    expected = findValidWyckoffCombos([4, 4, 12], 62)
+    assert len(combos["ValidCombinations"]) == len(expected["ValidCombinations"])
+    assert [combos["ValidCombinations"][i] for i in range(3)] == [
+        expected["ValidCombinations"][i] for i in range(3)
+    ]
+    for group, sites in expected["WyckoffGroups"].items():
+        assert list(combos["WyckoffGroups"][group]) == list(sites)
+
+    # invalid spacegroups are cached too
+    assert not creator._setup_spacegroup_wyckoff_generator(225)
+    assert 225 in creator.spacegroups_invalid
+    assert len(list(tmp_path.iterdir())) == 2
+
+    # and wyckoff sites can be made from the cached combinations
+    species, coords = creator.new_sites(spacegroup=62)
+    assert len(species) == len(coords)
+    assert set(species) == set(composition.elements)
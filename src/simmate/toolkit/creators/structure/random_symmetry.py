@@ -1,7 +1,11 @@
 # -*- coding: utf-8 -*-
 
 import logging
+from timeit import default_timer as time
 
+import numpy
+import pandas
+from dask import bag
 from numpy.random import choice
 
 from simmate.toolkit import Composition, Structure
@@ -119,6 +123,10 @@ class RandomSymStructure(StructureCreator):
         # BUG: this requires all site and lattice creators to have a
         # spacegroup_options property.
 
+        # Keeps track of the number of attempts, successes, and total time
+        # spent on each spacegroup. See `get_spacegroup_stats` for a summary.
+        self.spacegroup_stats = {}
+
     def create_structure(self, spacegroup: int = None) -> Structure:
 
         # If a spacegroup is not specified, grab a random one from our options
@@ -127,6 +135,21 @@ class RandomSymStructure(StructureCreator):
         if not spacegroup:
             # randomly select a spacegroup
             spacegroup = choice(self.spacegroup_options)
+
+        start = time()
+        structure = self._create_structure(spacegroup)
+        self._update_spacegroup_stats(
+            {
+                spacegroup: dict(
+                    attempts=1,
+                    successes=1 if structure else 0,
+                    time=time() - start,
+                )
+            }
+        )
+        return structure
+
+    def _create_structure(self, spacegroup: int) -> Structure:
         logging.info(f"Creating structure with spacegroup {spacegroup}")
 
         # Use the lattice generator to make a starting lattice
@@ -276,7 +299,7 @@ class RandomSymStructure(StructureCreator):
                 # add the removed spacegroup to our list for reference
                 self.removed_spacegroups.append(spacegroup)
                 # and remove the spacegroup from our list of options
-                self.creator.spacegroup_options.remove(spacegroup)
+                self.spacegroup_options.remove(spacegroup)
         else:
             logging.info("Creation successful.")
 
@@ -307,3 +330,156 @@ class RandomSymStructure(StructureCreator):
         #     # BUG: might hit a recursion depth error
 
         return structure
+
+    def create_structures(
+        self,
+        n: int,
+        workers: int = 1,
+        spacegroup: int = None,
+        seed: int = None,
+        max_attempts: int = None,
+    ) -> list[Structure]:
+        """
+        Creates many structures at once, optionally spread over several
+        processes. Each process is given an independent random-number stream
+        so that no two workers create the same structures. Spacegroup stats
+        from all workers are added to `spacegroup_stats`.
+
+        #### Parameters
+
+        - `n`:
+            The number of structures to create.
+
+        - `workers`:
+            The number of processes to use. Defaults to 1, which runs
+            everything in the current process.
+
+        - `spacegroup`:
+            The spacegroup to use for all structures. If not given, a random
+            one is chosen for each structure (same as `create_structure`).
+
+        - `seed`:
+            Seeds the random-number streams for reproducible results. Note
+            that when a batch runs in the current process, numpy's global
+            generator is reseeded (even when no seed is given).
+
+        - `max_attempts`:
+            The maximum number of calls to `create_structure` (shared by all
+            workers). Because some spacegroups fail, we may need more attempts
+            than `n`. Defaults to 10 times `n`.
+
+        #### Returns
+
+        - `structures`:
+            A list of up to `n` structures. Fewer are returned if we reach
+            `max_attempts`.
+        """
+
+        max_attempts = max_attempts or n * 10
+
+        # We work in rounds, where each round splits the structures that are
+        # still needed (and the attempts that are still left) evenly between
+        # workers. Workers that finish their share early leave attempts
+        # unused, so these are given to the structures still needed in the
+        # next round. This way, a slow spacegroup in one worker's share never
+        # uses up the budget while other workers sit idle.
+        seed_sequence = numpy.random.SeedSequence(seed)
+        structures = []
+        nattempts = 0
+        while len(structures) < n and nattempts < max_attempts:
+
+            nremaining = n - len(structures)
+            round_workers = max(min(workers, nremaining), 1)
+            batch_sizes = numpy.array_split(range(nremaining), round_workers)
+            batch_attempts = numpy.array_split(
+                range(max_attempts - nattempts), round_workers
+            )
+            # every round is given new independent streams, so that no two
+            # batches ever create the same structures
+            seeds = seed_sequence.spawn(round_workers)
+            batches = [
+                (self, len(size), len(attempts), spacegroup, child_seed)
+                for size, attempts, child_seed in zip(
+                    batch_sizes, batch_attempts, seeds
+                )
+            ]
+
+            if round_workers == 1:
+                results = [_create_structures_batch(*batches[0])]
+            else:
+                results = (
+                    bag.from_sequence(batches, npartitions=round_workers)
+                    .starmap(_create_structures_batch)
+                    .compute(scheduler="processes", num_workers=round_workers)
+                )
+
+            for batch_structures, batch_stats, batch_attempts_used in results:
+                structures += batch_structures
+                nattempts += batch_attempts_used
+                # a single-process batch already updated our stats directly
+                if round_workers > 1:
+                    self._update_spacegroup_stats(batch_stats)
+
+        return structures
+
+    def _update_spacegroup_stats(self, new_stats: dict):
+        for spacegroup, stats in new_stats.items():
+            current_stats = self.spacegroup_stats.setdefault(
+                spacegroup,
+                dict(attempts=0, successes=0, time=0),
+            )
+            for key, value in stats.items():
+                current_stats[key] += value
+
+    def get_spacegroup_stats(self) -> pandas.DataFrame:
+        """
+        Gives a table of the number of attempts, successes, acceptance rate,
+        and average time per attempt (in seconds) for every spacegroup tried
+        so far.
+        """
+        stats = pandas.DataFrame.from_dict(self.spacegroup_stats, orient="index")
+        if stats.empty:
+            return stats
+        stats.index.name = "spacegroup"
+        stats["acceptance_rate"] = stats.successes / stats.attempts
+        stats["time_per_attempt"] = stats.time / stats.attempts
+        return stats.sort_index()
+
+
+def _create_structures_batch(
+    creator: RandomSymStructure,
+    n: int,
+    max_attempts: int,
+    spacegroup: int,
+    seed: numpy.random.SeedSequence,
+) -> tuple[list[Structure], dict, int]:
+    """
+    Creates a batch of structures within a single process. This is kept at the
+    module level so that it can be sent to other processes. Gives back the
+    structures, the spacegroup stats of this batch, and the number of
+    attempts used.
+    """
+
+    # all creators use numpy's global random state, so we seed it with
+    # this batch's independent stream
+    numpy.random.seed(seed.generate_state(4))
+
+    # only count the stats of this batch so they can be merged afterwards
+    initial_stats = {sg: stats.copy() for sg, stats in creator.spacegroup_stats.items()}
+
+    structures = []
+    attempts = 0
+    while len(structures) < n and attempts < max_attempts:
+        attempts += 1
+        structure = creator.create_structure(spacegroup)
+        if structure:
+            structures.append(structure)
+
+    batch_stats = {}
+    for sg, stats in creator.spacegroup_stats.items():
+        initial = initial_stats.get(sg, {})
+        batch_stats[sg] = {
+            key: value - initial.get(key, 0) for key, value in stats.items()
+        }
+
+    return structures, batch_stats, attempts
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+
+import numpy
+import pytest
+
+from simmate.toolkit import Composition
+from simmate.toolkit.creators.sites.random_wyckoff import RandomWySites
+from simmate.toolkit.creators.structure import random_symmetry
+from simmate.toolkit.creators.structure.random_symmetry import RandomSymStructure
+
+
+@pytest.fixture
+def creator(tmp_path, mocker):
+    mocker.patch.object(RandomWySites, "cache_directory", tmp_path)
+    return RandomSymStructure(Composition("Na2Cl2"))
+
+
+def test_create_structures_seed(creator):
+
+    # the same seed gives the same structures
+    structures_1 = creator.create_structures(n=3, seed=123)
+    structures_2 = creator.create_structures(n=3, seed=123)
+    assert len(structures_1) == 3
+    assert structures_1 == structures_2
+
+    structures_3 = creator.create_structures(n=3, seed=124)
+    assert structures_1 != structures_3
+
+
+def test_create_structures_streams(creator):
+
+    # each worker is given an independent stream, so batches never repeat
+    # each other's structures
+    seeds = numpy.random.SeedSequence(123).spawn(2)
+    batch_1, _, _ = random_symmetry._create_structures_batch(
+        creator, 3, 30, None, seeds[0]
+    )
+    batch_2, _, _ = random_symmetry._create_structures_batch(
+        creator, 3, 30, None, seeds[1]
+    )
+    assert len(batch_1) == len(batch_2) == 3
+    for structure in batch_1:
+        assert structure not in batch_2
+
+
+def test_get_spacegroup_stats(creator, mocker):
+
+    assert creator.get_spacegroup_stats().empty
+
+    spy = mocker.spy(creator, "_create_structure")
+    structures = creator.create_structures(n=4, seed=123)
+    creator.create_structure(spacegroup=225)
+
+    stats = creator.get_spacegroup_stats()
+    assert stats.attempts.sum() == spy.call_count
+    assert stats.successes.sum() == len(structures) + 1
+    assert stats.loc[225].attempts >= 1
+    assert (stats.acceptance_rate == stats.successes / stats.attempts).all()
+    assert (stats.time_per_attempt == stats.time / stats.attempts).all()
+
+
+def test_create_structures_shared_attempts(creator, mocker):
+
+    # run the worker batches in this process rather than with dask
+    class SerialBag:
+        def __init__(self, batches):
+            self.batches = batches
+
+        def starmap(self, function):
+            self.function = function
+            return self
+
+        def compute(self, **kwargs):
+            return [self.function(*batch) for batch in self.batches]
+
+    mocker.patch.object(
+        random_symmetry.bag,
+        "from_sequence",
+        side_effect=lambda batches, **kwargs: SerialBag(batches),
+    )
+
+    # The first worker's share of the attempts all fail, while the second
+    # finishes early. Its unused attempts should go to the structures that
+    # are still needed, rather than being lost.
+    ncalls = 0
+
+    def create_structure(spacegroup):
+        nonlocal ncalls
+        ncalls += 1
+        return "structure" if ncalls > 5 else False
+
+    mocker.patch.object(creator, "create_structure", side_effect=create_structure)
+
+    structures = creator.create_structures(n=4, workers=2, max_attempts=10)
+    assert len(structures) == 4
+    assert ncalls == 9
+
+    # the budget is never exceeded
+    ncalls = -100
+    structures = creator.create_structures(n=4, workers=2, max_attempts=10)
+    assert structures == []
+    assert ncalls == -90
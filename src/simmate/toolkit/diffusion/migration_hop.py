@@ -43,7 +43,7 @@ class MigrationHop(PymatgenMigrationHop):
         return migration_hop_cleaned
 
     @classmethod
-    def from_database_dict(cls, migration_hop: dict):
+    def from_database_dict(cls, migration_hop: dict, database_object=None):
         """
         This is an experimental feature. The code here is a repurposing of
         Structre.from_dynamic so consider making a general class for
@@ -56,20 +56,25 @@ class MigrationHop(PymatgenMigrationHop):
             }
         """
 
-        # Imports are done locally to keep this class modular.
-        from django.utils.module_loading import import_string
+        # the database entry may have already been loaded (e.g. as part of a
+        # larger query), in which case we skip querying it again
+        if database_object is not None:
+            migration_hop_db = database_object
+        else:
+            # Imports are done locally to keep this class modular.
+            from django.utils.module_loading import import_string
 
-        from simmate.database import connect
-        from simmate.website.workflows import models as all_datatables
+            from simmate.database import connect
+            from simmate.website.workflows import models as all_datatables
 
-        datatable_str = migration_hop["database_table"]
+            datatable_str = migration_hop["database_table"]
 
-        if hasattr(all_datatables, datatable_str):
-            datatable = getattr(all_datatables, datatable_str)
-        else:
-            datatable = import_string(datatable_str)
-        # for now I only support migration_hop_id
-        migration_hop_db = datatable.objects.get(id=migration_hop["database_id"])
+            if hasattr(all_datatables, datatable_str):
+                datatable = getattr(all_datatables, datatable_str)
+            else:
+                datatable = import_string(datatable_str)
+            # for now I only support migration_hop_id
+            migration_hop_db = datatable.objects.get(id=migration_hop["database_id"])
         migration_hop_cleaned = migration_hop_db.to_migration_hop_toolkit()
         migration_hop_cleaned.database_object = migration_hop_db
 
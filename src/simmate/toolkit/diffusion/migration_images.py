@@ -1,10 +1,15 @@
 # -*- coding: utf-8 -*-
 
 import numpy
+from scipy.spatial import cKDTree
 from pymatgen.analysis.diffusion.neb.pathfinder import DistinctPathFinder, IDPPSolver
 from pymatgen.analysis.diffusion.neb.pathfinder import (
     MigrationHop as PymatgenMigrationHop,
 )
+from pymatgen.analysis.diffusion.utils.supercells import (
+    get_sc_fromstruct,
+    get_start_end_structures,
+)
 
 from simmate.toolkit import Structure
 
@@ -66,39 +71,45 @@ class MigrationImages(list):
         #### Parameters
 
         - `tolerance`:
-            the angle and distance tolerance to consider fractional coordinates
-            as matching. Matching sites will be merged as 1 site in the final
-            sum structure.
+            the tolerance to consider fractional coordinates as matching. Two
+            sites match when every fractional coordinate is within this
+            tolerance (accounting for periodic boundaries). Matching sites will
+            be merged as 1 site in the final sum structure, where the first
+            site found is kept.
         """
 
-        # OPTIMIZE: this is very inefficient. It's much faster to visualize
-        # structures with MigrationHop class because you know which atom is
-        # moving. Here, we need to treat all atoms as moving. We can also
-        # speed this up by only looking at diffusing species too.
-        final_coords = []
-        final_species = []
-        for structure in self:  # recall self is a list of structures
-            for site in structure:
-                is_new = True
-                for coords in final_coords:
-                    if all(
-                        numpy.isclose(
-                            site.frac_coords,
-                            coords,
-                            rtol=tolerance,
-                            atol=tolerance,
-                        )
-                    ):
-                        is_new = False
-                        break
-                if is_new:
-                    final_coords.append(site.frac_coords)
-                    final_species.append(site.specie)
+        # Rather than comparing every site to all sites kept so far, we gather
+        # all sites from all images and use a KD-tree to find every pair of
+        # matching sites at once. The tree uses wrapped fractional coordinates
+        # with a periodic box, so sites on opposite faces of the cell (e.g. 0.0
+        # and 0.9999) are also matched.
+        all_coords = numpy.concatenate([structure.frac_coords for structure in self])
+        all_species = [site.specie for structure in self for site in structure]
+
+        # cKDTree requires all coordinates to be within [0, 1). Note, the modulo
+        # can give 1.0 exactly for tiny negative values due to rounding.
+        wrapped_coords = all_coords % 1
+        wrapped_coords[wrapped_coords >= 1] = 0
+
+        tree = cKDTree(wrapped_coords, boxsize=1)
+        pairs = tree.query_pairs(r=tolerance, p=numpy.inf, output_type="ndarray")
+
+        # A site is kept unless it matches an earlier site that was also kept.
+        # query_pairs gives pairs with i < j, so we only need to go through
+        # the sites that have an earlier match -- in order.
+        is_new = numpy.ones(len(all_coords), dtype=bool)
+        if len(pairs):
+            pairs = pairs[numpy.lexsort((pairs[:, 0], pairs[:, 1]))]
+            later_sites, split_indices = numpy.unique(pairs[:, 1], return_index=True)
+            earlier_sites = numpy.split(pairs[:, 0], split_indices[1:])
+            for site, matches in zip(later_sites, earlier_sites):
+                if is_new[matches].any():
+                    is_new[site] = False
 
         structure = Structure(
-            lattice=structure.lattice,
-            species=final_species,
-            coords=final_coords,
+            lattice=self[-1].lattice,
+            species=[specie for specie, keep in zip(all_species, is_new) if keep],
+            coords=all_coords[is_new],
         )
 
         return structure
@@ -160,6 +171,7 @@ class MigrationImages(list):
         min_nsites: int = 80,
         max_nsites: int = 240,
         min_length: int = 10,
+        supercell_matrix: list[list[int]] = None,
         **kwargs,
     ):
         """
@@ -186,15 +198,36 @@ class MigrationImages(list):
             The minimum length for each vector in the supercell structure.
             The default is 10 Angstroms.
 
+        - `supercell_matrix`:
+            The supercell matrix to use for the start/end structures. If not
+            given, it is determined from the bulk structure (see
+            `get_supercell_matrix`). Hops from the same structure share the
+            same supercell matrix, so this lets you avoid recomputing it.
+
         - `**kwargs`:
             Any arguments that are normally accepted by IDPPSolver
         """
+
+        # Finding the supercell matrix is the slowest part of making the
+        # endpoints, and it is the same for all hops in a structure. We
+        # therefore split pymatgen's `get_sc_structures` into its two steps
+        # so that the matrix can be cached and reused.
+        base_structure = cls._get_base_structure(migration_hop, vacancy_mode)
+        if supercell_matrix is None:
+            supercell_matrix = cls.get_supercell_matrix(
+                base_structure,
+                min_nsites=min_nsites,
+                max_nsites=max_nsites,
+                min_length=min_length,
+            )
+
         # The third thing returned is the bulk_supercell which we don't need.
-        start_supercell, end_supercell, _ = migration_hop.get_sc_structures(
+        start_supercell, end_supercell, _ = get_start_end_structures(
+            migration_hop.isite,
+            migration_hop.esite,
+            base_structure,
+            supercell_matrix,
             vac_mode=vacancy_mode,
-            min_atoms=min_nsites,
-            max_atoms=max_nsites,
-            min_length=min_length,
         )
 
         # calculate the number of images required
@@ -290,6 +323,7 @@ class MigrationImages(list):
         structure: Structure,
         migrating_specie: str,
         pathfinder_kwargs: dict = {},
+        parallel: bool = False,
         **kwargs,
     ):
         """
@@ -310,9 +344,61 @@ class MigrationImages(list):
             Any arguments that are normally accepted by DistinctPathFinder, but
             given as a dictionary. The default is {}.
 
+        - `parallel`:
+            Whether to convert each pathway on a separate Dask worker. The
+            default is False. See `iter_from_structure` for more.
+
         - `**kwargs`:
             Any arguments that are normally accepted by `from_migration_hop`.
         """
+        # The iterator gives back paths as they finish, so we put them back
+        # in the order that the pathfinder gave them.
+        results = cls.iter_from_structure(
+            structure=structure,
+            migrating_specie=migrating_specie,
+            pathfinder_kwargs=pathfinder_kwargs,
+            parallel=parallel,
+            ordered=True,
+            **kwargs,
+        )
+        return [migration_path for _, migration_path in results]
+
+    @classmethod
+    def iter_from_structure(
+        cls,
+        structure: Structure,
+        migrating_specie: str,
+        pathfinder_kwargs: dict = {},
+        parallel: bool = False,
+        ordered: bool = False,
+        **kwargs,
+    ):
+        """
+        The same as `from_structure`, but this is a generator that yields
+        `(pathway_index, MigrationImages)` tuples as each pathway finishes.
+        This is useful when screening many structures, where you may want to
+        start writing inputs before all pathways are done.
+
+        The supercell matrix is only found once and then shared by every hop
+        in the structure, which is typically the slowest step.
+
+        #### Parameters
+
+        - `structure`, `migrating_specie`, `pathfinder_kwargs`, `**kwargs`:
+            See `from_structure`
+
+        - `parallel`:
+            Whether to submit each pathway to Dask (via `get_dask_client`)
+            rather than converting them one at a time. By default, this
+            starts a local cluster with one process per core. If a Dask
+            client already exists, that client is used instead. Note, when
+            using a process pool from a script, be sure to place your code
+            within an `if __name__ == "__main__":` block. The default is False.
+
+        - `ordered`:
+            Whether to yield results in the same order as the pathfinder
+            gives them (rather than as they finish). The default is False.
+        """
         # convert to the LLL reduced primitive cell to make it as cubic as possible
         structure_lll = structure.get_sanitized_structure()
 
@@ -326,19 +412,113 @@ class MigrationImages(list):
             **pathfinder_kwargs,
         )
         pathways = pathfinder.get_paths()
+        if not pathways:
+            return
+
+        # All hops in this structure share the same supercell, so we find it
+        # once up front and pass it to each conversion.
+        if "supercell_matrix" not in kwargs:
+            kwargs["supercell_matrix"] = cls.get_supercell_matrix(
+                cls._get_base_structure(
+                    pathways[0],
+                    kwargs.get("vacancy_mode", True),
+                ),
+                min_nsites=kwargs.get("min_nsites", 80),
+                max_nsites=kwargs.get("max_nsites", 240),
+                min_length=kwargs.get("min_length", 10),
+            )
+
+        # Now go through each path and convert to a MigrationPath.
+        if not parallel:
+            for index, pathway in enumerate(pathways):
+                yield index, cls.from_migration_hop(migration_hop=pathway, **kwargs)
+            return
+
+        # we import dask here because it is slow to import and not needed
+        # in serial mode
+        from dask.distributed import as_completed
+
+        from simmate.configuration.dask import get_dask_client
+
+        client = get_dask_client()
+        futures = [
+            client.submit(
+                _from_migration_hop,
+                cls,
+                index,
+                pathway,
+                kwargs,
+                pure=False,
+            )
+            for index, pathway in enumerate(pathways)
+        ]
 
-        # Now go through each path and convert to a MigrationPath. We return
-        # these as a list of paths.
-        migration_paths = []
-        for pathway in pathways:
+        if ordered:
+            for future in futures:
+                yield future.result()
+        else:
+            for future in as_completed(futures):
+                yield future.result()
+
+    _supercell_matrix_cache: dict = {}
+    """
+    Supercell matrices that have already been found by `get_supercell_matrix`,
+    keyed by the lattice, number of sites, and supercell settings.
+    """
 
-            migration_path = cls.from_migration_hop(
-                migration_hop=pathway,
-                **kwargs,
+    @classmethod
+    def get_supercell_matrix(
+        cls,
+        base_structure: Structure,
+        min_nsites: int = 80,
+        max_nsites: int = 240,
+        min_length: int = 10,
+    ) -> list[list[int]]:
+        """
+        Gives the supercell matrix that should be used for the start/end
+        supercells of a pathway. This uses pymatgen's `get_sc_fromstruct` but
+        caches the result. The matrix only depends on the lattice and number
+        of sites, so all hops within a structure give the same result.
+
+        #### Parameters
+
+        - `base_structure`:
+            The bulk structure that the supercell is made from. For vacancy
+            diffusion, this is the full structure. For interstitial diffusion,
+            this is the host lattice without the migrating ions.
+
+        - `min_nsites`, `max_nsites`, `min_length`:
+            See `from_migration_hop`
+        """
+        key = (
+            numpy.round(base_structure.lattice.matrix, 6).tobytes(),
+            base_structure.num_sites,
+            min_nsites,
+            max_nsites,
+            min_length,
+        )
+        if key not in cls._supercell_matrix_cache:
+            cls._supercell_matrix_cache[key] = get_sc_fromstruct(
+                base_struct=base_structure,
+                min_atoms=min_nsites,
+                max_atoms=max_nsites,
+                min_length=min_length,
             )
-            migration_paths.append(migration_path)
+        return cls._supercell_matrix_cache[key]
 
-        return migration_paths
+    @staticmethod
+    def _get_base_structure(
+        migration_hop: PymatgenMigrationHop,
+        vacancy_mode: bool,
+    ) -> Structure:
+        # This is copied from pymatgen's MigrationHop.get_sc_structures
+        migrating_sites, other_sites = migration_hop._split_migrating_and_other_sites(
+            vacancy_mode
+        )
+        if vacancy_mode:
+            return Structure.from_sites(other_sites + migrating_sites)
+        else:
+            return Structure.from_sites(other_sites)
 
     @classmethod
     def from_dynamic(cls, migration_images):
@@ -370,3 +550,14 @@ class MigrationImages(list):
 
     def as_dict(self):
         return [s.as_dict() for s in self]
+
+
+def _from_migration_hop(
+    cls: MigrationImages,
+    index: int,
+    migration_hop: PymatgenMigrationHop,
+    kwargs: dict,
+) -> tuple[int, MigrationImages]:
+    # Dask workers need a module-level function to call. We return the index
+    # too so that results can be matched to their pathway as they finish.
+    return index, cls.from_migration_hop(migration_hop=migration_hop, **kwargs)
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+
+import numpy
+import pytest
+
+from simmate.toolkit import Structure
+from simmate.toolkit.diffusion import MigrationImages
+from simmate.toolkit.diffusion.utilities import clean_start_end_images
+
+
+def get_sum_structure_legacy(images, tolerance=1e-3):
+    # copy of the original (loop-based) MigrationImages.get_sum_structure
+    final_coords = []
+    final_species = []
+    for structure in images:
+        for site in structure:
+            is_new = True
+            for coords in final_coords:
+                if all(
+                    numpy.isclose(
+                        site.frac_coords, coords, rtol=tolerance, atol=tolerance
+                    )
+                ):
+                    is_new = False
+                    break
+            if is_new:
+                final_coords.append(site.frac_coords)
+                final_species.append(site.specie)
+    return final_species, numpy.array(final_coords)
+
+
+@pytest.fixture
+def endpoints(sample_structures):
+    # make a vacancy in a NaCl supercell and then hop a neighboring Na into it
+    supercell = sample_structures["NaCl_mp-22862_primitive"] * 3
+    supercell.perturb(0.01)
+    na_indices = supercell.indices_from_symbol("Na")
+    vacancy_coords = supercell[na_indices[0]].frac_coords
+    supercell.remove_sites([na_indices[0]])
+
+    start = supercell.copy()
+    end = supercell.copy()
+    moving_index = end.indices_from_symbol("Na")[0]
+    end.replace(moving_index, "Na", vacancy_coords)
+    return start, end, moving_index
+
+
+def test_get_sum_structure(endpoints):
+
+    start, end, _ = endpoints
+    images = MigrationImages([start, end])
+
+    sum_structure = images.get_sum_structure()
+    legacy_species, legacy_coords = get_sum_structure_legacy(images)
+
+    # every site in the host is shared, so we only gain the single moving site
+    assert len(sum_structure) == len(start) + 1
+    assert sum_structure.species == legacy_species
+    assert numpy.allclose(sum_structure.frac_coords, legacy_coords)
+
+    # sites on opposite faces of the cell are the same site
+    structure = Structure(
+        lattice=start.lattice,
+        species=["Na", "Cl"],
+        coords=[[0, 0, 0], [0.5, 0.5, 0.5]],
+    )
+    shifted = structure.copy()
+    shifted.translate_sites([0], [-1e-5, 0, 0], to_unit_cell=True)
+    sum_structure = MigrationImages([structure, shifted]).get_sum_structure()
+    assert len(sum_structure) == 2
+
+
+def test_clean_start_end_images(endpoints):
+
+    start, end, moving_index = endpoints
+
+    # shuffle the ending structure so that site order no longer matches
+    order = numpy.random.permutation(len(end))
+    end = Structure.from_sites([end[i] for i in order])
+
+    start_new, end_new = clean_start_end_images(start, end)
+
+    assert len(start_new) == len(end_new) == len(start)
+    assert start_new[-1] == start[moving_index]
+    distances = [s1.distance(s2) for s1, s2 in zip(start_new, end_new)]
+    assert numpy.count_nonzero(distances) == 1
+    assert distances[-1] > 1
+
+    # the function fails if more than one site moves
+    end.translate_sites(list(range(len(end))), [0.1, 0, 0])
+    with pytest.raises(Exception):
+        clean_start_end_images(start, end)
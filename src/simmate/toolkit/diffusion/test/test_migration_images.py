@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+
+import numpy
+from dask.distributed import Client
+
+from simmate.toolkit.diffusion import MigrationImages
+from simmate.toolkit.diffusion import migration_images as migration_images_module
+
+
+def test_from_structure(sample_structures, mocker):
+    structure = sample_structures["NaCl_mp-22862_primitive"]
+    kwargs = dict(min_nsites=10, max_nsites=30, min_length=4)
+
+    # the supercell matrix is found once and shared by all hops
+    mocker.patch.dict(MigrationImages._supercell_matrix_cache, clear=True)
+    spy = mocker.spy(migration_images_module, "get_sc_fromstruct")
+    paths = MigrationImages.from_structure(
+        structure,
+        migrating_specie="Na",
+        pathfinder_kwargs=dict(max_path_length=6),
+        **kwargs,
+    )
+    assert len(paths) > 1
+    assert spy.call_count == 1
+
+    # the endpoints should match what pymatgen gives for each hop
+    structure_lll = structure.get_sanitized_structure()
+    hops = migration_images_module.DistinctPathFinder(
+        structure_lll,
+        migrating_specie="Na",
+        max_path_length=6,
+    ).get_paths()
+    for path, hop in zip(paths, hops):
+        start, end, _ = hop.get_sc_structures(
+            vac_mode=True,
+            min_atoms=10,
+            max_atoms=30,
+            min_length=4,
+        )
+        assert len(path) == MigrationImages.get_nimages(hop.length) + 2
+        assert numpy.allclose(path[0].frac_coords, start.frac_coords)
+        assert numpy.allclose(path[-1].lattice.matrix, end.lattice.matrix)
+
+    # the parallel mode streams the same paths back as they finish
+    with Client(processes=False, n_workers=2):
+        results = dict(
+            MigrationImages.iter_from_structure(
+                structure,
+                migrating_specie="Na",
+                pathfinder_kwargs=dict(max_path_length=6),
+                parallel=True,
+                **kwargs,
+            )
+        )
+    assert sorted(results) == list(range(len(paths)))
+    for index, path in results.items():
+        assert numpy.allclose(path[1].cart_coords, paths[index][1].cart_coords)
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 
 import numpy
+from pymatgen.optimization.neighbors import find_points_in_spheres
 
 from simmate.toolkit import Structure
 
@@ -26,41 +27,45 @@ def clean_start_end_images(
     # if numpy.count_nonzero(dists_orig) == 1:
     #     return structure_start, structure_end
 
-    base_structure = []
+    # For each starting site, find the first site in the ending structure that
+    # is within the tolerance (in Angstroms). Rather than comparing every pair
+    # of sites, we use pymatgen's periodic neighbor search, which bins
+    # sites into cells and only compares nearby ones.
+    lattice = structure_start.lattice
+    start_indices, end_indices, _, _ = find_points_in_spheres(
+        all_coords=lattice.get_cartesian_coords(structure_end.frac_coords),
+        center_coords=structure_start.cart_coords,
+        r=tolerance,
+        pbc=numpy.array([1, 1, 1], dtype=int),
+        lattice=lattice.matrix,
+    )
+    matches = {}
+    for i1, i2 in sorted(zip(start_indices, end_indices)):
+        matches.setdefault(i1, i2)
 
-    starting_indicies = []
-    ending_indicies = []
-    for i1, site1 in enumerate(structure_start):
-        found_match = False
-        for i2, site2 in enumerate(structure_end):
-            if site1.distance(site2) <= 0.001:
-                base_structure.append(site1)
-                found_match = True
-                starting_indicies.append(i1)
-                ending_indicies.append(i2)
-                break
-        # as a double-check, we keep track of the moving site
-        if not found_match:
-            moving_site_i = site1
+    base_structure = [structure_start[i1] for i1 in sorted(matches)]
+    starting_indicies = set(matches.keys())
+    ending_indicies = set(matches.values())
 
     # find the indicies of the start/end moving site
-    for i_start in range(len(structure_start)):
-        if i_start not in starting_indicies:
-            # make sure we have an agreement between the moving site found above and here
-            assert structure_start[i_start] == moving_site_i
-            break
-    for i_end in range(len(structure_end)):
-        if i_end not in ending_indicies:
-            moving_site_e = structure_end[i_end]
-            break
+    moving_starts = [
+        i for i in range(len(structure_start)) if i not in starting_indicies
+    ]
+    moving_ends = [i for i in range(len(structure_end)) if i not in ending_indicies]
+    # there should be exactly one moving site
+    if len(moving_starts) != 1 or not moving_ends:
+        raise Exception("Failed to order supercell sites properly")
+    moving_site_i = structure_start[moving_starts[0]]
+    moving_site_e = structure_end[moving_ends[0]]
 
     structure_start_new = Structure.from_sites(base_structure + [moving_site_i])
     structure_end_new = Structure.from_sites(base_structure + [moving_site_e])
 
-    # Make sure we successfully ordered the structure
-    dists_new = numpy.array(
-        [s2.distance(s1) for s1, s2 in zip(structure_start_new, structure_end_new)]
-    )
+    # Make sure we successfully ordered the structure. We only need to know
+    # which sites moved, so the minimum-image distance of each site is enough.
+    frac_diffs = structure_end_new.frac_coords - structure_start_new.frac_coords
+    frac_diffs -= numpy.round(frac_diffs)
+    dists_new = numpy.linalg.norm(lattice.get_cartesian_coords(frac_diffs), axis=1)
     if not numpy.count_nonzero(dists_new) == 1:
         raise Exception("Failed to order supercell sites properly")
 
@@ -5,10 +5,12 @@ import math
 import traceback
 from pathlib import Path
 
+import cloudpickle
 import numpy
 import pandas
 import plotly.express as plotly_express
 import plotly.graph_objects as plotly_go
+from django.db.models import Count, F, Max, Q
 from rich.progress import track
 
 from simmate.configuration.dask import get_dask_client
@@ -68,6 +70,22 @@ class FixedCompositionSearch(Calculation):
         blank=True,
     )
 
+    # A materialized summary of the search's progress. Stop conditions and
+    # steady-state checks are run constantly by many workers, so they read
+    # these columns instead of querying the individuals table. Values are
+    # updated incrementally as each new individual completes, and they are
+    # only fully recounted when the main search starts and at a slow interval
+    # after that (see `update_search_state` and `add_individual_to_search_state`).
+    nindividuals_completed = table_column.IntegerField(default=0)
+    nindividuals_completed_exact = table_column.IntegerField(default=0)
+    nindividuals_since_best = table_column.IntegerField(default=0)
+    best_fitness = table_column.FloatField(null=True, blank=True)
+    best_individual_id = table_column.IntegerField(null=True, blank=True)
+    best_finished_at = table_column.DateTimeField(null=True, blank=True)
+    # Individuals that finished at or before this time are already included
+    # in the last full recount, so they are skipped by incremental updates.
+    search_state_counted_until = table_column.DateTimeField(null=True, blank=True)
+
     # This is an optional an input for an expected structure in order to allow
     # creation of plots that show convergence vs. the expected. This is very
     # useful benchmarking and when the user has a target structure that they
@@ -115,18 +133,17 @@ class FixedCompositionSearch(Calculation):
     # -------------------------------------------------------------------------
 
     def check_stop_condition(self):
+        """
+        Checks whether the search is finished. This only reads the search state
+        stored on this row, so call `update_search_state` first if the row
+        may be outdated.
+        """
 
         # First, see if we have at least our minimum limit for *exact* structures.
         # "Exact" refers to the nsites of the structures. We want to ensure at
         # least N structures with the input/expected number of sites have been
         # calculated.
-        # {f"{self.fitness_field}__isnull"=False} # when I allow other fitness fxns
-        count_exact = self.individuals_datatable.objects.filter(
-            formula_full=self.composition,
-            workflow_name=self.subworkflow_name,
-            energy_per_atom__isnull=False,
-        ).count()
-        if count_exact < self.min_structures_exact:
+        if self.nindividuals_completed_exact < self.min_structures_exact:
             return False
 
         # Next, see if we've hit our maximum limit for structures.
@@ -134,8 +151,7 @@ class FixedCompositionSearch(Calculation):
         # only counting the number of successfully calculated individuals.
         # Nothing is done to stop those that are still running or to count
         # structures that failed to be calculated
-        # {f"{self.fitness_field}__isnull"=False} # when I allow other fitness fxns
-        if self.individuals_completed.count() > self.max_structures:
+        if self.nindividuals_completed > self.max_structures:
             logging.info(
                 "Maximum number of completed calculations hit "
                 f"(n={self.max_structures})."
@@ -146,15 +162,55 @@ class FixedCompositionSearch(Calculation):
         # "best" individual. If the number of new individuals calculated (without
         # any becoming the new "best") is greater than best_survival_cutoff, then
         # we can stop the search.
-        # grab the best individual for reference
-        best = self.best_individual
-
         # We need this if-statement in case no structures have completed yet.
-        if not best:
+        if self.best_individual_id is None:
             return False
 
-        # count the number of new individuals added AFTER the best one. If it is
-        # more than best_survival_cutoff, we stop the search.
+        if self.nindividuals_since_best > self.best_survival_cutoff:
+            logging.info(
+                "Best individual has not changed after "
+                f"{self.best_survival_cutoff} new individuals added."
+            )
+            return True
+        # If we reached this point, then we haven't hit a stop condition yet!
+        return False
+
+    def update_search_state(self):
+        """
+        Recalculates the search state columns (counts and the best individual)
+        from the individuals table and saves them to this row.
+
+        This is a full recount, so it is only needed when a search starts
+        (e.g. to pick up individuals from past searches) and occasionally
+        after that to correct any drift. Otherwise, the state is kept up to
+        date by `add_individual_to_search_state`.
+        """
+
+        # {f"{self.fitness_field}__isnull"=False} # when I allow other fitness fxns
+        counts = self.individuals_completed.aggregate(
+            completed=Count("id"),
+            completed_exact=Count("id", filter=Q(formula_full=self.composition)),
+            counted_until=Max("finished_at"),
+        )
+        counted_until = counts["counted_until"]
+
+        # Individuals can finish while we recount. We therefore limit all
+        # queries to those that finished before this point, and any that
+        # finish after are left to `add_individual_to_search_state`.
+        individuals_counted = self.individuals_completed
+        if counted_until:
+            individuals_counted = individuals_counted.filter(
+                finished_at__lte=counted_until
+            )
+
+        # grab the best individual for reference
+        best = (
+            individuals_counted.order_by(self.fitness_field)
+            .values("id", self.fitness_field, "finished_at")
+            .first()
+        )
+
+        # count the number of new individuals added AFTER the best one.
         # Note, we look at all structures that have an energy_per_atom greater
         # than 1meV/atom higher than the best structure. The +1meV ensures
         # we aren't prolonging the calculation for insignificant changes in
@@ -162,20 +218,132 @@ class FixedCompositionSearch(Calculation):
         # only counting completed calculations.
         # BUG: this filter needs to be updated to fitness_value and not
         # assume we are using energy_per_atom
-        num_new_structures_since_best = self.individuals.filter(
-            energy_per_atom__gt=best.energy_per_atom + self.convergence_cutoff,
-            finished_at__gte=best.finished_at,
-        ).count()
-        if num_new_structures_since_best > self.best_survival_cutoff:
-            logging.info(
-                "Best individual has not changed after "
-                f"{self.best_survival_cutoff} new individuals added."
+        nsince_best = 0
+        if best:
+            nsince_best = individuals_counted.filter(
+                energy_per_atom__gt=best[self.fitness_field] + self.convergence_cutoff,
+                finished_at__gte=best["finished_at"],
+            ).count()
+
+        self._update_search_state_columns(
+            nindividuals_completed=counts["completed"],
+            nindividuals_completed_exact=counts["completed_exact"],
+            nindividuals_since_best=nsince_best,
+            best_fitness=best[self.fitness_field] if best else None,
+            best_individual_id=best["id"] if best else None,
+            best_finished_at=best["finished_at"] if best else None,
+            search_state_counted_until=counted_until,
+        )
+
+    def add_individual_to_search_state(self, individual):
+        """
+        Incrementally updates the search state columns with a single newly
+        completed individual. Every update is a single atomic UPDATE query, so
+        this is safe to call from many workers at once.
+
+        Individuals that are already included in the last full recount (from
+        `update_search_state`) or that don't belong to this search are skipped.
+        """
+
+        fitness = getattr(individual, self.fitness_field)
+        if fitness is None:
+            return  # the individual did not complete
+
+        # make sure this individual would be included in `self.individuals`
+        composition = Composition(self.composition)
+        if (
+            individual.formula_reduced != composition.reduced_formula
+            or individual.nsites > composition.num_atoms
+            or individual.workflow_name != self.subworkflow_name
+        ):
+            return
+
+        search = type(self).objects.filter(id=self.id)
+        if individual.finished_at:
+            search = search.filter(
+                Q(search_state_counted_until__isnull=True)
+                | Q(search_state_counted_until__lt=individual.finished_at)
             )
-            return True
-        # If we reached this point, then we haven't hit a stop condition yet!
-        return False
 
-    def _check_singleshot_sources(self, directory: Path):
+        is_exact = individual.formula_full == self.composition
+        is_new = search.update(
+            nindividuals_completed=F("nindividuals_completed") + 1,
+            nindividuals_completed_exact=F("nindividuals_completed_exact")
+            + int(is_exact),
+        )
+        if not is_new:
+            self.refresh_from_db(fields=self._search_state_columns)
+            return
+
+        # either this is the new best individual (and our count restarts)...
+        is_new_best = search.filter(
+            Q(best_fitness__isnull=True) | Q(best_fitness__gt=fitness)
+        ).update(
+            best_fitness=fitness,
+            best_individual_id=individual.id,
+            best_finished_at=individual.finished_at,
+            nindividuals_since_best=0,
+        )
+        # ...or we count it if it is worse than the best (by the cutoff) and
+        # finished after the best. This matches the filters used in
+        # `update_search_state`
+        if not is_new_best:
+            search.filter(
+                best_fitness__lt=fitness - self.convergence_cutoff,
+                best_finished_at__lte=individual.finished_at,
+            ).update(nindividuals_since_best=F("nindividuals_since_best") + 1)
+
+        self.refresh_from_db(fields=self._search_state_columns)
+
+    def add_singleshot_results(self, workitems: list[WorkItem]) -> list[WorkItem]:
+        """
+        Adds the individuals from finished singleshot submissions to the search
+        state, and then gives back the workitems that are still pending or
+        running. Singleshot sources submit the subworkflow directly (rather
+        than through the new-individual workflow), so the main search loop
+        uses this to track their results.
+        """
+        if not workitems:
+            return []
+
+        workitem_ids = [workitem.id for workitem in workitems]
+        workitems_done = WorkItem.objects.filter(
+            id__in=workitem_ids,
+            status__in=["F", "E", "C"],
+        ).only("id", "status", "result_binary")
+
+        ids_done = set()
+        for workitem in workitems_done:
+            ids_done.add(workitem.id)
+            if workitem.status == "F":
+                individual = cloudpickle.loads(workitem.result_binary)
+                self.add_individual_to_search_state(individual)
+
+        return [workitem for workitem in workitems if workitem.id not in ids_done]
+
+    _search_state_columns = [
+        "nindividuals_completed",
+        "nindividuals_completed_exact",
+        "nindividuals_since_best",
+        "best_fitness",
+        "best_individual_id",
+        "best_finished_at",
+        "search_state_counted_until",
+    ]
+
+    def _update_search_state_columns(self, **columns):
+        # we only write the state columns so that we never overwrite settings
+        # that were changed elsewhere
+        for column, value in columns.items():
+            setattr(self, column, value)
+        type(self).objects.filter(id=self.id).update(**columns)
+
+    def _check_singleshot_sources(self, directory: Path) -> list[WorkItem]:
+        """
+        Submits all structures from the singleshot sources, skipping any that
+        were submitted before. Returns the submitted workitems, which should
+        be given to `add_singleshot_results` as they finish.
+        """
 
         # local imports to prevent circuluar import issues
         from simmate.toolkit.structure_prediction.evolution.workflows.utilities import (
@@ -190,6 +358,7 @@ class FixedCompositionSearch(Calculation):
         )
 
         composition = Composition(self.composition)
+        workitems = []
 
         if "third_parties" in self.singleshot_sources:
             structures_known = get_known_structures(
@@ -200,7 +369,7 @@ class FixedCompositionSearch(Calculation):
             logging.info(
                 f"Generated {len(structures_known)} structures from third-party databases"
             )
-            write_and_submit_structures(
+            workitems += write_and_submit_structures(
                 structures=structures_known,
                 foldername=directory / "from_third_parties",
                 workflow=self.subworkflow,
@@ -215,7 +384,7 @@ class FixedCompositionSearch(Calculation):
             logging.info(
                 f"Generated {len(structures_sub)} structures from substitutions"
             )
-            write_and_submit_structures(
+            workitems += write_and_submit_structures(
                 structures=structures_sub,
                 foldername=directory / "from_third_party_substituition",
                 workflow=self.subworkflow,
@@ -231,13 +400,15 @@ class FixedCompositionSearch(Calculation):
             logging.info(
                 f"Generated {len(structures_prototype)} structures from prototypes"
             )
-            write_and_submit_structures(
+            workitems += write_and_submit_structures(
                 structures=structures_prototype,
                 foldername=directory / "from_prototypes",
                 workflow=self.subworkflow,
                 workflow_kwargs=self.subworkflow_kwargs,
             )
 
+        return workitems
+
     def _init_steadystate_sources_to_db(self, steadystate_sources):
         composition = Composition(self.composition)
 
@@ -339,7 +510,7 @@ class FixedCompositionSearch(Calculation):
         # transformations from a database table require that we have
         # completed structures in the database. We want to wait until there's
         # a set amount before we start mutating the best. We check that here.
-        if self.individuals_completed.count() < self.nfirst_generation:
+        if self.nindividuals_completed < self.nfirst_generation:
             logging.info(
                 "Search hasn't finished nfirst_generation yet "
                 f"({self.nfirst_generation} individuals). "
@@ -377,22 +548,24 @@ class FixedCompositionSearch(Calculation):
             logger = logging.getLogger()
             logger.disabled = True
 
-            for n in range(nflows_to_submit):
-
-                # submit the workflow for the new individual. Note, the structure
-                # won't be evuluated until the job actually starts. This allows
-                # our validator to have the most current information available
-                # when starting the structure creation
-                state = StructurePrediction__Toolkit__NewIndividual.run_cloud(
-                    search_id=self.id,
-                    steadystate_source_id=source_db.id,
+            # submit the workflows for the new individuals. Note, the structure
+            # won't be evuluated until the job actually starts. This allows
+            # our validator to have the most current information available
+            # when starting the structure creation. We submit all of them
+            # at once, which uses a single bulk insert.
+            if nflows_to_submit > 0:
+                states = StructurePrediction__Toolkit__NewIndividual.run_cloud_many(
+                    [
+                        dict(search_id=self.id, steadystate_source_id=source_db.id)
+                        for n in range(nflows_to_submit)
+                    ]
                 )
 
-                # Attached the id to our source so we know how many
+                # Attached the ids to our source so we know how many
                 # associated jobs are running.
-                # NOTE: this is the WorkItem id and NOT the run_id!!!
-                source_db.workitem_ids.append(state.pk)
-                source_db.save()
+                # NOTE: these are the WorkItem ids and NOT the run_ids!!!
+                source_db.workitem_ids += [state.pk for state in states]
+                source_db.save(update_fields=["workitem_ids"])
 
             # reactivate logging
             logger.disabled = False
@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+
+from datetime import timedelta
+
+import cloudpickle
+import pytest
+from django.utils import timezone
+
+from simmate.database.base_data_types import Relaxation
+from simmate.toolkit.structure_prediction.evolution.database import (
+    FixedCompositionSearch,
+)
+from simmate.workflow_engine.execution import WorkItem
+
+
+@pytest.mark.django_db
+def test_search_state(sample_structures):
+
+    structure = sample_structures["NaCl_mp-22862_primitive"]
+    search = FixedCompositionSearch.objects.create(
+        composition=structure.composition.formula,
+        subworkflow_name="relaxation.vasp.staged",
+        fitness_field="energy_per_atom",
+        min_structures_exact=3,
+        max_structures=100,
+        best_survival_cutoff=2,
+        convergence_cutoff=0.001,
+    )
+
+    # no individuals yet
+    search.update_search_state()
+    assert search.nindividuals_completed == 0
+    assert not search.check_stop_condition()
+
+    # add individuals one at a time, where the 2nd is the best
+    start = timezone.now()
+    individuals = []
+    for n, energy in enumerate([-1, -2, -1.5, -1.9, -0.5]):
+        individual = Relaxation.from_toolkit(
+            structure=structure,
+            energy_per_atom=energy,
+            workflow_name="relaxation.vasp.staged",
+            finished_at=start + timedelta(minutes=n),
+        )
+        individual.save()
+        individuals.append(individual)
+        search.add_individual_to_search_state(individual)
+
+    assert search.nindividuals_completed == 5
+    assert search.nindividuals_completed_exact == 5
+    assert search.best_individual_id == individuals[1].id
+    assert search.best_fitness == -2
+    assert search.nindividuals_since_best == 3
+    assert search.check_stop_condition()
+
+    # a full refresh from the individuals table should match
+    search_db = FixedCompositionSearch.objects.get(id=search.id)
+    search_db.update_search_state()
+    for column in search._search_state_columns:
+        if column != "search_state_counted_until":
+            assert getattr(search_db, column) == getattr(search, column)
+
+
+@pytest.mark.django_db
+def test_search_state_recount_race(sample_structures):
+
+    structure = sample_structures["NaCl_mp-22862_primitive"]
+    search = FixedCompositionSearch.objects.create(
+        composition=structure.composition.formula,
+        subworkflow_name="relaxation.vasp.staged",
+        fitness_field="energy_per_atom",
+        convergence_cutoff=0.001,
+    )
+
+    def make_individual(energy, minutes, **kwargs):
+        individual = Relaxation.from_toolkit(
+            structure=structure,
+            energy_per_atom=energy,
+            workflow_name="relaxation.vasp.staged",
+            finished_at=start + timedelta(minutes=minutes),
+            **kwargs,
+        )
+        individual.save()
+        return individual
+
+    # individuals that finished before the best are not counted as "since best"
+    # (even when they are added after it), which matches the full recount
+    start = timezone.now()
+    best = make_individual(-2, minutes=1)
+    search.add_individual_to_search_state(best)
+    search.add_individual_to_search_state(make_individual(-1, minutes=0))
+    search.add_individual_to_search_state(make_individual(-1, minutes=2))
+    assert search.nindividuals_completed == 3
+    assert search.best_individual_id == best.id
+    assert search.nindividuals_since_best == 1
+
+    # A recount can happen between an individual being saved and it being
+    # added to the search state. It should only be counted once.
+    individual = make_individual(-1, minutes=3)
+    search.update_search_state()
+    search.add_individual_to_search_state(individual)
+    assert search.nindividuals_completed == 4
+    assert search.nindividuals_since_best == 2
+
+    # individuals from other workflows are not part of this search
+    other = make_individual(-5, minutes=4)
+    other.workflow_name = "static-energy.vasp.mit"
+    other.save()
+    search.add_individual_to_search_state(other)
+    assert search.nindividuals_completed == 4
+
+    search_db = FixedCompositionSearch.objects.get(id=search.id)
+    search_db.update_search_state()
+    for column in search._search_state_columns:
+        if column != "search_state_counted_until":
+            assert getattr(search_db, column) == getattr(search, column)
+
+
+@pytest.mark.django_db
+def test_add_singleshot_results(sample_structures):
+
+    structure = sample_structures["NaCl_mp-22862_primitive"]
+    search = FixedCompositionSearch.objects.create(
+        composition=structure.composition.formula,
+        subworkflow_name="relaxation.vasp.staged",
+        fitness_field="energy_per_atom",
+    )
+    individual = Relaxation.from_toolkit(
+        structure=structure,
+        energy_per_atom=-1,
+        workflow_name="relaxation.vasp.staged",
+        finished_at=timezone.now(),
+    )
+    individual.save()
+
+    workitem_done = WorkItem.objects.create(
+        fxn=cloudpickle.dumps(None),
+        status="F",
+        result_binary=cloudpickle.dumps(individual),
+    )
+    workitem_failed = WorkItem.objects.create(
+        fxn=cloudpickle.dumps(None),
+        status="E",
+        result_binary=cloudpickle.dumps(Exception()),
+    )
+    workitem_running = WorkItem.objects.create(
+        fxn=cloudpickle.dumps(None),
+        status="R",
+    )
+
+    workitems = search.add_singleshot_results(
+        [workitem_done, workitem_failed, workitem_running]
+    )
+    assert workitems == [workitem_running]
+    assert search.nindividuals_completed == 1
+    assert search.best_individual_id == individual.id
@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
 
+import numpy
 import pandas
+from django.db.models import F
 
 
 class Selector:
@@ -13,32 +15,96 @@ class Selector:
       https://deap.readthedocs.io/en/master/api/tools.html
 
     Their selection methods take a list of individuals that each have a .fitness
-    attribute. Instead, I pass individuals here as a pandas dataframe and have
-    them specify a "fitness_column"
+    attribute. Instead, subclasses implement `select_indices`, which is given
+    a numpy array of fitness values and returns the indices of the selected
+    individuals. This lets us run selection directly on the (id, fitness)
+    arrays queried from the database. A pandas dataframe with a "fitness_column"
+    can also be given to `select`.
 
     Another good reference is Wikipedia
       https://en.wikipedia.org/wiki/Selection_(genetic_algorithm)
 
-    NOTE: I assume lower fitness is better! This may change in the future because
-    other selection methods throw issues with lower=better and even more issues
-    when we have negative values
+    NOTE: Selectors assume lower fitness is better! Set `maximize=True` when
+    selecting if higher is better, and the fitness values will be flipped for
+    you. Missing fitness values (NaN) are always treated as the worst.
     """
 
+    @staticmethod
+    def select_indices(
+        nselect: int,
+        fitness: numpy.ndarray,
+        generator: numpy.random.Generator,
+        **kwargs,
+    ) -> numpy.ndarray:
+        """
+        Selects `nselect` individuals and returns their indices in the fitness
+        array. Fitness values given here are always lower=better and never NaN.
+        """
+        raise NotImplementedError(
+            "You must add a custom select_indices method for your Selector subclass"
+        )
+
+    @classmethod
+    def select_from_arrays(
+        cls,
+        nselect: int,
+        fitness: numpy.ndarray,
+        maximize: bool = False,
+        seed: int | numpy.random.Generator = None,
+        **kwargs,
+    ) -> numpy.ndarray:
+        """
+        Selects `nselect` individuals from an array of fitness values and
+        returns the indices of the selected individuals.
+
+        #### Parameters
+
+        - `nselect`:
+            the number of individuals to select
+
+        - `fitness`:
+            a 1D array of fitness values
+
+        - `maximize`:
+            whether higher fitness is better. Defaults to False.
+
+        - `seed`:
+            a seed or numpy Generator to use for random numbers. If not
+            given, a new generator is created from fresh OS entropy.
+
+        - `**kwargs`:
+            any extra parameters to pass to the `select_indices` method
+        """
+        fitness = numpy.asarray(fitness, dtype=float)
+        if maximize:
+            fitness = -fitness
+        fitness = numpy.nan_to_num(fitness, nan=numpy.inf)
+        return cls.select_indices(
+            nselect=nselect,
+            fitness=fitness,
+            generator=numpy.random.default_rng(seed),
+            **kwargs,
+        )
+
     @classmethod
     def select(
         cls,
         nselect: int,
         individuals: pandas.DataFrame,
         fitness_column: str,
-    ):
-        # The select method should take in two arguments:
-        # individuals = a pandas dataframe with columns "id" and "fitness"
-        # n = the number of individuals that we want to choose from those fitnesses
-        # The select method should then return a list/tuple of the indicies
-        # of the fitnesses that were selected
-        raise NotImplementedError(
-            "You must add a custom select method for your Selector subclass"
+        **kwargs,  # for select_from_arrays
+    ) -> pandas.DataFrame:
+        """
+        Selects `nselect` rows from a dataframe of individuals, using the
+        values of `fitness_column`. Rows are given in the order they were
+        selected, and an individual can appear more than once.
+        """
+        indices = cls.select_from_arrays(
+            nselect=nselect,
+            fitness=individuals[fitness_column].values,
+            **kwargs,
         )
+        return individuals.iloc[indices].reset_index(drop=True)
 
     @classmethod
     @property
@@ -55,39 +121,87 @@ class Selector:
         nselect: int,
         datatable,  # Queryset
         fitness_column: str = None,
-        query_limit: str = None,
+        query_limit: int = None,
+        **kwargs,  # for the select method
     ):
+        """
+        Selects parents from a queryset of individuals and returns their ids
+        and structures.
+
+        Only the `id` and fitness columns are queried for selection, and all
+        parent structures are then loaded in a single query.
+
+        #### Parameters
+
+        - `nselect`:
+            the number of parents to select
+
+        - `datatable`:
+            a queryset of all individuals that can be selected from
+
+        - `fitness_column`:
+            the column to rank individuals by. Lower is better unless
+            `maximize=True` is given.
+
+        - `query_limit`:
+            if given, only the top-k individuals (ranked by `fitness_column`)
+            are loaded and selected from. Use this for large searches where
+            the worst individuals will never be chosen anyways.
+
+        - `**kwargs`:
+            any extra parameters to pass to `select_from_arrays`, such as
+            `maximize`, `seed`, or options for the `select_indices` method
+        """
 
         # our selectors just require a dataframe where we specify the fitness
         # column. So we query our individuals database to give this as an input.
         datatable_cleaned = datatable
+        # Missing fitness values are always ranked last.
         if fitness_column:
-            datatable_cleaned = datatable_cleaned.order_by(fitness_column)
+            fitness = F(fitness_column)
+            datatable_cleaned = datatable_cleaned.order_by(
+                fitness.desc(nulls_last=True)
+                if kwargs.get("maximize")
+                else fitness.asc(nulls_last=True)
+            )
         if query_limit:
             datatable_cleaned = datatable_cleaned[:query_limit]
 
-        individuals_df = datatable_cleaned.to_dataframe()
+        # We only need the id and fitness of each individual in order to select
+        # parents, so we avoid loading full rows (which include the large
+        # structure column) and load the values directly into numpy arrays.
+        if fitness_column:
+            values = numpy.array(
+                list(datatable_cleaned.values_list("id", fitness_column)),
+                dtype=float,
+            ).reshape(-1, 2)
+            ids = values[:, 0].astype(int)
+            fitness = values[:, 1]
+        else:
+            ids = numpy.array(list(datatable_cleaned.values_list("id", flat=True)))
+            fitness = numpy.zeros(len(ids))
 
         # From these individuals, select our parent structures
-        parents_df = cls.select(
-            nselect=nselect,
-            individuals=individuals_df,
-            fitness_column=fitness_column,
-        )
-
-        # grab the id column of the parents and convert it to a list
-        parent_ids = parents_df.id.values.tolist()
+        indices = cls.select_from_arrays(nselect=nselect, fitness=fitness, **kwargs)
+        parent_ids = ids[indices].tolist()
 
         # Now lets grab these structures from our database and convert them
-        # to a list of pymatgen structures.
-        # We have to make separate queries for this instead of doing "id__in=parent_ids".
-        # This is because (1) order may be important and (2) we may have duplicate
-        # entries. For example, a hereditary mutation can request parent ids of [123,123]
-        # in which case we want to give the same input structure twice!
-        parent_structures = [
-            datatable.only("structure").get(id=parent_id).to_toolkit()
-            for parent_id in parent_ids
-        ]
+        # to a list of toolkit structures. Order is important and we may have
+        # duplicate entries. For example, a hereditary mutation can request
+        # parent ids of [123,123] in which case we want to give the same
+        # input structure twice! So we load each unique parent in one query
+        # and then map them back to the selected ids.
+        parents_db = datatable.model.objects.only("id", "structure").filter(
+            id__in=set(parent_ids)
+        )
+        structures = {parent.id: parent.to_toolkit() for parent in parents_db}
+        # copy duplicates so that transformations can't modify a shared object
+        parent_structures = []
+        for parent_id in parent_ids:
+            structure = structures[parent_id]
+            if any(structure is parent for parent in parent_structures):
+                structure = structure.copy()
+            parent_structures.append(structure)
 
         # When there's only one structure selected we return the structure and
         # id independently -- not within a list
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+
+import numpy
+import pandas
+import pytest
+
+from simmate.toolkit.structure_prediction.evolution.selectors import (
+    TournamentSelection,
+    TruncatedSelection,
+)
+from simmate.website.test_app.models import TestStructure
+
+
+@pytest.mark.django_db
+def test_select_from_datatable(django_assert_max_num_queries):
+
+    datatable = TestStructure.objects.all()
+
+    # one query for the id+fitness values and one for the parent structures
+    with django_assert_max_num_queries(2):
+        parent_ids, parent_structures = TruncatedSelection.select_from_datatable(
+            nselect=4,
+            datatable=datatable,
+            fitness_column="density",
+            query_limit=3,
+        )
+    assert len(parent_ids) == len(parent_structures) == 4
+
+    # only the top-3 densest individuals can be selected
+    top_ids = list(datatable.order_by("density").values_list("id", flat=True)[:3])
+    for parent_id, structure in zip(parent_ids, parent_structures):
+        assert parent_id in top_ids
+        assert structure == datatable.get(id=parent_id).to_toolkit()
+
+    # duplicate parents are given as separate objects
+    assert len(set(map(id, parent_structures))) == 4
+
+    # a single parent is given without a list
+    parent_id, parent_structure = TournamentSelection.select_from_datatable(
+        nselect=1,
+        datatable=datatable,
+        fitness_column="density",
+    )
+    assert isinstance(parent_id, int)
+    assert parent_structure == datatable.get(id=parent_id).to_toolkit()
+
+
+def test_tournament_selection():
+
+    fitness = numpy.array([5.0, 1.0, numpy.nan, 3.0, 4.0, 2.0])
+
+    # with everyone in the tournament, the best individual always wins
+    indices = TournamentSelection.select_from_arrays(
+        nselect=10,
+        fitness=fitness,
+        tournament_size=1,
+    )
+    assert indices.tolist() == [1] * 10
+    indices = TournamentSelection.select_from_arrays(
+        nselect=10,
+        fitness=fitness,
+        tournament_size=1,
+        maximize=True,
+    )
+    assert indices.tolist() == [0] * 10
+
+    # a seed gives the same tournaments
+    indices = [
+        TournamentSelection.select_from_arrays(
+            nselect=10,
+            fitness=fitness,
+            tournament_min=2,
+            seed=12345,
+        )
+        for _ in range(2)
+    ]
+    assert indices[0].tolist() == indices[1].tolist()
+    # the missing value can never win a tournament of 2
+    assert 2 not in indices[0]
+
+
+def test_truncated_selection():
+
+    fitness = numpy.arange(100, dtype=float)
+    individuals = pandas.DataFrame({"id": numpy.arange(100) + 1, "energy": fitness})
+
+    parents = TruncatedSelection.select(
+        nselect=20,
+        individuals=individuals,
+        fitness_column="energy",
+        ntruncate_min=3,
+        ntruncate_max=3,
+    )
+    assert len(parents) == 20
+    assert set(parents.id) <= {1, 2, 3}
+
+    parents = TruncatedSelection.select(
+        nselect=3,
+        individuals=individuals,
+        fitness_column="energy",
+        ntruncate_min=3,
+        ntruncate_max=3,
+        allow_duplicate=False,
+        maximize=True,
+    )
+    assert set(parents.id) == {98, 99, 100}
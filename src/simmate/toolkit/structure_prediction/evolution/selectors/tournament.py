@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 
-import pandas
+import numpy
 
 from simmate.toolkit.structure_prediction.evolution.selectors import Selector
 
@@ -13,30 +13,31 @@ class TournamentSelection(Selector):
     """
 
     @staticmethod
-    def select(
+    def select_indices(
         nselect: int,
-        individuals: pandas.DataFrame,
-        fitness_column: str,
+        fitness: numpy.ndarray,
+        generator: numpy.random.Generator,
         # The percent of individuals participating in each tournament
         tournament_size: float = 0.20,
         tournament_min: int = 3,
-    ) -> pandas.DataFrame:
+    ) -> numpy.ndarray:
 
         # We want the tournament size to be based on the total number of
         # inidividuals available.
-        ntournament = int(len(individuals) * tournament_size)
+        nindividuals = len(fitness)
+        ntournament = int(nindividuals * tournament_size)
         if ntournament < tournament_min:
             ntournament = tournament_min
-
-        # Run the series of tournaments and select the winner from each
-        tournament_winners = []
-        for n in range(nselect):
-            df_tourn = individuals.sample(ntournament, replace=False)
-            winner = df_tourn.nsmallest(1, fitness_column).iloc[0]
-            tournament_winners.append(winner)
-
-        # take the winning series and convert back to a pandas dataframe
-        df_parents = pandas.DataFrame(tournament_winners)
-        df_parents = df_parents.reset_index(drop=True)  # in case of duplicates
-
-        return df_parents
+        if ntournament > nindividuals:
+            ntournament = nindividuals
+
+        # Draw the participants of all tournaments at once. Each row gives
+        # random keys for every individual, and the ntournament smallest keys
+        # are a random sample of individuals (without replacement).
+        keys = generator.random((nselect, nindividuals))
+        participants = numpy.argpartition(keys, ntournament - 1, axis=1)
+        participants = participants[:, :ntournament]
+
+        # select the winner from each tournament
+        winners = numpy.argmin(fitness[participants], axis=1)
+        return participants[numpy.arange(nselect), winners]
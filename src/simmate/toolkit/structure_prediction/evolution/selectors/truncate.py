@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 
-import pandas
+import numpy
 
 from simmate.toolkit.structure_prediction.evolution.selectors import Selector
 
@@ -13,30 +13,30 @@ class TruncatedSelection(Selector):
     """
 
     @staticmethod
-    def select(
+    def select_indices(
         nselect: int,
-        individuals: pandas.DataFrame,
-        fitness_column: str,
+        fitness: numpy.ndarray,
+        generator: numpy.random.Generator,
         percentile: float = 0.05,
         # at min/max, make sure we can select from this number of individuals
         ntruncate_min: int = 5,
         ntruncate_max: int = 50,
         # whether we can select the same individual more than once
         allow_duplicate: bool = True,
-    ) -> pandas.DataFrame:
+    ) -> numpy.ndarray:
 
         # truncate the population to those with energies in the lowest X%. This
         # value should be greater or equal to our minimum set above
-        ntruncate = int(len(individuals) * percentile)
+        nindividuals = len(fitness)
+        ntruncate = int(nindividuals * percentile)
         if ntruncate < ntruncate_min:
             ntruncate = ntruncate_min
         if ntruncate > ntruncate_max:
             ntruncate = ntruncate_max
+        if ntruncate > nindividuals:
+            ntruncate = nindividuals
 
         # limit our potential selection to the top X% and then randomly select
         # the correct number of parents
-        df_truncated = individuals.nsmallest(ntruncate, fitness_column)
-        df_parents = df_truncated.sample(nselect, replace=allow_duplicate)
-
-        # return the list of indexes to be selected
-        return df_parents
+        truncated = numpy.argpartition(fitness, ntruncate - 1)[:ntruncate]
+        return generator.choice(truncated, nselect, replace=allow_duplicate)
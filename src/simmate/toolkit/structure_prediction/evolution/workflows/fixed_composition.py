@@ -107,6 +107,7 @@ class StructurePrediction__Toolkit__FixedComposition(Workflow):
 
         # sometimes the conditions are already met by a previous search so we
         # check for this up front.
+        search_datatable.update_search_state()
         if search_datatable.check_stop_condition():
             logging.info("Looks like this search was already ran by someone else!")
             return
@@ -127,7 +128,7 @@ class StructurePrediction__Toolkit__FixedComposition(Workflow):
         # this will likely not be needed (unless a new source was added). But for
         # new searches/compositions, this will submit all individuals from the
         # single shot sources before we even start the steady-state runs
-        search_datatable._check_singleshot_sources(directory)
+        singleshot_workitems = search_datatable._check_singleshot_sources(directory)
 
         # Regardless of what the sleep cycle is, we only write outputs a minimum
         # of every 5 minutes. This helps save on database and file i/o when
@@ -138,13 +139,17 @@ class StructurePrediction__Toolkit__FixedComposition(Workflow):
         sleep_frequency = 60 * 5 // sleep_step
         sleep_counter = 0 + sleep_frequency
 
+        # The search state is fully recounted at the same frequency to correct
+        # any drift. We just did a recount above, so this counter starts at 0.
+        recount_counter = 0
+
         # this loop will go until I hit 'break' below
         while True:
 
             # Write the output summary if there is at least one structure completed
             if write_summary_files and sleep_counter >= sleep_frequency:
                 sleep_counter = 0  # reset the cycle
-                if search_datatable.individuals_completed.count() >= 1:
+                if search_datatable.nindividuals_completed >= 1:
                     search_datatable.write_output_summary(directory)
                 else:
                     search_datatable.write_individuals_incomplete(directory)
@@ -153,8 +158,22 @@ class StructurePrediction__Toolkit__FixedComposition(Workflow):
             # point because I expect we can follow along in the web UI in the future
             # To that end, I can add a "URL" property
 
-            # Check the stop condition
-            # If it is True, we can stop the calc.
+            # Record any finished singleshot individuals and then reload the
+            # search state (counts and best individual), which new individuals
+            # update as they complete. This avoids querying the individuals
+            # table every cycle.
+            singleshot_workitems = search_datatable.add_singleshot_results(
+                singleshot_workitems
+            )
+            if recount_counter >= sleep_frequency:
+                recount_counter = 0
+                search_datatable.update_search_state()
+            else:
+                search_datatable.refresh_from_db(
+                    fields=search_datatable._search_state_columns
+                )
+
+            # Check the stop condition. If it is True, we can stop the calc.
             if search_datatable.check_stop_condition():
                 # TODO: should I sleep / wait for other calculations and
                 # check again? Then write summary one last time..?
@@ -172,5 +191,6 @@ class StructurePrediction__Toolkit__FixedComposition(Workflow):
             # To save our database load, sleep until we run checks again.
             time.sleep(sleep_step)
             sleep_counter += 1
+            recount_counter += 1
 
         logging.info("Stopping the search (running calcs will be left to finish).")
@@ -121,6 +121,10 @@ class StructurePrediction__Toolkit__NewIndividual(Workflow):
             # check the final structure with our validator again. This populates
             # the fingerprint database (if one is being used).
             validator.check_structure(result.to_toolkit())
+
+            # and record the new individual in the search's counters (which
+            # are what the stop conditions are checked against)
+            search_db.add_individual_to_search_state(result)
             # BUG: I think there is a race condition here... Other NewIndividual
             # workflows may try to populate the fingerprint at the START of
             # a run while this one must do it after .result() is called.
@@ -2,6 +2,8 @@
 
 import logging
 
+from dask import bag
+
 from simmate.toolkit import Structure
 
 
@@ -154,7 +156,38 @@ class Transformation:
         structures,  # either a structure or list of structures. Depends on ninput.
         validators=[],
         max_attempts=100,
+        batch_size: int = 1,
     ):
+        """
+        Repeatedly applies the transformation until a new structure passes
+        all validators (or we run out of attempts).
+
+        #### Parameters
+
+        - `structures`:
+            either a structure or list of structures. Depends on ninput.
+
+        - `validators`:
+            a list of validators that the new structure must pass. Cheap
+            validators are always run before expensive ones (see
+            `Validator.is_expensive`), regardless of the order given.
+
+        - `max_attempts`:
+            the maximum number of structures to create before giving up
+
+        - `batch_size`:
+            the number of candidate structures to create at a time. Each batch
+            is screened by every validator at once, which lets expensive
+            validators (such as fingerprints) compare all survivors in a
+            single vectorized step. If the transformation sets
+            `allow_parallel=True`, the candidates are also created in
+            parallel. Defaults to 1, which creates one candidate at a time.
+        """
+
+        # cheap validators (e.g. site distances) are run first so that the
+        # expensive ones only see structures that have a chance of passing.
+        # Note, sorted() keeps the input order within cheap/expensive groups.
+        validators = sorted(validators, key=lambda validator: validator.is_expensive)
 
         # Until we get a new valid structure (or run out of attempts), keep trying
         # with our given source. Assume we don't have a valid structure until
@@ -162,30 +195,44 @@ class Transformation:
         new_structure = False
         attempt = 0
         while not new_structure and attempt <= max_attempts:
-            # add an attempt
-            attempt += 1
 
-            # make a new structure
-            new_structure = self.apply_transformation(structures)
-
-            # check to see if the structure passes all validation checks.
-            if new_structure:
-
-                for validator in validators:
-                    is_valid = validator.check_structure(new_structure)
-
-                    if not is_valid:
-                        # if it is not unique, we can throw away the structure and
-                        # try the loop again.
-                        logging.debug(
-                            "Generated structure failed validation by "
-                            f"{validator.name}. Trying again."
-                        )
-                        new_structure = None
-
-                        # one failed validation is enough to stop. There is no
-                        # need to test the other validation methods.
-                        break
+            # make a batch of new structures, making sure we don't go over our
+            # total number of attempts. Transformations return False when
+            # they fail, so we remove those right away.
+            nbatch = min(batch_size, max_attempts - attempt + 1)
+            attempt += nbatch
+            candidates = [
+                candidate
+                for candidate in self._apply_transformation_batch(structures, nbatch)
+                if candidate
+            ]
+
+            # check to see which structures pass all validation checks. One
+            # failed validation is enough to throw away a structure. There is
+            # no need to test the other validation methods on it.
+            for i, validator in enumerate(validators):
+                if not candidates:
+                    break
+                checks = validator.check_structure_batch(
+                    candidates,
+                    # we only need a single structure, so the final validator
+                    # can stop as soon as one passes. This also keeps
+                    # validators with side-effects (e.g. adding to a
+                    # fingerprint pool) from acting on structures we won't use.
+                    max_valid=1 if i == len(validators) - 1 else None,
+                )
+                nfailed = checks.count(False)
+                if nfailed:
+                    logging.debug(
+                        f"{nfailed} generated structure(s) failed validation by "
+                        f"{validator.name}."
+                    )
+                candidates = [
+                    candidate for candidate, check in zip(candidates, checks) if check
+                ]
+
+            if candidates:
+                new_structure = candidates[0]
 
         # see if we got a structure or if we hit the max attempts and there's
         # a serious problem!
@@ -198,3 +245,26 @@ class Transformation:
 
         # return the structure and its parents
         return new_structure
+
+    def _apply_transformation_batch(self, structures, nbatch: int) -> list:
+        """
+        Creates `nbatch` new structures from the same input structure(s). This
+        uses dask threads when the transformation supports parallel use.
+        """
+
+        if nbatch == 1 or not self.allow_parallel:
+            return [self.apply_transformation(structures) for _ in range(nbatch)]
+
+        # tasks run at the same time, so each is given its own copy of the
+        # inputs in case a transformation modifies them in place.
+        inputs = [
+            [s.copy() for s in structures]
+            if isinstance(structures, list)
+            else structures.copy()
+            for _ in range(nbatch)
+        ]
+        return (
+            bag.from_sequence(inputs)
+            .map(self.apply_transformation)
+            .compute(scheduler="threads")
+        )
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from simmate.toolkit import Composition
+from simmate.toolkit.transformations.base import Transformation
+from simmate.toolkit.validators.fingerprint import PartialRdfFingerprint
+from simmate.toolkit.validators.structure import SiteDistance
+
+
+class ScaleLattice(Transformation):
+    # A dummy transformation that cycles through a series of volume scales,
+    # where the first one always pushes sites too close together
+    io_scale = "one_to_one"
+    ninput = 1
+
+    def __init__(self, scales):
+        self.scales = scales
+        self.ncalls = 0
+
+    def apply_transformation(self, structure):
+        new_structure = structure.copy()
+        scale = self.scales[self.ncalls % len(self.scales)]
+        new_structure.scale_lattice(structure.volume * scale)
+        self.ncalls += 1
+        return new_structure
+
+
+@pytest.mark.parametrize("batch_size", [1, 4])
+def test_apply_transformation_with_validation(sample_structures, batch_size):
+
+    structure = sample_structures["NaCl_mp-22862_primitive"]
+    fingerprint = PartialRdfFingerprint(
+        composition=Composition(structure.composition),
+        structure_pool=[structure],
+    )
+    distance = SiteDistance(distance_cutoff=1)
+
+    # the fingerprint validator is given first, but it should only ever see
+    # structures that already passed the cheap site-distance check
+    transformation = ScaleLattice(scales=[0.01, 1, 2])
+    new_structure = transformation.apply_transformation_with_validation(
+        structure,
+        validators=[fingerprint, distance],
+        batch_size=batch_size,
+    )
+    assert new_structure.volume == pytest.approx(structure.volume * 2)
+    assert len(fingerprint.fingerprint_pool) == 2
+
+    # if nothing passes, we give up after max_attempts
+    transformation = ScaleLattice(scales=[0.01])
+    new_structure = transformation.apply_transformation_with_validation(
+        structure,
+        validators=[fingerprint, distance],
+        max_attempts=5,
+        batch_size=batch_size,
+    )
+    assert new_structure is False
+    assert transformation.ncalls == 6
@@ -5,6 +5,14 @@ from dask.diagnostics import ProgressBar
 
 
 class Validator:
+
+    is_expensive: bool = False
+    """
+    Whether this validator is slow relative to others (e.g. it compares against
+    a large pool of structures). When several validators are used together,
+    cheap ones are run first so that expensive ones see fewer structures.
+    """
+
     @classmethod
     @property
     def name(cls):
@@ -22,6 +30,31 @@ class Validator:
             "make sure you add a custom 'check_structure' method to your Validator"
         )
 
+    def check_structure_batch(
+        self,
+        structures: list,
+        max_valid: int = None,
+    ) -> list[bool]:
+        """
+        Checks a batch of structures in order and gives a list of True/False
+        values. If `max_valid` is given, checking stops once that many
+        structures have passed, and all remaining structures are marked as
+        False.
+
+        By default this calls `check_structure` on each structure, but
+        subclasses can override this to check the full batch at once.
+        """
+        checks = []
+        nvalid = 0
+        for structure in structures:
+            if max_valid is not None and nvalid >= max_valid:
+                checks.append(False)
+                continue
+            check = bool(self.check_structure(structure))
+            nvalid += check
+            checks.append(check)
+        return checks
+
     def check_many_structures(self, structures, progressbar=True, mode="threads"):
 
         # REFACTOR: switch to the get_dask_client utility here.
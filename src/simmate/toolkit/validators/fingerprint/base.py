@@ -3,7 +3,7 @@
 import logging
 
 import numpy
-import scipy
+from scipy.spatial.distance import cdist
 from django.core.exceptions import MultipleObjectsReturned
 from django.utils import timezone
 from rich.progress import track
@@ -31,6 +31,8 @@ class FingerprintValidator(Validator):
     The value used to signify different structures
     """
 
+    is_expensive: bool = True
+
     def __init__(
         self,
         distance_tolerance: float = None,  # defaults to class attr
@@ -95,7 +97,10 @@ class FingerprintValidator(Validator):
                 timezone.datetime.min, timezone.get_default_timezone()
             )
 
-        # next we address what initial structures were given.
+        # next we address what initial structures were given. We start from an
+        # empty pool and add to it below.
+        self.fingerprint_pool = numpy.array([])
+        self.source_pool = []
 
         # check if we were given a list of pymatgen structures. If so, we can
         # just set and store things locally.
@@ -118,8 +123,6 @@ class FingerprintValidator(Validator):
         # otherwise we have a queryset that should be used to populate the
         # fingerprint database
         else:
-            self.fingerprint_pool = numpy.array([])
-            self.source_pool = []
             self.update_fingerprint_pool()
 
     # -------------------------------------------------------------------------
@@ -177,6 +180,46 @@ class FingerprintValidator(Validator):
         # Return that we were successful
         return is_unique
 
+    def check_structure_batch(
+        self,
+        structures: list[Structure],
+        max_valid: int = None,
+        add_unique_to_pool: bool = True,
+    ) -> list[bool]:
+        """
+        Checks a batch of structures in order, where each structure must be
+        unique relative to the pool AND to earlier structures in the batch
+        that passed. All fingerprints are compared to the pool in a single
+        vectorized step. If `max_valid` is given, checking stops once that
+        many structures have passed (and only those are added to the pool).
+        """
+
+        fingerprints = [self._get_fingerprint(structure) for structure in structures]
+        min_distances = self._get_min_distances(fingerprints, self.fingerprint_pool)
+
+        checks = []
+        accepted = []
+        for structure, fingerprint, min_distance in zip(
+            structures, fingerprints, min_distances
+        ):
+            is_unique = (
+                (max_valid is None or len(accepted) < max_valid)
+                and min_distance >= self.distance_tolerance
+                and self._check_fingerprint(fingerprint, accepted)
+            )
+            checks.append(bool(is_unique))
+
+            if is_unique:
+                accepted.append(fingerprint)
+                if add_unique_to_pool:
+                    # BUG-FIX:
+                    # in case a pymatgen structure was given, set the source to {}
+                    if not hasattr(structure, "source"):
+                        structure.source = {}
+                    self._add_to_pool(fingerprint, structure.source)
+
+        return checks
+
     def _check_fingerprint(
         self,
         fingerprint: numpy.array,
@@ -185,36 +228,53 @@ class FingerprintValidator(Validator):
 
         # We now want to get the distance of this fingerprint relative to all others.
         # If the distance is within the specified tolerance, then the structures
-        # are too similar - and we return  for a failure.
-        is_unique = True  # consider it unique until proven otherwise
-        # min_dist = 9999  # start with high value
-        for fingerprint2 in fingerprint_pool:
-
-            # check fingerprint based on the mode set
-            if self.comparison_mode == "linalg_norm":
-                distance = numpy.linalg.norm(fingerprint - fingerprint2)
-            elif self.comparison_mode == "cos":
-                distance = scipy.spatial.distance.cosine(fingerprint, fingerprint2)
-            elif self.comparison_mode == "custom":
-                distance = self.get_fingerprint_distance(fingerprint, fingerprint2)
-            else:
-                raise NotImplementedError("Unknown comparison_mode provided.")
-
-            # keep track of the most similar structure
-            # if min_dist > distance:
-            #     min_dist = distance
-
-            # and determine if we have a match
-            if distance < self.distance_tolerance:
-                # we can end the whole for-loop as soon as one structure is
-                # deemed too similar
-                is_unique = False
-                break
-
-        # If we make it through all structures and no distance is below the
-        # tolerance, then we have a new and unique fingerprint
+        # are too similar - and we return  for a failure. Otherwise we have
+        # a new and unique fingerprint.
+        min_distance = self._get_min_distances([fingerprint], fingerprint_pool)[0]
+        return min_distance >= self.distance_tolerance
 
-        return is_unique
+    def _get_min_distances(
+        self,
+        fingerprints: list[numpy.array],
+        fingerprint_pool: list[numpy.array],
+    ) -> numpy.array:
+        """
+        Gives the distance of each fingerprint to the most similar fingerprint
+        in the pool. For the built-in comparison modes, this is done for all
+        fingerprints at once.
+        """
+
+        # an empty pool means every fingerprint is unique
+        if not len(fingerprints) or not len(fingerprint_pool):
+            return numpy.full(len(fingerprints), numpy.inf)
+
+        # check fingerprint based on the mode set
+        if self.comparison_mode in ["linalg_norm", "cos"]:
+            distances = cdist(
+                numpy.asarray(fingerprints, dtype=float),
+                numpy.asarray(fingerprint_pool, dtype=float),
+                metric="euclidean"
+                if self.comparison_mode == "linalg_norm"
+                else "cosine",
+            )
+            return distances.min(axis=1)
+
+        elif self.comparison_mode == "custom":
+            min_distances = []
+            for fingerprint in fingerprints:
+                min_distance = numpy.inf
+                for fingerprint2 in fingerprint_pool:
+                    distance = self.get_fingerprint_distance(fingerprint, fingerprint2)
+                    min_distance = min(min_distance, distance)
+                    # we can end the whole for-loop as soon as one structure is
+                    # deemed too similar
+                    if min_distance < self.distance_tolerance:
+                        break
+                min_distances.append(min_distance)
+            return numpy.array(min_distances)
+
+        else:
+            raise NotImplementedError("Unknown comparison_mode provided.")
 
     def _get_fingerprint(self, structure: Structure):
         # make the fingerprint for this structure into a numpy array for speed
@@ -1,7 +1,5 @@
 # -*- coding: utf-8 -*-
 
-import itertools
-
 import numpy
 
 from simmate.toolkit.validators.base import Validator
@@ -28,11 +26,54 @@ class SiteDistance(Validator):
 
 
 class SiteDistanceMatrix(Validator):
+    """
+    Checks that all sites in a structure are further apart than the minimum
+    distance estimated for each element-element pair (see
+    `Composition.distance_matrix_estimate`).
+
+    #### Parameters
+
+    - `composition`:
+        The composition of the structures that will be checked.
+
+    - `radius_method`:
+        The radius type used to estimate minimum distances. See
+        `Composition.radii_estimate` for options. Defaults to "ionic".
+
+    - `packing_factor`:
+        Scaling value applied to the radii. Defaults to 0.5.
+
+    - `method`:
+        How site-site distances are found. Options are...
+            - `distance_matrix`: compares the full NxN distance matrix at once.
+              This is the fastest option for small structures.
+            - `neighbor_list`: only looks at neighbors within the largest
+              cutoff, checking a small batch of sites at a time so that we can
+              stop as soon as one distance is too short. This scales much
+              better for large structures.
+            - `auto`: uses `neighbor_list` for structures with more than
+              `neighbor_list_min_sites` sites and `distance_matrix` otherwise.
+        The default is `auto`.
+    """
+
+    neighbor_list_min_sites: int = 100
+    """
+    When `method="auto"`, structures with more sites than this are checked
+    using neighbor lists instead of the full distance matrix.
+    """
+
+    neighbor_list_batch_size: int = 64
+    """
+    The number of sites to find neighbors for at a time in `neighbor_list`
+    mode. Smaller batches let us exit sooner when a structure fails.
+    """
+
     def __init__(
         self,
         composition,
         radius_method="ionic",
         packing_factor=0.5,
+        method: str = "auto",
     ):
 
         # save inputs for reference
@@ -40,6 +81,10 @@ class SiteDistanceMatrix(Validator):
         self.radius_method = radius_method
         self.packing_factor = packing_factor
 
+        if method not in ["auto", "distance_matrix", "neighbor_list"]:
+            raise Exception(f"Unknown method for checking distances: {method}")
+        self.method = method
+
         # using our base predictor, make the distance matrix
         self.element_distance_matrix = composition.distance_matrix_estimate(
             radius_method,
@@ -68,44 +113,93 @@ class SiteDistanceMatrix(Validator):
                 max_sites=-1
             )
 
+        # Because structures aren't oxidation-state-decorated (see above), we
+        # collapse the species-species matrix into an element-element one. A
+        # site fails if it is too close for *any* of its species, so we keep
+        # the largest cutoff for each pair of elements.
+        species_symbols = [specie.symbol for specie in self.composition]
+        self.element_symbols = list(dict.fromkeys(species_symbols))
+        self._symbol_indices = {
+            symbol: i for i, symbol in enumerate(self.element_symbols)
+        }
+        nelements = len(self.element_symbols)
+        self._cutoffs = numpy.zeros((nelements, nelements))
+        for i1, symbol1 in enumerate(species_symbols):
+            for i2, symbol2 in enumerate(species_symbols):
+                index1 = self._symbol_indices[symbol1]
+                index2 = self._symbol_indices[symbol2]
+                self._cutoffs[index1, index2] = max(
+                    self._cutoffs[index1, index2],
+                    self.element_distance_matrix[i1][i2],
+                )
+
     def check_structure(self, structure):
         # now using the matrix above, we need to look at the structure
         # and determine if there are any distances that are below matrix limits
-        # to save time, we want to iterate through each site and see that the
-        # site meets all requirements. As soon as any requirement is failed for
-        # any site, the whole loop ends
 
-        # OPTIMIZE: Maybe instead of making all comparisons, we can only
-        # look at nearest neighbors
+        # Map each site to the index of its element in our cutoff matrix. Sites
+        # with elements that aren't in our composition are never checked.
+        site_indices = numpy.array(
+            [self._symbol_indices.get(site.specie.symbol, -1) for site in structure]
+        )
 
-        # we get a massive speedup if we make this matrix upfront
-        # for extremely large structures with many sites, this might not be the
-        # case though
-        dm = structure.distance_matrix
+        if self.method == "neighbor_list" or (
+            self.method == "auto" and structure.num_sites > self.neighbor_list_min_sites
+        ):
+            return self._check_with_neighbor_list(structure, site_indices)
+        else:
+            return self._check_with_distance_matrix(structure, site_indices)
+
+    def _check_with_distance_matrix(self, structure, site_indices):
+
+        # NOTE: the distance matrix gives the nearest image distance, which might
+        # not be in an adjacent cell!
+        is_known = site_indices >= 0
+        distances = structure.distance_matrix[numpy.ix_(is_known, is_known)]
+        site_indices = site_indices[is_known]
+
+        # gather the cutoff for every site-site pair in a single operation
+        cutoffs = self._cutoffs[site_indices[:, None], site_indices[None, :]]
+
+        # skip if we are looking at the same site
+        numpy.fill_diagonal(cutoffs, 0)
+
+        return not (distances < cutoffs).any()
+
+    def _check_with_neighbor_list(self, structure, site_indices):
+
+        max_cutoff = self._cutoffs.max()
+
+        # we go through the sites in small batches so that we can exit as
+        # soon as any requirement is failed for any site
+        for start in range(0, structure.num_sites, self.neighbor_list_batch_size):
+            stop = start + self.neighbor_list_batch_size
+
+            # Note, we don't exclude "self" neighbors here because pymatgen
+            # uses a distance tolerance to do so -- which would also skip
+            # two different sites that are directly on top of one another.
+            centers, neighbors, _, distances = structure.get_neighbor_list(
+                r=max_cutoff,
+                sites=structure.sites[start:stop],
+                exclude_self=False,
+            )
+            centers += start
+
+            # skip if we are looking at the same site (or its periodic images)
+            # as well as any elements not in our composition
+            center_indices = site_indices[centers]
+            neighbor_indices = site_indices[neighbors]
+            is_checked = (
+                (centers != neighbors) & (center_indices >= 0) & (neighbor_indices >= 0)
+            )
+
+            cutoffs = self._cutoffs[
+                center_indices[is_checked],
+                neighbor_indices[is_checked],
+            ]
+            if (distances[is_checked] < cutoffs).any():
+                # one False is enough to stop - end the whole function
+                return False
 
-        # go through each element-element combo and check distances
-        for i1, element1 in enumerate(self.composition):
-            element1_indicies = structure.indices_from_symbol(element1.symbol)
-            for i2, element2 in enumerate(self.composition):
-                # grab the cutoff distance for these two specie/element types
-                dist_cutoff = self.element_distance_matrix[i1][i2]
-                element2_indicies = structure.indices_from_symbol(element2.symbol)
-                combos = itertools.product(element1_indicies, element2_indicies)
-                for s1, s2 in combos:
-                    # skip if we are looking at the same site
-                    if s1 == s2:
-                        continue
-                    # grab the periodic sites
-                    # NOTE: sites here are PeriodicSite objects, not Site objects
-                    # This is extremely important because we want nearest
-                    # image distance, which might not be in an adjacent cell!
-                    # site1 = structure[s1]
-                    # site2 = structure[s2]
-                    # Now get the distance between the two periodic sites
-                    distance = dm[s1][s2]
-                    # compare the distance to the cutoff matrix
-                    if distance < dist_cutoff:
-                        # one False is enough to stop - end the whole function
-                        return False
         # the function will only reach this point if all distance criteria are met
         return True
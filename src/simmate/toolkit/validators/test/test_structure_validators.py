@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from simmate.toolkit import Composition
+from simmate.toolkit.validators.structure import SiteDistanceMatrix
+
+
+@pytest.mark.parametrize("method", ["distance_matrix", "neighbor_list"])
+def test_site_distance_matrix(structure, method):
+
+    composition = Composition(structure.composition)
+    validator = SiteDistanceMatrix(
+        composition,
+        radius_method="atomic",
+        method=method,
+    )
+    # use small batches to make sure the neighbor list is checked in parts
+    validator.neighbor_list_batch_size = 2
+
+    # expanding the cell moves all sites apart, so it should always pass
+    expanded = structure.copy()
+    expanded.scale_lattice(structure.volume * 50)
+    assert validator.check_structure(expanded)
+
+    # and shrinking it pushes sites too close together
+    shrunk = structure.copy()
+    shrunk.scale_lattice(structure.volume * 0.01)
+    if structure.num_sites > 1:
+        assert not validator.check_structure(shrunk)
+
+    # both methods should agree on the original structure too
+    other_method = SiteDistanceMatrix(
+        composition,
+        radius_method="atomic",
+        method="distance_matrix" if method == "neighbor_list" else "neighbor_list",
+    )
+    assert validator.check_structure(structure) == other_method.check_structure(
+        structure
+    )
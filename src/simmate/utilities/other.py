@@ -5,8 +5,6 @@ import os
 import sys
 from pathlib import Path
 
-import requests
-
 import simmate
 
 
@@ -36,6 +34,9 @@ def get_latest_version() -> str:
     """
     Looks at the jacks/simmate repo and grabs the latest release version.
     """
+    # requests is slow to import and only needed here
+    import requests
+
     # Access the data via a web request
     response = requests.get(
         "https://api.github.com/repos/jacksund/simmate/releases/latest"
@@ -47,11 +48,14 @@ def get_latest_version() -> str:
     return latest_version
 
 
-def check_if_using_latest_version(current_version=simmate.__version__):
+def check_if_using_latest_version(current_version: str = None):
     """
     Checks if there's a newer version by looking at the latest release on Github
     and comparing it to the currently installed version
     """
+    if not current_version:
+        current_version = simmate.__version__
+
     latest_version = get_latest_version()
 
     if current_version != latest_version:
@@ -1,13 +1,20 @@
 # -*- coding: utf-8 -*-
 
-from django.http import HttpRequest
+import json
+from functools import lru_cache
+
+from django.http import HttpRequest, StreamingHttpResponse
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import OrderingFilter
 
 # from rest_framework.generics import GenericAPIView
 from rest_framework.response import Response
 from rest_framework.serializers import ModelSerializer
+from rest_framework.utils.encoders import JSONEncoder
 from rest_framework.viewsets import GenericViewSet
 
 from simmate.database.base_data_types import DatabaseTable, SearchResults, Spacegroup
+from simmate.website.core_components.pagination import SearchResultsCursorPagination
 
 
 class SimmateAPIViewSet(GenericViewSet):
@@ -61,9 +68,16 @@ class SimmateAPIViewSet(GenericViewSet):
         else:
             serializer = self.get_serializer(queryset, many=True)
 
+        # Cursor pagination is meant for scripts that page through entire
+        # tables, so we stream the json rather than building it all at once.
+        if self._format_kwarg == "json" and isinstance(
+            self.paginator, SearchResultsCursorPagination
+        ):
+            return self.get_streaming_list_response(page)
+
         # If don't have the html format, we follow simple logic from the
         # original ListModelMixin method
-        if self._format_kwarg != "html":
+        elif self._format_kwarg != "html":
             if page is not None:
                 return self.get_paginated_response(serializer.data)
             else:
@@ -78,13 +92,209 @@ class SimmateAPIViewSet(GenericViewSet):
                 "form": filterset.form,
                 "extra_filters": filterset._meta.model.api_filters_extra,
                 "calculations": serializer.instance,  # return python objs, not dict
-                "ncalculations_matching": queryset.count(),
-                "ncalculations_possible": self.get_queryset().count(),
+                # The paginator already counted the matching results, so we
+                # reuse that count rather than making another query.
+                "ncalculations_matching": (
+                    self.paginator.page.paginator.count
+                    if page is not None and hasattr(self.paginator.page, "paginator")
+                    else queryset.get_count()
+                ),
+                "ncalculations_possible": self.get_queryset().get_count(),
                 **self.paginator.get_html_context(),
                 **self.get_list_context(request, **kwargs),
             }
             return Response(data)
 
+    def get_streaming_list_response(self, page: list) -> StreamingHttpResponse:
+        """
+        Gives the same json as `get_paginated_response`, but each row is
+        serialized and sent as it is ready.
+        """
+        # A single serializer is reused for every row, which avoids building
+        # the serializer fields for each one.
+        serializer = self.get_serializer()
+        paginator = self.paginator
+        header = {
+            "next": paginator.get_next_link(),
+            "previous": paginator.get_previous_link(),
+        }
+
+        def stream_rows():
+            # we write the header and then leave the "results" list open
+            yield json.dumps(header)[:-1] + ', "results": ['
+            for i, row in enumerate(page):
+                data = serializer.to_representation(row)
+                yield ("," if i else "") + json.dumps(data, cls=JSONEncoder)
+            yield "]}"
+
+        return StreamingHttpResponse(
+            stream_rows(),
+            content_type="application/json",
+        )
+
+    # -------------------------------------------------------------------------
+
+    # METHODS FOR PAGINATION AND SELECTING COLUMNS
+
+    @property
+    def paginator(self):
+        """
+        The paginator instance for this request. This is the default pagination
+        class unless `pagination=cursor` (or a `cursor=...` from a previous
+        page) is given in the URL.
+        """
+        if not hasattr(self, "_paginator"):
+            query_params = self.request.query_params
+            if "cursor" in query_params or query_params.get("pagination") == "cursor":
+                self._paginator = SearchResultsCursorPagination()
+            elif self.pagination_class is None:
+                self._paginator = None
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
+
+    def get_requested_fields(self) -> tuple[tuple[str], tuple[str]]:
+        """
+        Gives the columns requested with `fields=...` and `exclude=...` in the
+        URL. For example, `?fields=id,energy` or `?exclude=structure`.
+        Columns are only projected for json and the browsable api, because
+        the html templates use the full database objects.
+        """
+        if hasattr(self, "_requested_fields"):
+            return self._requested_fields
+
+        query_params = self.request.query_params
+        if query_params.get("format", "html") == "html":
+            self._requested_fields = ((), ())
+        else:
+            self._requested_fields = self._parse_requested_fields()
+        return self._requested_fields
+
+    def _parse_requested_fields(self) -> tuple[tuple[str], tuple[str]]:
+        # checks the `fields=...` and `exclude=...` URL parameters against the
+        # columns of the table.
+        query_params = self.request.query_params
+        columns = [field.name for field in self.queryset.model._meta.concrete_fields]
+
+        requested_fields = []
+        for parameter in ["fields", "exclude"]:
+            value = query_params.get(parameter, "")
+            # names are deduplicated and sorted so that equivalent requests
+            # share a single serializer (see `get_table_serializer`)
+            names = {name.strip() for name in value.split(",") if name.strip()}
+            names = tuple(sorted(names))
+            unknown_names = [name for name in names if name not in columns]
+            if unknown_names:
+                raise ValidationError(
+                    {
+                        parameter: f"Unknown columns: {unknown_names}. Options are {columns}"
+                    }
+                )
+            requested_fields.append(names)
+
+        if requested_fields[0] and requested_fields[1]:
+            raise ValidationError("Only one of 'fields' or 'exclude' can be given.")
+
+        return tuple(requested_fields)
+
+    def get_queryset(self) -> SearchResults:
+        queryset = super().get_queryset()
+
+        fields, exclude = self.get_requested_fields()
+        if not fields and not exclude:
+            return queryset
+
+        # The columns used for ordering are always loaded because pagination
+        # needs them. Otherwise each row would make another query.
+        ordering = OrderingFilter().get_ordering(self.request, queryset, self) or []
+        ordering_columns = {column.lstrip("-") for column in ordering}
+
+        if fields:
+            loaded_columns = set(fields) | ordering_columns
+            queryset = queryset.only(*loaded_columns)
+        else:
+            columns = {f.name for f in queryset.model._meta.concrete_fields}
+            loaded_columns = columns - set(exclude) | ordering_columns
+            queryset = queryset.defer(*(set(exclude) - ordering_columns))
+
+        # related tables can't be joined if their column isn't loaded
+        related = queryset.query.select_related
+        if isinstance(related, dict) and not set(related).issubset(loaded_columns):
+            queryset = queryset.select_related(None)
+
+        return queryset
+
+    def get_serializer_class(self) -> ModelSerializer:
+        fields, exclude = self.get_requested_fields()
+        if not fields and not exclude:
+            return super().get_serializer_class()
+        return get_table_serializer(
+            self.queryset.model,
+            fields=fields or None,
+            exclude=exclude or None,
+        )
+
+    # -------------------------------------------------------------------------
+
+    export_content_types: dict = {
+        "csv": "text/csv",
+        "jsonl": "application/jsonl",
+        "columns": "application/jsonl",
+    }
+    """
+    The file types available for exports, where the keys are the options
+    for `SearchResults.to_stream`.
+    """
+
+    def get_export_response(
+        self,
+        request: HttpRequest,
+        *args,
+        **kwargs,
+    ) -> StreamingHttpResponse:
+        """
+        Streams all results that match the filters as a file download, rather
+        than one page at a time. The same filters and `fields=...` or
+        `exclude=...` parameters as the list view can be used, and the file type
+        is set with `filetype=csv` (default), `filetype=jsonl`, or
+        `filetype=columns`. For example:
+        `/third-parties/MatprojStructure/export/?filetype=jsonl&nsites__range=1,4`
+
+        Rows are sent as they are read from the database, so exports of any
+        size use a constant amount of memory.
+        """
+        filetype = request.GET.get("filetype", "csv")
+        if filetype not in self.export_content_types:
+            raise ValidationError(
+                {
+                    "filetype": f"Unknown filetype '{filetype}'. "
+                    f"Options are {list(self.export_content_types)}"
+                }
+            )
+
+        queryset = self.filter_queryset(self.get_queryset())
+        # joins are not needed because relations are exported by their ids
+        queryset = queryset.select_related(None)
+
+        fields, exclude = self._parse_requested_fields()
+        if fields:
+            fieldnames = list(fields)
+        else:
+            fieldnames = [
+                field.attname
+                for field in queryset.model._meta.concrete_fields
+                if field.name not in exclude
+            ]
+
+        response = StreamingHttpResponse(
+            queryset.to_stream(format=filetype, fieldnames=fieldnames),
+            content_type=self.export_content_types[filetype],
+        )
+        extension = "csv" if filetype == "csv" else "jsonl"
+        filename = f"{queryset.model.table_name}.{extension}"
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
     def get_retrieve_response(self, request: HttpRequest, *args, **kwargs) -> Response:
 
         # self.format_kwarg --> not sure why this always returns None, so I
@@ -114,6 +324,18 @@ class SimmateAPIViewSet(GenericViewSet):
         else:
             return Response(serializer.data)
 
+    cache_views: bool = True
+    """
+    Whether views made by `from_table` should be saved and reused for later
+    requests. Building a view requires making new serializer and viewset
+    classes, which is slow relative to small queries. Only disable this if you
+    are debugging a view.
+    """
+
+    _view_cache: dict = {}
+    # views that have already been built by `from_table`. Keys are given by
+    # `_get_view_cache_key`
+
     @classmethod
     def from_table(
         cls,
@@ -122,12 +344,66 @@ class SimmateAPIViewSet(GenericViewSet):
         initial_queryset: SearchResults = None,
         **kwargs,
     ):
-        # For all tables, we share all the data -- no columns are hidden. Therefore
-        # the code for the Serializer is always the same.
-        class NewSerializer(ModelSerializer):
-            class Meta:
-                model = table
-                fields = "__all__"
+        # Check if we already built this view. Note that DRF copies the
+        # queryset on every request (via `get_queryset`), so sharing a view
+        # between requests is safe.
+        if cls.cache_views:
+            cache_key = cls._get_view_cache_key(
+                table,
+                view_type,
+                initial_queryset,
+                **kwargs,
+            )
+            view = cls._view_cache.get(cache_key, None)
+            if not view:
+                view = cls._build_view(table, view_type, initial_queryset, **kwargs)
+                cls._view_cache[cache_key] = view
+            return view
+
+        return cls._build_view(table, view_type, initial_queryset, **kwargs)
+
+    @classmethod
+    def _get_view_cache_key(
+        cls,
+        table: DatabaseTable,
+        view_type: str,
+        initial_queryset: SearchResults = None,
+        **kwargs,
+    ) -> tuple:
+        # Different workflows often share a table but start from different
+        # querysets (e.g. filtered by workflow_name), so the SQL of the initial
+        # queryset is part of the key.
+        # Note, we check for None because bool() on a queryset would run it.
+        queryset_key = (
+            str(initial_queryset.query) if initial_queryset is not None else None
+        )
+        return (
+            cls,
+            table,
+            view_type,
+            queryset_key,
+            tuple(sorted(kwargs.items())),
+        )
+
+    @classmethod
+    def warm_view_cache(cls, tables: list[DatabaseTable]):
+        """
+        Builds the list and retrieve views for each table ahead of time, so
+        that the first request to each endpoint is as fast as later ones. For
+        example, you could call this in a custom `urls.py` for your server.
+        """
+        for table in tables:
+            for view_type in ["list", "retrieve"]:
+                cls.from_table(table=table, view_type=view_type)
+
+    @classmethod
+    def _build_view(
+        cls,
+        table: DatabaseTable,
+        view_type: str,
+        initial_queryset: SearchResults = None,
+        **kwargs,
+    ):
 
         # For the source dataset, not all tables have a "created_at" column, but
         # when they do, we want to return results with the most recent additions first
@@ -138,7 +414,9 @@ class SimmateAPIViewSet(GenericViewSet):
         )
 
         # we also want to preload spacegroup for the structure mixin
-        intial_queryset = initial_queryset or table.objects.all()
+        intial_queryset = (
+            initial_queryset if initial_queryset is not None else table.objects.all()
+        )
         if issubclass(table, Spacegroup) and hasattr(table, "spacegroup"):
             intial_queryset = intial_queryset.select_related("spacegroup")
 
@@ -147,7 +425,7 @@ class SimmateAPIViewSet(GenericViewSet):
             (cls,),
             dict(
                 queryset=intial_queryset,
-                serializer_class=NewSerializer,
+                serializer_class=get_table_serializer(table),
                 filterset_class=table.api_filterset,
                 ordering_fields="__all__",  # allowed to order by any field
                 ordering=[default_ordering_field],  # set default order
@@ -162,8 +440,12 @@ class SimmateAPIViewSet(GenericViewSet):
         elif view_type == "retrieve":
             NewViewSet.template_name = cls.template_retrieve
             return NewViewSet.as_view({"get": "get_retrieve_response"})
+        elif view_type == "export":
+            return NewViewSet.as_view({"get": "get_export_response"})
         else:
-            raise Exception("Unknown view type. Must be 'list' or 'retrieve'.")
+            raise Exception(
+                "Unknown view type. Must be 'list', 'retrieve', or 'export'."
+            )
 
     # -------------------------------------------------------------------------
 
@@ -179,22 +461,24 @@ class SimmateAPIViewSet(GenericViewSet):
         view = cls.from_table(table=cls.table, view_type="retrieve")
         return view(request, **request_kwargs)
 
+    @classmethod
+    def export_view(cls, request, **request_kwargs):
+        view = cls.from_table(table=cls.table, view_type="export")
+        return view(request, **request_kwargs)
+
     # -------------------------------------------------------------------------
 
     # METHODS FOR DYNAMIC VIEWS
 
-    # NOTE: These dynamically create a serializer and a view EVERY TIME a
-    # URL is requested. This means...
-    #   1. there is no pre-set api that exists. The exisiting api must be inferred
-    #       from lower level workflows and their tables
-    #   2. these views will be very inefficient if queried by a script
-    # I chose dynamic creation over creating all endpoints on-startup to prevent
+    # NOTE: These dynamically find the table for a URL when it is requested,
+    # which means there is no pre-set api that exists. The exisiting api must
+    # be inferred from lower level workflows and their tables. I chose dynamic
+    # creation over creating all endpoints on-startup to prevent
     # the `from simmate.database import connect` method from taking too long --
-    # as that would require import all workflows on start-up. However, if the
-    # (1) api spec or (2) speed of this method ever becomes an issue, I can
-    # address these by either...
-    #   1. having a utility that prints out the full API spec but isn't called on startup
-    #   2. making all APIViews up-
+    # as that would require import all workflows on start-up. Views are only
+    # built on the first request to each endpoint and then reused (see
+    # `from_table`). If you'd like to avoid building on first request, use
+    # `warm_view_cache` instead.
 
     @classmethod
     def get_table(cls, request: HttpRequest, *args, **kwargs) -> Response:
@@ -231,6 +515,17 @@ class SimmateAPIViewSet(GenericViewSet):
         view = cls.from_table(table=table, view_type="retrieve")
         return view(request, **request_kwargs)
 
+    @classmethod
+    def dynamic_export_view(cls, request, **request_kwargs):
+        table = cls.get_table(request, **request_kwargs)
+        initial_queryset = cls.get_initial_queryset(request, **request_kwargs)
+        view = cls.from_table(
+            table=table,
+            initial_queryset=initial_queryset,
+            view_type="export",
+        )
+        return view(request, **request_kwargs)
+
     # -------------------------------------------------------------------------
 
     # OPTIONAL METHODS FOR SUPPLYING EXTRA CONTEXT TO HTML TEMPLATES
@@ -250,3 +545,36 @@ class SimmateAPIViewSet(GenericViewSet):
         context is returned.
         """
         return {}
+
+
+@lru_cache(maxsize=512)
+def get_table_serializer(
+    table: DatabaseTable,
+    fields: tuple[str] = None,
+    exclude: tuple[str] = None,
+) -> ModelSerializer:
+    """
+    Gives the serializer class for a database table. For all tables, we share
+    all the data -- no columns are hidden. Therefore the code for the
+    Serializer is always the same, and we only need to build it once per table.
+
+    Optionally, a subset of columns can be given with `fields` or `exclude`
+    (but not both). These must be tuples so that the result can be cached.
+    Because these come from user requests, the cache has a max size, and
+    callers should sort and deduplicate the names so that equivalent
+    requests share a serializer.
+    """
+
+    meta_attributes = dict(model=table)
+    if fields:
+        meta_attributes["fields"] = list(fields)
+    elif exclude:
+        meta_attributes["exclude"] = list(exclude)
+    else:
+        meta_attributes["fields"] = "__all__"
+
+    return type(
+        f"{table.table_name}Serializer",
+        (ModelSerializer,),
+        dict(Meta=type("Meta", (), meta_attributes)),
+    )
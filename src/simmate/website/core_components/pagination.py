@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+
+"""
+Pagination for the REST API and website that does not require an exact count
+of results. On tables with millions of rows, the COUNT query can take longer
+than loading the page itself, so we count using each table's `count_strategy`
+(see `SearchResults.get_count`) and figure out whether there is a next page
+by loading one extra row.
+"""
+
+from django.core.paginator import EmptyPage, InvalidPage, Page, Paginator
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.response import Response
+from rest_framework.pagination import (
+    CursorPagination,
+    PageNumberPagination,
+    _get_displayed_page_numbers,
+    _get_page_links,
+    remove_query_param,
+    replace_query_param,
+)
+
+
+class SearchResultsPage(Page):
+    """
+    A page of results where `has_next` is known from loading one extra row,
+    rather than from the total count.
+    """
+
+    def __init__(self, object_list, number, paginator, has_next: bool):
+        super().__init__(object_list, number, paginator)
+        self._has_next = has_next
+
+    def has_next(self) -> bool:
+        return self._has_next
+
+    def end_index(self) -> int:
+        return self.start_index() + len(self) - 1 if len(self) else 0
+
+
+class SearchResultsPaginator(Paginator):
+    """
+    A Django paginator that counts with the table's `count_strategy`. The
+    count may be an estimate or None, so it is only used to display the
+    number of pages and is never used to decide which rows to load.
+    """
+
+    @cached_property
+    def count(self) -> int:
+        if hasattr(self.object_list, "get_count"):
+            return self.object_list.get_count()
+        return super().count
+
+    @cached_property
+    def num_pages(self) -> int:
+        if self.count is None:
+            return None
+        return super().num_pages
+
+    def validate_number(self, number) -> int:
+        # Without an exact count, we can't know the last page ahead of time.
+        # Pages past the end are caught in `page` instead.
+        try:
+            if isinstance(number, float) and not number.is_integer():
+                raise ValueError
+            number = int(number)
+        except (TypeError, ValueError):
+            raise InvalidPage("That page number is not an integer")
+        if number < 1:
+            raise EmptyPage("That page number is less than 1")
+        return number
+
+    def page(self, number) -> SearchResultsPage:
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        top = bottom + self.per_page
+        # load one extra row to see if there is a next page
+        objects = list(self.object_list[bottom : top + 1])
+        if not objects and number > 1:
+            raise EmptyPage("That page contains no results")
+        return SearchResultsPage(
+            objects[: self.per_page],
+            number,
+            self,
+            has_next=len(objects) > self.per_page,
+        )
+
+
+class SearchResultsPagination(PageNumberPagination):
+    """
+    The default pagination for Simmate's REST API. This is the same as DRF's
+    `PageNumberPagination`, except the total "count" can be an estimate or
+    null depending on the table's `count_strategy`.
+    """
+
+    django_paginator_class = SearchResultsPaginator
+
+    def get_paginated_response(self, data) -> Response:
+        # same as PageNumberPagination, but also says if the count is only
+        # an estimate (see `SearchResults.get_count`)
+        count = self.page.paginator.count
+        return Response(
+            {
+                "count": count,
+                "count_is_estimate": getattr(count, "is_estimate", False),
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema: dict) -> dict:
+        schema = super().get_paginated_response_schema(schema)
+        schema["properties"]["count_is_estimate"] = {"type": "boolean"}
+        return schema
+
+    def paginate_queryset(self, queryset, request, view=None) -> list:
+        # This is copied from PageNumberPagination, except we decide whether
+        # to show page controls without using the total number of pages.
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        paginator = self.django_paginator_class(queryset, page_size)
+        page_number = self.get_page_number(request, paginator)
+
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            msg = self.invalid_page_message.format(
+                page_number=page_number, message=str(exc)
+            )
+            raise NotFound(msg)
+
+        if self.template is not None and (
+            self.page.has_next() or self.page.has_previous()
+        ):
+            # The browsable API should display pagination controls.
+            self.display_page_controls = True
+
+        self.request = request
+        return list(self.page)
+
+    def get_html_context(self) -> dict:
+        if self.page.paginator.num_pages is not None:
+            return super().get_html_context()
+
+        # Without a count, we only link to the pages next to the current one.
+        base_url = self.request.build_absolute_uri()
+
+        def page_number_to_url(page_number):
+            if page_number == 1:
+                return remove_query_param(base_url, self.page_query_param)
+            else:
+                return replace_query_param(base_url, self.page_query_param, page_number)
+
+        current = self.page.number
+        final = current + 1 if self.page.has_next() else current
+        page_numbers = _get_displayed_page_numbers(current, final)
+        page_links = _get_page_links(page_numbers, current, page_number_to_url)
+
+        return {
+            "previous_url": self.get_previous_link(),
+            "next_url": self.get_next_link(),
+            "page_links": page_links,
+        }
+
+
+class SearchResultsCursorPagination(CursorPagination):
+    """
+    Keyset (cursor) pagination for scripts that page through an entire table.
+    Rather than using OFFSET, each page starts from the last row of the
+    previous page, so every page is equally fast -- even a million rows in.
+
+    This is used by the REST API when `pagination=cursor` is given in the
+    URL (e.g. `?format=json&pagination=cursor`), and you then follow the `next`
+    link of each response. Results always use the table's default ordering
+    (`-created_at` or the primary key) unless `ordering=...` is also given.
+    """
+
+    page_size_query_param = "page_size"
+    max_page_size = 1000
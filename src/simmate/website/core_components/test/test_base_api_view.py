@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+
+import json
+from urllib.parse import parse_qsl, urlparse
+
+import pytest
+from rest_framework.test import APIRequestFactory
+
+from simmate.database.base_data_types import Spacegroup
+from simmate.website.core_components.base_api_view import (
+    SimmateAPIViewSet,
+    get_table_serializer,
+)
+from simmate.website.test_app.models import TestStructure
+
+
+@pytest.mark.django_db
+def test_view_cache(client, mocker):
+
+    mocker.patch.dict(SimmateAPIViewSet._view_cache, clear=True)
+    spy = mocker.spy(SimmateAPIViewSet, "_build_view")
+
+    # the view is only built on the first request
+    for _ in range(3):
+        response = client.get("/core-components/symmetry/?format=json")
+        assert response.status_code == 200
+    assert spy.call_count == 1
+
+    # views for different querysets of the same table are kept separate
+    view_all = SimmateAPIViewSet.from_table(TestStructure, "list")
+    view_filtered = SimmateAPIViewSet.from_table(
+        TestStructure,
+        "list",
+        initial_queryset=TestStructure.objects.filter(nsites=2),
+    )
+    assert view_all != view_filtered
+    assert view_all == SimmateAPIViewSet.from_table(TestStructure, "list")
+    assert view_filtered == SimmateAPIViewSet.from_table(
+        TestStructure,
+        "list",
+        initial_queryset=TestStructure.objects.filter(nsites=2),
+    )
+
+    # warming builds any views that do not exist yet
+    SimmateAPIViewSet.warm_view_cache([Spacegroup, TestStructure])
+    assert spy.call_count == 6
+
+    # serializers are shared by all views of a table
+    assert get_table_serializer(TestStructure) == get_table_serializer(TestStructure)
+
+
+@pytest.mark.django_db
+def test_column_projection(django_assert_num_queries):
+
+    view = SimmateAPIViewSet.from_table(TestStructure, "list")
+    factory = APIRequestFactory()
+
+    # only the requested columns are loaded and returned
+    request = factory.get("/", {"format": "json", "fields": "id,nsites"})
+    with django_assert_num_queries(2):  # the page + count
+        response = view(request)
+        response.render()
+    results = response.data["results"]
+    assert results and set(results[0].keys()) == {"id", "nsites"}
+
+    request = factory.get("/", {"format": "json", "exclude": "structure"})
+    response = view(request)
+    assert "structure" not in response.data["results"][0]
+    assert "nsites" in response.data["results"][0]
+
+    # unknown columns give a 400 error
+    request = factory.get("/", {"format": "json", "fields": "id,not_a_column"})
+    assert view(request).status_code == 400
+
+    # equivalent requests share a single serializer
+    get_table_serializer.cache_clear()
+    for fields in ["id,nsites", "nsites,id", "id,nsites,id,id"]:
+        response = view(factory.get("/", {"format": "json", "fields": fields}))
+        assert set(response.data["results"][0].keys()) == {"id", "nsites"}
+    assert get_table_serializer.cache_info().currsize == 1
+
+
+@pytest.mark.django_db
+def test_cursor_pagination():
+
+    view = SimmateAPIViewSet.from_table(TestStructure, "list")
+    factory = APIRequestFactory()
+    nstructures = TestStructure.objects.count()
+
+    # follow the "next" links through the full table
+    ids = []
+    params = {"format": "json", "pagination": "cursor", "page_size": 2}
+    while True:
+        response = view(factory.get("/", params))
+        assert response.status_code == 200
+        assert response.streaming
+        data = json.loads(b"".join(response.streaming_content))
+        ids += [row["id"] for row in data["results"]]
+        if not data["next"]:
+            break
+        params = dict(parse_qsl(urlparse(data["next"]).query))
+
+    assert len(ids) == nstructures
+    assert ids == list(
+        TestStructure.objects.order_by("-created_at").values_list("id", flat=True)
+    )
+
+
+@pytest.mark.django_db
+def test_export():
+
+    view = SimmateAPIViewSet.from_table(TestStructure, "export")
+    factory = APIRequestFactory()
+    nstructures = TestStructure.objects.filter(nsites__range=(1, 4)).count()
+
+    # filters and columns are applied to the export
+    request = factory.get("/", {"nsites__range": "1,4", "fields": "id,nsites"})
+    response = view(request)
+    assert response.status_code == 200
+    assert response.streaming
+    assert response["Content-Disposition"].endswith('TestStructure.csv"')
+    lines = b"".join(response.streaming_content).decode().splitlines()
+    assert lines[0] == "id,nsites"
+    assert len(lines) == nstructures + 1
+
+    request = factory.get("/", {"filetype": "jsonl", "exclude": "structure"})
+    response = view(request)
+    assert response["Content-Type"] == "application/jsonl"
+    rows = [json.loads(line) for line in response.streaming_content]
+    assert len(rows) == TestStructure.objects.count()
+    assert "structure" not in rows[0] and "spacegroup_id" in rows[0]
+
+    # unknown file types give a 400 error
+    request = factory.get("/", {"filetype": "xlsx"})
+    assert view(request).status_code == 400
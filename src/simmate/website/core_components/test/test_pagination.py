@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+from django.core.paginator import EmptyPage
+
+from simmate.database.base_data_types import SearchResults, Spacegroup
+from simmate.website.core_components.pagination import SearchResultsPaginator
+from simmate.website.test_app.models import TestStructure
+
+
+@pytest.mark.django_db
+def test_paginator(mocker, django_assert_num_queries):
+
+    queryset = TestStructure.objects.order_by("id")
+    nstructures = queryset.count()
+
+    # with a count, this behaves like the normal django paginator
+    paginator = SearchResultsPaginator(queryset, 2)
+    assert paginator.count == nstructures
+    assert paginator.num_pages == -(-nstructures // 2)
+    page = paginator.page(paginator.num_pages)
+    assert not page.has_next()
+
+    # without a count, pages are still loaded with a single query
+    mocker.patch.object(TestStructure, "count_strategy", "none")
+    paginator = SearchResultsPaginator(queryset, 2)
+    with django_assert_num_queries(1):
+        page = paginator.page(1)
+        assert paginator.count is None
+        assert paginator.num_pages is None
+    assert page.has_next()
+    assert list(page) == list(queryset[:2])
+
+    last_page = -(-nstructures // 2)
+    page = paginator.page(last_page)
+    assert not page.has_next()
+    assert page.end_index() == nstructures
+
+    with pytest.raises(EmptyPage):
+        paginator.page(last_page + 1)
+
+
+@pytest.mark.django_db
+def test_pagination_without_count(client, mocker):
+    mocker.patch.object(Spacegroup, "count_strategy", "none")
+    response = client.get("/core-components/symmetry/?format=json")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["count"] is None
+    assert data["count_is_estimate"] is False
+    assert data["next"]
+    assert len(data["results"]) == 12
+
+
+@pytest.mark.django_db
+def test_pagination_estimated_count(client, mocker):
+    mocker.patch.object(Spacegroup, "count_strategy", "estimate")
+    mocker.patch.object(SearchResults, "_get_planner_estimate", return_value=50_000)
+    response = client.get("/core-components/symmetry/?format=json")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["count"] == 50_000
+    assert data["count_is_estimate"] is True
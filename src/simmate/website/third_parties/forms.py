@@ -45,6 +45,19 @@ class ChemicalSystemForm(forms.Form):
     simmate = forms.BooleanField(required=False)
     oqmd = forms.BooleanField(required=False)
 
+    providers = ["aflow", "cod", "jarvis", "materials_project", "oqmd"]
+    """
+    The third-party providers that can be searched with this form. Note that
+    `simmate` is not searchable yet.
+    """
+
+    def get_providers(self) -> list[str]:
+        """
+        Gives the providers that the user requested. This should only be
+        called after the form is validated.
+        """
+        return [provider for provider in self.providers if self.cleaned_data[provider]]
+
     def clean_chemical_system(self):
 
         # Our database expects the chemical system to be given in alphabetical
@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+
+"""
+Utilities for searching many third-party providers at once.
+
+Each provider lives in its own (often very large) table, so a single search
+from the home page involves several independent queries plus a count for each.
+Rather than running these one after another, we send each provider query to
+a thread. Django gives every thread its own database connection, so the
+queries run concurrently on the database server. Results are then merged
+into a single list with a common ordering.
+
+Because users tend to search the same chemical systems repeatedly (and the
+third-party data rarely changes), recent results are also kept in the
+django cache.
+"""
+
+import hashlib
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.cache import cache
+from django.db import connection, connections
+from django.db.models import F
+
+from simmate.database.base_data_types.base import EstimatedCount
+from simmate.database.third_parties import (
+    AflowStructure,
+    CodStructure,
+    JarvisStructure,
+    MatprojStructure,
+    OqmdStructure,
+)
+
+PROVIDER_TABLES = {
+    "aflow": AflowStructure,
+    "cod": CodStructure,
+    "jarvis": JarvisStructure,
+    "materials_project": MatprojStructure,
+    "oqmd": OqmdStructure,
+}
+"""
+Maps the provider names used in search forms and URLs to their structure table
+"""
+
+SEARCH_CACHE_TIMEOUT = 60 * 10
+"""
+How long (in seconds) the results for a chemical system search are cached
+"""
+
+SEARCH_FIELDS = [
+    "id",
+    "source",
+    "formula_reduced",
+    "chemical_system",
+    "energy_above_hull",
+    "nsites",
+    "spacegroup_id",
+    "density",
+    "volume_molar",
+    "external_link",
+]
+"""
+The attributes of each result that are returned by `serialize_results`
+"""
+
+
+def search_providers(
+    chemical_systems: list[str],
+    providers: list[str] = None,
+    limit: int = 50,
+    parallel: bool = None,
+    use_cache: bool = True,
+) -> dict:
+    """
+    Searches the structure tables of many third-party providers for the given
+    chemical systems, and then merges the results into a single list.
+
+    Results are sorted by their energy above the hull (lowest first), where
+    structures without a hull energy are placed last. Ties (and structures
+    without a hull energy) keep the order of `providers`.
+
+    #### Parameters
+
+    - `chemical_systems`:
+        a list of chemical systems to search for (e.g. ["C-Y", "C", "Y"]).
+        Elements in each system must be in alphabetical order, which
+        `ChemicalSystemForm` takes care of.
+
+    - `providers`:
+        the providers to search (keys of `PROVIDER_TABLES`). Defaults to all
+        providers.
+
+    - `limit`:
+        the maximum number of structures returned from each provider
+
+    - `parallel`:
+        whether to query each provider in a separate thread (and therefore on
+        a separate database connection). By default, this is True unless
+        the database is SQLite, where concurrent reads of a single file offer
+        little benefit.
+
+    - `use_cache`:
+        whether to check the django cache for a recent identical search, and
+        to store the results there when there isn't one.
+
+    #### Returns
+
+    A dictionary with the merged list of `structures` and the total number of
+    matching structures across all providers (`nstructures_possible`). The
+    total is None when any provider's count strategy does not give a count.
+    """
+
+    providers = providers if providers is not None else list(PROVIDER_TABLES)
+    for provider in providers:
+        if provider not in PROVIDER_TABLES:
+            raise ValueError(
+                f"Unknown provider '{provider}'. Options are {list(PROVIDER_TABLES)}"
+            )
+
+    if use_cache:
+        cache_key = _get_search_cache_key(chemical_systems, providers, limit)
+        results = cache.get(cache_key)
+        if results is not None:
+            return results
+
+    if parallel is None:
+        parallel = connection.vendor != "sqlite"
+
+    tables = [PROVIDER_TABLES[provider] for provider in providers]
+    if parallel and len(tables) > 1:
+        with ThreadPoolExecutor(max_workers=len(tables)) as executor:
+            futures = [
+                executor.submit(
+                    _search_provider_in_thread,
+                    table,
+                    chemical_systems,
+                    limit,
+                )
+                for table in tables
+            ]
+            provider_results = [future.result() for future in futures]
+    else:
+        provider_results = [
+            _search_provider(table, chemical_systems, limit) for table in tables
+        ]
+
+    # merge all results into a single list. Python's sort is stable, so
+    # structures with equal (or missing) hull energies stay grouped by provider
+    structures = []
+    nstructures_possible = 0
+    is_estimate = False
+    for provider_structures, count in provider_results:
+        structures += provider_structures
+        if count is None or nstructures_possible is None:
+            nstructures_possible = None
+        else:
+            nstructures_possible += count
+            is_estimate |= getattr(count, "is_estimate", False)
+    structures.sort(key=_get_sort_key)
+
+    # the total is only an estimate if any of the provider counts are
+    if is_estimate and nstructures_possible is not None:
+        nstructures_possible = EstimatedCount(nstructures_possible)
+
+    results = {
+        "structures": structures,
+        "nstructures_possible": nstructures_possible,
+    }
+
+    if use_cache:
+        cache.set(cache_key, results, timeout=SEARCH_CACHE_TIMEOUT)
+
+    return results
+
+
+def serialize_results(results: dict) -> dict:
+    """
+    Converts the output of `search_providers` into a JSON-serializable
+    dictionary, where each structure is given by the `SEARCH_FIELDS`.
+    """
+    return {
+        "nstructures_possible": results["nstructures_possible"],
+        "nstructures_possible_is_estimate": getattr(
+            results["nstructures_possible"], "is_estimate", False
+        ),
+        "results": [
+            {field: getattr(structure, field, None) for field in SEARCH_FIELDS}
+            for structure in results["structures"]
+        ],
+    }
+
+
+def _search_provider(
+    table,
+    chemical_systems: list[str],
+    limit: int,
+) -> tuple[list, int]:
+    """
+    Queries a single provider table, returning the first `limit` structures
+    and the total count of matching structures.
+    """
+    # We dont want to load the structure json -- so that everything runs faster.
+    search_results = table.objects.filter(chemical_system__in=chemical_systems).defer(
+        "structure"
+    )
+
+    # if the database provides the hull energy, we want to sort
+    # the structures by that (putting highest priority on stable ones)
+    if hasattr(table, "energy_above_hull"):
+        # if there isn't a hull energy value, place these last
+        search_results = search_results.order_by(
+            F("energy_above_hull").asc(nulls_last=True)
+        )
+
+    # Counting can be slow on large tables, so we use each table's count
+    # strategy (which may not give a count at all).
+    count = table.objects.filter(chemical_system__in=chemical_systems).get_count()
+
+    return list(search_results[:limit]), count
+
+
+def _search_provider_in_thread(
+    table,
+    chemical_systems: list[str],
+    limit: int,
+) -> tuple[list, int]:
+    """
+    Runs `_search_provider` and then closes the thread's database connection.
+    Django opens a new connection for every thread, so without this, each
+    search would leave connections open until the database times them out.
+    """
+    try:
+        return _search_provider(table, chemical_systems, limit)
+    finally:
+        connections.close_all()
+
+
+def _get_sort_key(structure) -> tuple:
+    energy = getattr(structure, "energy_above_hull", None)
+    return (energy is None, energy or 0)
+
+
+def _get_search_cache_key(
+    chemical_systems: list[str],
+    providers: list[str],
+    limit: int,
+) -> str:
+    search = json.dumps([sorted(chemical_systems), sorted(providers), limit])
+    search_hash = hashlib.sha256(search.encode()).hexdigest()
+    return f"simmate-provider-search-{search_hash}"
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+
+import threading
+from types import SimpleNamespace
+
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+
+from simmate.database.base_data_types import SearchResults
+from simmate.database.third_parties import JarvisStructure, OqmdStructure
+from simmate.website.third_parties.search import (
+    _get_search_cache_key,
+    search_providers,
+)
+
+
+@pytest.fixture
+def provider_structures(sample_structures):
+    structure = sample_structures["C_mp-48_primitive"]
+    JarvisStructure.from_toolkit(
+        id="jvasp-1",
+        structure=structure,
+        energy_above_hull=0.2,
+    ).save()
+    JarvisStructure.from_toolkit(
+        id="jvasp-2",
+        structure=structure,
+        energy_above_hull=None,
+    ).save()
+    OqmdStructure.from_toolkit(id="oqmd-1", structure=structure).save()
+    # a structure from a different chemical system that should never be found
+    OqmdStructure.from_toolkit(
+        id="oqmd-2",
+        structure=sample_structures["NaCl_mp-22862_primitive"],
+    ).save()
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.mark.django_db
+def test_search_providers(provider_structures):
+
+    results = search_providers(
+        chemical_systems=["C"],
+        providers=["oqmd", "jarvis"],
+        parallel=False,
+    )
+    # structures with a hull energy come first. The rest keep the provider order
+    assert [s.id for s in results["structures"]] == ["jvasp-1", "oqmd-1", "jvasp-2"]
+    assert results["nstructures_possible"] == 3
+
+    # the limit applies to each provider
+    results = search_providers(
+        chemical_systems=["C"],
+        providers=["oqmd", "jarvis"],
+        limit=1,
+        parallel=False,
+    )
+    assert [s.id for s in results["structures"]] == ["jvasp-1", "oqmd-1"]
+    assert results["nstructures_possible"] == 3
+
+    with pytest.raises(ValueError):
+        search_providers(chemical_systems=["C"], providers=["fake-provider"])
+
+
+def test_search_providers_parallel(mocker):
+
+    # Threads open their own database connections, which can't see the data
+    # of a test's transaction. So we only check the threading and merging here.
+    threads_used = set()
+
+    def search_provider(table, chemical_systems, limit):
+        threads_used.add(threading.get_ident())
+        energy = 0.1 if table == JarvisStructure else None
+        return [SimpleNamespace(id=table.__name__, energy_above_hull=energy)], 2
+
+    mocker.patch(
+        "simmate.website.third_parties.search._search_provider",
+        side_effect=search_provider,
+    )
+    close_all = mocker.patch("simmate.website.third_parties.search.connections")
+
+    results = search_providers(
+        chemical_systems=["C"],
+        providers=["oqmd", "jarvis"],
+        parallel=True,
+        use_cache=False,
+    )
+    assert [s.id for s in results["structures"]] == ["JarvisStructure", "OqmdStructure"]
+    assert results["nstructures_possible"] == 4
+    assert threading.get_ident() not in threads_used
+    assert close_all.close_all.call_count == 2
+
+
+@pytest.mark.django_db
+def test_search_providers_cache(provider_structures, django_assert_num_queries):
+
+    # one query for the results and one for the count
+    with django_assert_num_queries(2):
+        results = search_providers(chemical_systems=["C"], providers=["jarvis"])
+    assert len(results["structures"]) == 2
+
+    # repeat searches are pulled from the cache
+    with django_assert_num_queries(0):
+        results_cached = search_providers(
+            chemical_systems=["C"],
+            providers=["jarvis"],
+        )
+    assert [s.id for s in results_cached["structures"]] == ["jvasp-1", "jvasp-2"]
+
+    # unless the cache is skipped. Jarvis counts are still pulled from the
+    # cache though (see `DatabaseTable.count_strategy`)
+    with django_assert_num_queries(1):
+        search_providers(
+            chemical_systems=["C"],
+            providers=["jarvis"],
+            use_cache=False,
+        )
+
+    # the order of providers doesn't matter
+    assert _get_search_cache_key(["C"], ["oqmd", "jarvis"], 50) == (
+        _get_search_cache_key(["C"], ["jarvis", "oqmd"], 50)
+    )
+
+
+@pytest.mark.django_db
+def test_search_view(client, provider_structures, mocker):
+
+    url = reverse("third_parties:search")
+
+    # like the home page, searching requires the user to be signed in
+    response = client.get(url, {"chemical_system": "C", "jarvis": True})
+    assert response.status_code == 302
+    client.login(username="test_user", password="test_password")
+
+    response = client.get(url, {"chemical_system": "C", "jarvis": True, "oqmd": True})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["nstructures_possible"] == 3
+    assert [r["id"] for r in data["results"]] == ["jvasp-1", "jvasp-2", "oqmd-1"]
+    assert data["results"][0]["source"] == "JARVIS"
+    assert data["results"][1]["energy_above_hull"] is None
+    assert "structure" not in data["results"][0]
+
+    response = client.get(
+        url, {"chemical_system": "C", "jarvis": True, "format": "html"}
+    )
+    assert response.status_code == 200
+    assert b"jvasp-1" in response.content
+    assert data["nstructures_possible_is_estimate"] is False
+
+    # planner estimates are flagged and shown as approximate
+    cache.clear()
+    mocker.patch.object(SearchResults, "_get_planner_estimate", return_value=50_000)
+    response = client.get(url, {"chemical_system": "C", "jarvis": True})
+    assert response.json()["nstructures_possible_is_estimate"] is True
+    response = client.get(
+        url, {"chemical_system": "C", "jarvis": True, "format": "html"}
+    )
+    assert b"about 50000" in response.content
+
+    response = client.get(url, {"chemical_system": "C" * 30})
+    assert response.status_code == 400
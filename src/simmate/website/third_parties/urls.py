@@ -10,11 +10,21 @@ urlpatterns = [
         view=views.providers_all,
         name="home",
     ),
+    path(
+        route="search/",
+        view=views.search,
+        name="search",
+    ),
     path(
         route="<provider_name>/",
         view=views.ProviderAPIViewSet.dynamic_list_view,
         name="provider",
     ),
+    path(
+        route="<provider_name>/export/",
+        view=views.ProviderAPIViewSet.dynamic_export_view,
+        name="provider-export",
+    ),
     path(
         route="<provider_name>/<pk>/",
         view=views.ProviderAPIViewSet.dynamic_retrieve_view,
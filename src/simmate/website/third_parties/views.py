@@ -1,5 +1,7 @@
 # -*- coding: utf-8 -*-
 
+from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
 from django.shortcuts import render
 
 from simmate.database import third_parties
@@ -13,6 +15,8 @@ from simmate.database.third_parties import (
     OqmdStructure,
 )
 from simmate.website.core_components.base_api_view import SimmateAPIViewSet
+from simmate.website.third_parties.forms import ChemicalSystemForm
+from simmate.website.third_parties.search import search_providers, serialize_results
 
 
 def providers_all(request):
@@ -30,6 +34,38 @@ def providers_all(request):
     return render(request, template, context)
 
 
+@login_required
+def search(request):
+    """
+    Searches all requested providers for a chemical system. This accepts the
+    same fields as `ChemicalSystemForm` as URL parameters, for example:
+    `/third-parties/search/?chemical_system=Y-C&include_subsystems=true&jarvis=true`
+
+    Results are given as JSON by default, or as the home page's results
+    table when `format=html` is given. Like the home page search, this
+    requires the user to be signed in.
+    """
+    form = ChemicalSystemForm(request.GET)
+    if not form.is_valid():
+        return JsonResponse({"errors": form.errors}, status=400)
+
+    results = search_providers(
+        chemical_systems=form.cleaned_data["chemical_system"],
+        providers=form.get_providers(),
+        limit=50,
+    )
+
+    if request.GET.get("format", "json") == "html":
+        context = {
+            "chemical_system_form": form,
+            **results,
+        }
+        template = "home/home.html"
+        return render(request, template, context)
+
+    return JsonResponse(serialize_results(results))
+
+
 class ProviderAPIViewSet(SimmateAPIViewSet):
 
     template_list = "third_parties/provider.html"
@@ -224,5 +224,6 @@ INPUT_MAPPINGS = {
         "copy_previous_directory",
         "is_restart",
         "compress_output",
+        "warm_start",
     ],
 }
@@ -36,6 +36,13 @@ urlpatterns = [
         name="workflow_run_detail",
     ),
     #
+    # Downloads all results (or a filtered subset) as a single file
+    path(
+        route="<workflow_type>/<workflow_calculator>/<workflow_preset>/export",
+        view=views.WorkflowAPIViewSet.dynamic_export_view,
+        name="workflow_export",
+    ),
+    #
     # Submit a new calculation
     path(
         route="<workflow_type>/<workflow_calculator>/<workflow_preset>/submit",
@@ -53,6 +53,14 @@ class ErrorHandler(ABC):
     that occur early in the run but do not cause immediate failure.
     """
 
+    monitor_timestep: float = None
+    """
+    If this handler is a monitor, this is how often (in seconds) its `check`
+    should be called while the job runs. Monitors each run on their own
+    schedule, so a slow or infrequent check does not delay other monitors.
+    If None, the S3Workflow's `polling_timestep * monitor_freq` is used.
+    """
+
     has_custom_termination: bool = False
     """
     If this error handler has a custom method to end the job. This is useful in
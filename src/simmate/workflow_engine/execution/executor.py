@@ -63,6 +63,41 @@ class SimmateExecutor:
         # and return the workitem/future for use
         return workitem
 
+    @staticmethod
+    def submit_many(
+        fxn: callable,
+        kwargs_list: list[dict],
+        tags: list[str] = [],
+        batch_size: int = 500,
+    ) -> list[WorkItem]:
+        """
+        Submits many calls of the same function at once, where each entry of
+        `kwargs_list` gives the kwargs for a single call. This is equivalent
+        to calling `submit(fxn, tags=tags, **kwargs)` for each entry, but the
+        function is only pickled once and all WorkItems are added to the
+        database with a single bulk insert (per `batch_size` items).
+
+        The WorkItems are returned in the same order as `kwargs_list`.
+        """
+
+        # the function is identical for every call, so we only pickle it once
+        fxn_pickled = cloudpickle.dumps(fxn)
+        args_pickled = cloudpickle.dumps(())
+
+        workitems = [
+            WorkItem(
+                fxn=fxn_pickled,
+                args=args_pickled,
+                kwargs=cloudpickle.dumps(kwargs),
+                tags=tags,  # should be json serializable already
+            )
+            for kwargs in kwargs_list
+        ]
+
+        # bulk_create keeps the input order and (for postgres and recent
+        # versions of sqlite) sets the primary key on each object
+        return WorkItem.objects.bulk_create(workitems, batch_size=batch_size)
+
     @staticmethod
     def wait(workitems: list[WorkItem]):
         """
@@ -182,19 +217,6 @@ class SimmateExecutor:
     # Extra methods to add if I want to be consistent with other Executor classes
     # -------------------------------------------------------------------------
 
-    # @staticmethod
-    # def map(fxn, iterables, timeout=None, chunksize=100):  # TODO
-    #     # chunksize indicates how many to add at one
-    #     # iterables is a list of (*args, **kwargs)
-    #     # add many fn(*args, **kwargs) to queue
-
-    #     # TODO -- This is not supported at the moment. I should use the
-    #     # .bulk_create method to do this in the future:
-    #     # https://docs.djangoproject.com/en/3.1/ref/models/querysets/#bulk-create
-
-    #     # raise an error to ensure user sees this isn't supported yet.
-    #     raise Exception("This method is not supported yet")
-
     # @staticmethod
     # def shutdown(wait=True, cancel_futures=False):  # TODO
     #     # whether to wait until the queue is empty
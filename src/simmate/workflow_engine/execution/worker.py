@@ -8,6 +8,7 @@ import cloudpickle  # needed to serialize Prefect workflow runs and tasks
 from django.db import transaction
 from rich import print
 
+from simmate.database.utilities import reconnect_on_failure, run_with_fresh_connections
 from simmate.workflow_engine.execution.database import WorkItem
 
 # This string is just something fancy to display in the console when a worker
@@ -144,31 +145,13 @@ class SimmateWorker:
                         logging.info("The task queue is empty. Shutting down.")
                         return
 
-            # make this atomic so that multiple workers don't accidentally
-            # grab the same job.
-            with transaction.atomic():
-
-                # If we've made it this far, we're ready to grab a new WorkItem
-                # and run it!
-                # Query for PENDING WorkItems, lock it for editting, and update
-                # the status to RUNNING. And grab the first result
-                workitem = (
-                    WorkItem.objects.select_for_update(skip_locked=True)
-                    .filter(status="P")
-                    .filter_by_tags(self.tags)
-                    .first()
-                )
-
-                # Catch race condition where no workitems are available any more.
-                # If this is the case, we just restart the while loop.
-                if not workitem:
-                    continue
+            # grab the next WorkItem and mark it as running
+            workitem = self._get_next_workitem()
 
-                # update the status to running before starting it so no other
-                # worker tries to grab the same WorkItem
-                workitem.status = "R"
-                # TODO: indicate that the WorkItem is with this Worker (relationship)
-                workitem.save()
+            # Catch race condition where no workitems are available any more.
+            # If this is the case, we just restart the while loop.
+            if not workitem:
+                continue
 
             # Print out the job ID that is being ran for the user to see
             logging.info(f"Running WorkItem with id {workitem.id}")
@@ -178,9 +161,13 @@ class SimmateWorker:
             args = cloudpickle.loads(workitem.args)
             kwargs = cloudpickle.loads(workitem.kwargs)
 
-            # Try running the WorkItem
+            # Try running the WorkItem. Workitems can run for hours, so the
+            # connection we used to grab it may be closed by the time it
+            # finishes. We therefore refresh connections before and after,
+            # which also keeps connections from being held open when the
+            # database uses CONN_MAX_AGE=0 (e.g. with an external pooler).
             try:
-                result = fxn(*args, **kwargs)
+                result = run_with_fresh_connections(fxn, *args, **kwargs)
             # if it fails, we want to "capture" the error and return it
             # rather than have the Worker fail itself.
             except Exception as exception:
@@ -249,17 +236,9 @@ class SimmateWorker:
                 # otherwise package the full error
                 result_pickled = cloudpickle.dumps(exception)
 
-            # our lock exists only within this transation
-            with transaction.atomic():
-                # requery the WorkItem to restart our lock
-                workitem = WorkItem.objects.select_for_update().get(pk=workitem.pk)
-
-                # pickle the result and update the workitem's result and status
-                # !!! should I have the pickle inside of a Try?
-                workitem.result_binary = result_pickled
-                # mark as finished or errored depending on result value
-                workitem.status = "E" if isinstance(result, Exception) else "F"
-                workitem.save()
+            self._save_result(
+                workitem, result_pickled, is_error=isinstance(result, Exception)
+            )
 
             # mark down that we've completed one WorkItem
             ntasks_finished += 1
@@ -267,6 +246,56 @@ class SimmateWorker:
             # Print out the job ID that was just finished for the user to see.
             logging.info("Completed WorkItem")
 
+    @reconnect_on_failure
+    def _get_next_workitem(self) -> WorkItem:
+        """
+        Grabs the next pending WorkItem and marks it as running. Returns None
+        if there are no WorkItems available.
+        """
+        # make this atomic so that multiple workers don't accidentally
+        # grab the same job.
+        with transaction.atomic():
+
+            # Query for PENDING WorkItems, lock it for editting, and update
+            # the status to RUNNING. And grab the first result
+            workitem = (
+                WorkItem.objects.select_for_update(skip_locked=True)
+                .filter(status="P")
+                .filter_by_tags(self.tags)
+                .first()
+            )
+
+            if not workitem:
+                return
+
+            # update the status to running before starting it so no other
+            # worker tries to grab the same WorkItem
+            workitem.status = "R"
+            # TODO: indicate that the WorkItem is with this Worker (relationship)
+            workitem.save()
+
+        return workitem
+
+    @staticmethod
+    @reconnect_on_failure
+    def _save_result(workitem: WorkItem, result_pickled: bytes, is_error: bool):
+        """
+        Saves the pickled result of a WorkItem and marks it as finished or
+        errored.
+        """
+        # our lock exists only within this transation
+        with transaction.atomic():
+            # requery the WorkItem to restart our lock
+            workitem = WorkItem.objects.select_for_update().get(pk=workitem.pk)
+
+            # pickle the result and update the workitem's result and status
+            # !!! should I have the pickle inside of a Try?
+            workitem.result_binary = result_pickled
+            # mark as finished or errored depending on result value
+            workitem.status = "E" if is_error else "F"
+            workitem.save()
+
+    @reconnect_on_failure
     def queue_size(self) -> int:
         """
         Return the approximate size of the queue.
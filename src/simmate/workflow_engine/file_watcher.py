@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+
+"""
+Utilities that let S3Workflow monitors wake up as soon as the file they check
+has been modified -- rather than checking on a fixed schedule. On Linux, this
+uses inotify (via ctypes, so no extra dependencies are needed). On all other
+systems, or if inotify is unavailable, we fall back to polling file stats.
+"""
+
+import asyncio
+import ctypes
+import ctypes.util
+import logging
+import os
+import platform
+import struct
+from pathlib import Path
+
+
+class DirectoryWatcher:
+    """
+    Watches the files within a single directory and reports when any of them
+    change. This base class uses polling of file stats (modification time
+    and size), which works on every operating system.
+
+    Watchers must be used within a running event loop:
+
+    ``` python
+    watcher = DirectoryWatcher(directory)
+    watcher.start()
+    await watcher.wait_for_change("vasp.out")
+    watcher.stop()
+    ```
+    """
+
+    def __init__(self, directory: Path, polling_timestep: float = 1):
+        self.directory = Path(directory)
+        self.polling_timestep = polling_timestep
+        # one event per filename that has been requested by a monitor
+        self._events = {}
+        self._polling_task = None
+        self._last_stats = {}
+
+    def start(self):
+        self._polling_task = asyncio.create_task(self._poll_forever())
+
+    def stop(self):
+        if self._polling_task:
+            self._polling_task.cancel()
+
+    async def wait_for_change(self, filename: str):
+        """
+        Waits until the file has changed since the last time this method
+        returned for the same filename. If the file already exists when it is
+        first requested, that counts as a change so that it is checked once.
+        """
+        if filename not in self._events:
+            self._events[filename] = asyncio.Event()
+            if (self.directory / filename).exists():
+                self._events[filename].set()
+        event = self._events[filename]
+        await event.wait()
+        event.clear()
+
+    def _mark_changed(self, filename: str):
+        if filename in self._events:
+            self._events[filename].set()
+
+    def _get_stat(self, filename: str) -> tuple:
+        try:
+            stat = (self.directory / filename).stat()
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    async def _poll_forever(self):
+        while True:
+            await asyncio.sleep(self.polling_timestep)
+            for filename in list(self._events.keys()):
+                new_stat = self._get_stat(filename)
+                if new_stat != self._last_stats.get(filename, new_stat):
+                    self._mark_changed(filename)
+                self._last_stats[filename] = new_stat
+
+
+class InotifyDirectoryWatcher(DirectoryWatcher):
+    """
+    A DirectoryWatcher that uses Linux inotify events instead of polling.
+    The inotify file descriptor is registered with the event loop, so changes
+    are reported as soon as they happen and no work is done otherwise.
+    """
+
+    # flags taken from <sys/inotify.h>
+    IN_MODIFY = 0x00000002
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+
+    _event_header = struct.Struct("iIII")
+
+    def __init__(self, directory: Path, polling_timestep: float = 1):
+        super().__init__(directory, polling_timestep)
+        self._fd = None
+        self._libc = self._load_libc()
+
+    @staticmethod
+    def _load_libc():
+        return ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+
+    @classmethod
+    def is_available(cls) -> bool:
+        if platform.system() != "Linux":
+            return False
+        try:
+            return hasattr(cls._load_libc(), "inotify_init1")
+        except OSError:
+            return False
+
+    def start(self):
+        self._fd = self._libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        watch_id = self._libc.inotify_add_watch(
+            self._fd,
+            str(self.directory).encode(),
+            self.IN_MODIFY | self.IN_CLOSE_WRITE | self.IN_MOVED_TO | self.IN_CREATE,
+        )
+        if watch_id < 0:
+            os.close(self._fd)
+            raise OSError(ctypes.get_errno(), "inotify_add_watch failed")
+        asyncio.get_running_loop().add_reader(self._fd, self._read_events)
+
+    def stop(self):
+        if self._fd is not None:
+            asyncio.get_running_loop().remove_reader(self._fd)
+            os.close(self._fd)
+            self._fd = None
+
+    def _read_events(self):
+        try:
+            buffer = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return
+        offset = 0
+        while offset < len(buffer):
+            _, _, _, name_length = self._event_header.unpack_from(buffer, offset)
+            offset += self._event_header.size
+            name = buffer[offset : offset + name_length].rstrip(b"\0").decode()
+            offset += name_length
+            self._mark_changed(name)
+
+
+def get_directory_watcher(
+    directory: Path,
+    polling_timestep: float = 1,
+) -> DirectoryWatcher:
+    """
+    Gives an inotify-based watcher when possible and falls back to a polling
+    watcher otherwise.
+    """
+    if InotifyDirectoryWatcher.is_available():
+        return InotifyDirectoryWatcher(directory, polling_timestep)
+    logging.debug("inotify is unavailable. Falling back to polling file changes.")
+    return DirectoryWatcher(directory, polling_timestep)
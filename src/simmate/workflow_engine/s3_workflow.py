@@ -1,17 +1,25 @@
 # -*- coding: utf-8 -*-
 
+import asyncio
+import codecs
 import logging
 import os
 import platform
 import signal
 import subprocess
-import time
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import pandas
 
 from simmate.utilities import get_directory, make_error_archive
+from simmate.utilities.async_wrapper import async_to_sync
 from simmate.workflow_engine import ErrorHandler, Workflow
+from simmate.workflow_engine.file_watcher import (
+    DirectoryWatcher,
+    get_directory_watcher,
+)
 
 
 class S3Workflow(Workflow):
@@ -73,17 +81,28 @@ class S3Workflow(Workflow):
     the monitor checks every other loop -- or every 2x10 = 20 seconds. The
     default values of polling_timestep=10 and monitor_freq=30 indicate that
     we run monitoring functions every 5 minutes (10x30=300s=5min).
+
+    Each monitor runs on its own schedule, so an individual error handler
+    can override this timing with its `monitor_timestep` attribute.
+    """
+
+    monitor_file_events: bool = False
+    """
+    (experimental feature)
+    Whether monitors should be triggered by file-system events instead of a
+    fixed schedule. When True, any monitor with a `filename_to_check` is woken
+    as soon as that file is modified (using inotify on Linux and falling back
+    to polling file stats elsewhere) and is skipped entirely while the file
+    is unchanged. Monitors are still checked no more than once every
+    `polling_timestep` seconds (or the handler's `monitor_timestep`, if it
+    sets one). Monitors without a `filename_to_check` (such
+    as walltime handlers) keep running on their normal schedule.
     """
 
     # cleanup_on_fail=False, # TODO I should add a Prefect state_handler that can
     # reset the working directory between task retries -- in some cases we may
     # want to delete the entire directory.
 
-    # OPTIMIZE: I think this class would greatly benefit from asyncio so that we
-    # know exactly when a shelltask completes, rather than looping and checking every
-    # set timestep.
-    # https://docs.python.org/3/library/asyncio-subprocess.html#asyncio.create_subprocess_exec
-
     @classmethod
     def run_config(
         cls,
@@ -169,14 +188,7 @@ class S3Workflow(Workflow):
             logging.info("Calculation is already completed. Skipping execution.")
 
             # load the corrections from file for reference
-            corrections_filename = directory / "simmate_corrections.csv"
-            if corrections_filename.exists():
-                data = pandas.read_csv(corrections_filename)
-                corrections = data.values.tolist()
-            else:
-                corrections = []
-            # OPTIMIZE: this same code is at the start of the execute method.
-            # Consider making it into a utility.
+            corrections = cls._load_corrections(directory)
 
         # run the workup stage of the task. This is where the data/info is pulled
         # out from the calculation and is thus our "result".
@@ -288,6 +300,19 @@ class S3Workflow(Workflow):
             return False  # indicates something is missing
         return True  # indicates all files are present
 
+    @staticmethod
+    def _load_corrections(directory: Path) -> list[tuple[str]]:
+        """
+        In case this is a restarted calculation, check if there is a list
+        of corrections in the current directory and load those as the start
+        point. Otherwise we start with zero corrections.
+        """
+        corrections_filename = directory / "simmate_corrections.csv"
+        if corrections_filename.exists():
+            data = pandas.read_csv(corrections_filename)
+            return data.values.tolist()
+        return []
+
     @classmethod
     def execute(cls, directory: Path, command: str) -> list[tuple[str]]:
         """
@@ -297,8 +322,12 @@ class S3Workflow(Workflow):
         You should never call this method directly unless you are debugging. This
         is becuase `execute` is normally called within the `run` method.
 
-        Some tasks don't require a setup() method, so by default, this method
-        does nothing but "pass".
+        This is a synchronous wrapper around `execute_async`, which is where
+        the actual supervision takes place. If it is called from code that
+        already has a running event loop (e.g. within another coroutine), the
+        supervision runs in a new event loop on a separate thread, which blocks
+        the calling loop until the command finishes. Async code should
+        therefore await `execute_async` directly instead.
 
         #### Parameters
 
@@ -314,23 +343,34 @@ class S3Workflow(Workflow):
             correction applied. Ex: [("ExampleError", "ExampleCorrection")]
 
         """
+        return _run_async(cls.execute_async, directory, command)
+
+    @classmethod
+    async def execute_async(cls, directory: Path, command: str) -> list[tuple[str]]:
+        """
+        The asyncio version of `execute`. Process exit, the output streams, and
+        each monitor are all watched concurrently, so we know exactly when the
+        command completes and a slow monitor never delays this.
+
+        Because this is a coroutine, a single python process can supervise
+        several calculations at once. See `execute_concurrently` for a
+        convenient way to do this.
+
+        Parameters and returns are the same as `execute`.
+        """
 
         # some error_handlers run while the shelltask is running. These are known as
         # Monitors and are labled via the is_monitor attribute. It's good for us
         # to separate these out from other error_handlers.
-        cls.monitors = [handler for handler in cls.error_handlers if handler.is_monitor]
+        monitors = [handler for handler in cls.error_handlers if handler.is_monitor]
 
-        # in case this is a restarted calculation, check if there is a list
-        # of corrections in the current directory and load those as the start point
-        corrections_filename = directory / "simmate_corrections.csv"
-        if corrections_filename.exists():
-            data = pandas.read_csv(corrections_filename)
-            corrections = data.values.tolist()
-        # Otherwise we start with zero corrections that we slowly add to. This
-        # can be thought of as a table with headers of...
+        # in case this is a restarted calculation, we start from any corrections
+        # that are already in the directory. Otherwise we start with zero
+        # corrections that we slowly add to. This can be thought of as a table
+        # with headers of...
         #   ("applied_errorhandler", "correction_applied")
-        else:
-            corrections = []
+        corrections_filename = directory / "simmate_corrections.csv"
+        corrections = cls._load_corrections(directory)
 
         # ------ start of main while loop ------
 
@@ -343,8 +383,8 @@ class S3Workflow(Workflow):
             # make sure to use common shell commands and to set the working
             # directory.
             #
-            # Stderr keyword indicates that we should capture the error if one
-            # occurs so that we can report it to the user.
+            # Stdout and stderr are both piped so that we can stream the output
+            # and capture the error if one occurs to report it to the user.
             #
             # The preexec_fn keyword allows us to properly terminate jobs that
             # are launched with parallel processes (such as mpirun). This assigns
@@ -359,95 +399,53 @@ class S3Workflow(Workflow):
             # things in parallel without calling mpirun up-front.
             logging.info(f"Using {directory}")
             logging.info(f"Running '{command}'")
-            process = subprocess.Popen(
+            process = await asyncio.create_subprocess_shell(
                 command,
                 cwd=directory,
-                shell=True,
                 preexec_fn=None if platform.system() == "Windows"
                 # or "mpirun" not in command  # See bug/optimize comment above
                 else os.setsid,
+                stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
             )
 
-            # Assume the shelltask has no errors and can retry until proven otherwise
-            has_error = False
-            allow_retry = True
+            # Start reading both pipes right away so that the command never
+            # stalls on a full pipe. This task resolves once the process exits
+            # and gives back its stderr.
+            process_task = asyncio.create_task(cls._read_process_output(process))
 
             # If monitor=True, then we want to supervise this shelltask as it
-            # runs. If montors=[m1,m2,...], then we have monitors in place to actually
-            # perform the monitoring. If both of these cases are true, then we
-            # want to go through the error_handlers to check for errors until
-            # the shelltask completes.
-            if cls.monitor and cls.monitors:
-
-                # ------ start of monitor while loop ------
-
-                # We want to loop until we find an error and keep track of
-                # which loops to run the monitor function on because we don't
-                # want them to run nonstop. This variable allows us to monitor
-                # checks every Nth loop, while we check the shelltask status
-                # on all other loops.
-                monitor_freq_n = 0
-                while not has_error:
-                    monitor_freq_n += 1
-                    # Sleep the set amount before checking the shelltask status
-                    time.sleep(cls.polling_timestep)
-
-                    # check if the shelltasks is complete. poll will return 0
-                    # when it's done, in which case we break the loop
-                    if process.poll() is not None:
-                        break
-                    # check whether we should run monitors on this poll loop
-                    if monitor_freq_n % cls.monitor_freq == 0:
-                        # iterate through each monitor
-                        for error_handler in cls.monitors:
-                            # check if there's an error with this error_handler
-                            # and grab the error if so
-                            error = error_handler.check(directory)
-                            if error:
-                                # determine if the error handler has a
-                                # custom termination method. If not, use our
-                                # default one from this class.
-                                # The "allow_retry" tells us whether we should
-                                # end the job even if we still have an error.
-                                # For example, our Walltime handler will tell
-                                # us to shutdown and not try anymore -- but
-                                # it won't raise an error in order to allow
-                                # our workup to run.
-                                if not error_handler.has_custom_termination:
-                                    # If so, we kill the process but don't apply
-                                    # the fix quite yet. That step is done below.
-                                    allow_retry = cls._terminate_job(
-                                        directory=directory,
-                                        process=process,
-                                        command=command,
-                                    )
-
-                                # Otherwise use the custom termination. An
-                                # example of this is for codes where you add
-                                # a STOP file to get it to finish rather than
-                                # just killing the process. We use this feature
-                                # in our VASP Walltime handler.
-                                else:
-                                    allow_retry = error_handler.terminate_job(
-                                        directory=directory,
-                                        process=process,
-                                        command=command,
-                                    )
-                                # there's no need to look at the other monitors
-                                # so break from the for-loop. We also don't
-                                # need to monitor the stagedtask anymore since we just
-                                # terminated it or signaled for its graceful
-                                # end. So update the while-loop condition.
-                                has_error = True
-                                break
-
-                # ------ end of monitor while loop ------
-
-            # Now just wait for the process to finish. Note we use communicate
-            # instead of the .wait() method. This is the recommended method
-            # when we have stderr=subprocess.PIPE, which we use above.
-            output, errors = process.communicate()
+            # runs. If montors=[m1,m2,...], then we have monitors in place to
+            # actually perform the monitoring.
+            if cls.monitor and monitors:
+                try:
+                    has_error, allow_retry = await cls._supervise_process(
+                        directory=directory,
+                        command=command,
+                        process=process,
+                        process_task=process_task,
+                        monitors=monitors,
+                    )
+                # If a monitor fails unexpectedly, we make sure the command
+                # isn't left running in the background before passing along
+                # the error.
+                except BaseException:
+                    if process.returncode is None:
+                        cls._terminate_job(
+                            directory=directory,
+                            process=process,
+                            command=command,
+                        )
+                    await process_task
+                    raise
+            # Otherwise assume the shelltask has no errors and can retry until
+            # proven otherwise
+            else:
+                has_error = False
+                allow_retry = True
+
+            # Now just wait for the process to finish.
+            errors = await process_task
 
             # check if the return code is non-zero and thus failed.
             # The 'not has_error' is because terminate() will give a nonzero
@@ -484,18 +482,21 @@ class S3Workflow(Workflow):
             for error_handler in cls.error_handlers:
 
                 # check if there's an error with this error_handler and grab the
-                # error if there is one
-                error = error_handler.check(directory)
+                # error if there is one. Handlers are ran in a separate thread
+                # so that we don't block other calculations in this event loop.
+                error = await asyncio.to_thread(error_handler.check, directory)
                 if error:
                     # record the error in case it wasn't done so above
                     has_error = True
                     # make a copy of the directory contents and
                     # store as an archive within the same directory
-                    make_error_archive(directory)
+                    await asyncio.to_thread(make_error_archive, directory)
                     # And apply the proper correction if there is one.
                     # Some error_handlers will even raise an error here signaling
                     # that the stagedtask is unrecoverable and a lost cause.
-                    correction = error_handler.correct(directory)
+                    correction = await asyncio.to_thread(
+                        error_handler.correct, directory
+                    )
                     # record what's been changed
                     corrections.append((error_handler.name, correction))
                     logging.info(
@@ -541,7 +542,265 @@ class S3Workflow(Workflow):
         return corrections
 
     @staticmethod
-    def _terminate_job(directory: Path, process: subprocess.Popen, command: str):
+    async def _read_process_output(process: asyncio.subprocess.Process) -> bytes:
+        """
+        Reads the stdout and stderr of a process concurrently until it exits.
+        Stdout is passed along to this process's stdout as it arrives, while
+        stderr is captured and returned so that it can be reported if the
+        command fails.
+        """
+
+        async def read_stream(stream, destination=None, captured=None):
+            # We read in chunks rather than lines because some programs write
+            # very long lines (or none at all). An incremental decoder keeps
+            # characters that are split between two chunks intact.
+            decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+            while chunk := await stream.read(2**16):
+                if destination:
+                    destination.write(decoder.decode(chunk))
+                    destination.flush()
+                if captured is not None:
+                    captured.append(chunk)
+            if destination:
+                destination.write(decoder.decode(b"", final=True))
+                destination.flush()
+
+        errors = []
+        await asyncio.gather(
+            read_stream(process.stdout, destination=sys.stdout),
+            read_stream(process.stderr, captured=errors),
+        )
+        await process.wait()
+        return b"".join(errors)
+
+    @classmethod
+    async def _supervise_process(
+        cls,
+        directory: Path,
+        command: str,
+        process: asyncio.subprocess.Process,
+        process_task: asyncio.Task,
+        monitors: list[ErrorHandler],
+    ) -> tuple[bool]:
+        """
+        Runs every monitor concurrently (each on its own schedule) until either
+        the process exits or one of the monitors finds an error. If an error
+        is found, the job is terminated (or signaled to end gracefully).
+
+        Users should never call this directly becuase this is instead applied
+        within the execute_async() method.
+
+        #### Returns
+
+        - `has_error`:
+            whether a monitor was triggered while the command ran
+
+        - `allow_retry`:
+            whether the command can be attempted again (see `_terminate_job`)
+        """
+
+        # this event is used to tell monitors to stop once the process exits
+        process_finished = asyncio.Event()
+
+        # if requested, start watching for file changes in the directory
+        watcher = (
+            cls._start_directory_watcher(directory) if cls.monitor_file_events else None
+        )
+
+        # the watcher holds open file handles (e.g. an inotify descriptor), so
+        # we make sure it is always stopped -- even if a monitor fails
+        try:
+            monitor_tasks = [
+                asyncio.create_task(
+                    cls._run_monitor(
+                        error_handler=error_handler,
+                        directory=directory,
+                        process_finished=process_finished,
+                        watcher=watcher,
+                    )
+                )
+                for error_handler in monitors
+            ]
+
+            # wait until the process exits or any monitor reports an error
+            await asyncio.wait(
+                [process_task, *monitor_tasks],
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+
+            # If the process finished first, we still let any monitor checks
+            # that are in progress complete. These checks started while the
+            # process was running, so we honor their result. Otherwise, a
+            # monitor found an error and there's no need to look at the others.
+            if process_task.done():
+                process_finished.set()
+            else:
+                for task in monitor_tasks:
+                    if not task.done():
+                        task.cancel()
+            await asyncio.wait(monitor_tasks)
+        finally:
+            if watcher:
+                watcher.stop()
+
+        # Note, .result() also passes along any exception that a monitor raised.
+        triggered = [
+            task.result()
+            for task in monitor_tasks
+            if not task.cancelled() and task.result()
+        ]
+        if not triggered:
+            return False, True
+
+        # monitors are in order of priority, so we use the first one triggered
+        error_handler = min(triggered, key=monitors.index)
+
+        # determine if the error handler has a custom termination method. If
+        # not, use our default one from this class.
+        # The "allow_retry" tells us whether we should end the job even if we
+        # still have an error. For example, our Walltime handler will tell us
+        # to shutdown and not try anymore -- but it won't raise an error in
+        # order to allow our workup to run.
+        if not error_handler.has_custom_termination:
+            # If so, we kill the process but don't apply the fix quite yet.
+            # That step is done in execute_async. If the process exited on
+            # its own in the meantime, there is nothing left to kill.
+            allow_retry = (
+                cls._terminate_job(
+                    directory=directory,
+                    process=process,
+                    command=command,
+                )
+                if process.returncode is None
+                else True
+            )
+
+        # Otherwise use the custom termination. An example of this is for codes
+        # where you add a STOP file to get it to finish rather than just killing
+        # the process. We use this feature in our VASP Walltime handler.
+        else:
+            allow_retry = error_handler.terminate_job(
+                directory=directory,
+                process=process,
+                command=command,
+            )
+
+        return True, allow_retry
+
+    @classmethod
+    async def _run_monitor(
+        cls,
+        error_handler: ErrorHandler,
+        directory: Path,
+        process_finished: asyncio.Event,
+        watcher: DirectoryWatcher = None,
+    ) -> ErrorHandler:
+        """
+        Repeatedly runs a single monitor's check until it finds an error (in
+        which case the handler is returned) or the process exits (in which case
+        None is returned).
+
+        The check itself is ran in a separate thread so that slow file parsing
+        never blocks the event loop -- and therefore never blocks other
+        monitors or other calculations supervised by this process.
+
+        If a watcher is given and the handler has a `filename_to_check`, the
+        check only runs after that file has been modified.
+        """
+
+        if watcher and error_handler.filename_to_check:
+            return await cls._run_monitor_on_file_events(
+                error_handler=error_handler,
+                directory=directory,
+                process_finished=process_finished,
+                watcher=watcher,
+            )
+
+        timestep = (
+            error_handler.monitor_timestep
+            if error_handler.monitor_timestep is not None
+            else cls.polling_timestep * cls.monitor_freq
+        )
+
+        while not process_finished.is_set():
+            # Sleep the set amount before checking, but wake up early if the
+            # process exits.
+            try:
+                await asyncio.wait_for(process_finished.wait(), timeout=timestep)
+            except asyncio.TimeoutError:
+                pass
+            if process_finished.is_set():
+                break
+            error = await asyncio.to_thread(error_handler.check, directory)
+            if error:
+                return error_handler
+
+    @classmethod
+    async def _run_monitor_on_file_events(
+        cls,
+        error_handler: ErrorHandler,
+        directory: Path,
+        process_finished: asyncio.Event,
+        watcher: DirectoryWatcher,
+    ) -> ErrorHandler:
+        """
+        The event-driven version of `_run_monitor`. The check is only ran
+        when the handler's `filename_to_check` has been modified, and no more
+        than once every `monitor_timestep` seconds (or `polling_timestep` if
+        the handler doesn't set one).
+        """
+        min_timestep = (
+            error_handler.monitor_timestep
+            if error_handler.monitor_timestep is not None
+            else cls.polling_timestep
+        )
+
+        while not process_finished.is_set():
+            file_changed = asyncio.create_task(
+                watcher.wait_for_change(error_handler.filename_to_check)
+            )
+            finished = asyncio.create_task(process_finished.wait())
+            await asyncio.wait(
+                [file_changed, finished],
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            file_changed.cancel()
+            finished.cancel()
+            if process_finished.is_set():
+                break
+            error = await asyncio.to_thread(error_handler.check, directory)
+            if error:
+                return error_handler
+            # files like OUTCAR are written to constantly, so we limit how
+            # often the check can be repeated. We still wake up early if the
+            # process exits.
+            try:
+                await asyncio.wait_for(process_finished.wait(), timeout=min_timestep)
+            except asyncio.TimeoutError:
+                pass
+
+    @classmethod
+    def _start_directory_watcher(cls, directory: Path) -> DirectoryWatcher:
+        """
+        Starts an inotify watcher for the directory if possible, and falls
+        back to polling if inotify fails (e.g. the user's watch limit has
+        been reached).
+        """
+        watcher = get_directory_watcher(directory, cls.polling_timestep)
+        try:
+            watcher.start()
+        except OSError:
+            logging.warning("Failed to start inotify. Falling back to polling.")
+            watcher = DirectoryWatcher(directory, cls.polling_timestep)
+            watcher.start()
+        return watcher
+
+    @staticmethod
+    def _terminate_job(
+        directory: Path,
+        process: subprocess.Popen | asyncio.subprocess.Process,
+        command: str,
+    ):
         """
         Stopping the command we submitted can be a tricky business if we are running
         scripts in parallel (such as using mpirun). Different computers and OSs
@@ -645,6 +904,51 @@ class S3Workflow(Workflow):
         pass
 
 
+def execute_concurrently(jobs: list[tuple]) -> list[list[tuple[str]]]:
+    """
+    Supervises several S3Workflow commands at once from within a single
+    python process. This is useful when one worker has enough cores to run
+    multiple small calculations side by side.
+
+    #### Parameters
+
+    - `jobs`:
+        a list of (workflow, directory, command) tuples. Each directory must
+        already be set up (i.e. `setup` has been called).
+
+    #### Returns
+
+    - a list of the corrections from each job, in the same order as `jobs`
+    """
+
+    async def gather_jobs():
+        return await asyncio.gather(
+            *[
+                workflow.execute_async(get_directory(directory), command)
+                for workflow, directory, command in jobs
+            ]
+        )
+
+    return _run_async(gather_jobs)
+
+
+def _run_async(function: callable, *args, **kwargs):
+    """
+    Runs an async function from synchronous code and gives its result.
+
+    `async_to_sync` fails when this thread already has a running event loop
+    (e.g. when called from within a coroutine), so in that case the function
+    is instead ran in a new event loop on a separate thread. Note, this still
+    blocks the calling event loop until the function finishes.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return async_to_sync(function)(*args, **kwargs)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, function(*args, **kwargs)).result()
+
+
 # Custom errors that indicate exactly what causes the S3Task to exit.
 
 
@@ -0,0 +1,340 @@
+# -*- coding: utf-8 -*-
+
+"""
+This module handles converting workflow parameters to and from json-serializable
+formats. This happens every time a workflow is submitted, registered, or
+writes its metadata, so the common parameter types are given fast paths here.
+
+Serialization is determined by the type of each value, and you can register
+new types with `register_parameter_serializer`:
+
+``` python
+from simmate.workflow_engine.serialization import register_parameter_serializer
+
+@register_parameter_serializer(MyClass)
+def serialize_my_class(value: MyClass):
+    return value.to_json()
+```
+
+Deserialization is determined by the parameter name (e.g. "structure"), because
+the serialized value alone doesn't tell us what type it should be. Within a
+workflow run (see `parameter_cache`), each unique input is only converted once.
+Inputs that point to the database (e.g. `{"database_table": ..., "database_id": ...}`)
+are loaded together with `prefetch_database_entries`, which uses a single query
+for each table.
+"""
+
+import contextlib
+import contextvars
+import copy
+import json
+from functools import cache
+from pathlib import Path, PurePath
+
+import cloudpickle
+from django.utils.module_loading import import_string
+from pymatgen.core import Composition, IStructure
+
+PARAMETER_SERIALIZERS: dict = {}
+"""
+Maps a python type to the function that serializes it. Keys can be either the
+type or its import path, where the import path is used for types that are slow
+to import and may not be loaded at all (e.g. the diffusion module).
+"""
+
+PARAMETER_CLASSES: dict = {
+    "structure": "simmate.toolkit.Structure",
+    "composition": "simmate.toolkit.Composition",
+    "migration_hop": "simmate.toolkit.diffusion.MigrationHop",
+    "migration_images": "simmate.toolkit.diffusion.MigrationImages",
+    "supercell_start": "simmate.toolkit.Structure",
+    "supercell_end": "simmate.toolkit.Structure",
+}
+"""
+Maps a parameter name to the class (or its import path) that the parameter is
+converted to using the class's `from_dynamic` method.
+"""
+
+
+def register_parameter_serializer(*python_types):
+    """
+    A decorator that registers a function as the serializer for the given types.
+    Subclasses of these types will also use this function unless they have their
+    own serializer registered.
+    """
+
+    def decorator(function):
+        for python_type in python_types:
+            PARAMETER_SERIALIZERS[python_type] = function
+        get_parameter_serializer.cache_clear()
+        return function
+
+    return decorator
+
+
+@cache
+def get_parameter_serializer(python_type: type):
+    """
+    Gives the registered serializer for a type, or None if there isn't one.
+    """
+    parents = python_type.__mro__
+    containers = (list, tuple, dict)
+
+    # Subclasses of builtin containers often have their own `as_dict` method
+    # (e.g. MigrationImages is a list), so we only use the container
+    # serializers when nothing more specific is available.
+    for parent in parents:
+        if parent in containers:
+            continue
+        for key in (parent, f"{parent.__module__}.{parent.__qualname__}"):
+            if key in PARAMETER_SERIALIZERS:
+                return PARAMETER_SERIALIZERS[key]
+
+    if hasattr(python_type, "as_dict"):
+        return _serialize_with_as_dict
+    if hasattr(python_type, "to_dict"):
+        return _serialize_with_to_dict
+
+    for parent in parents:
+        if parent in containers:
+            return PARAMETER_SERIALIZERS[parent]
+
+
+def serialize_parameter(value):
+    """
+    Converts a single parameter value to a json-serializable format. Values
+    without a registered serializer are kept if they can be written to json,
+    and are otherwise pickled.
+    """
+    serializer = get_parameter_serializer(type(value))
+    if serializer:
+        return serializer(value)
+
+    # This is the slow path for unknown types, so we check json directly
+    try:
+        json.dumps(value)
+        return value
+    except TypeError:
+        return cloudpickle.dumps(value)
+
+
+@register_parameter_serializer(type(None), bool, int, float, str)
+def _serialize_builtin(value):
+    return value
+
+
+@register_parameter_serializer(list, tuple)
+def _serialize_sequence(value):
+    return type(value)(serialize_parameter(item) for item in value)
+
+
+@register_parameter_serializer(dict)
+def _serialize_dict(value: dict) -> dict:
+    return {key: serialize_parameter(item) for key, item in value.items()}
+
+
+@register_parameter_serializer(PurePath, Composition)
+def _serialize_with_str(value) -> str:
+    return str(value)
+
+
+@register_parameter_serializer(
+    IStructure,
+    "pymatgen.analysis.diffusion.neb.pathfinder.MigrationHop",
+    "simmate.toolkit.diffusion.migration_images.MigrationImages",
+)
+def _serialize_with_as_dict(value) -> dict:
+    return value.as_dict()
+
+
+def _serialize_with_to_dict(value) -> dict:
+    return value.to_dict()
+
+
+# -----------------------------------------------------------------------------
+
+
+@cache
+def get_parameter_class(parameter: str):
+    """
+    Gives the class that a parameter is converted to, or None if the parameter
+    is used as-is.
+    """
+    target_class = PARAMETER_CLASSES.get(parameter, None)
+    if isinstance(target_class, str):
+        target_class = import_string(target_class)
+    return target_class
+
+
+def deserialize_parameter(parameter: str, value):
+    """
+    Converts a single parameter value to the python object that workflows
+    expect, using the `from_dynamic` method of the parameter's class. When a
+    `parameter_cache` is active, repeated inputs are only converted once, and
+    each caller is given its own copy of the result.
+    """
+    target_class = get_parameter_class(parameter)
+    if target_class is None or isinstance(value, target_class):
+        return value
+
+    run_cache = _run_cache.get()
+    cache_key = _get_cache_key(target_class, value) if run_cache is not None else None
+    if cache_key is not None and cache_key in run_cache:
+        return _copy_cached_value(run_cache[cache_key])
+
+    # use the database entry if it was already loaded by prefetch_database_entries
+    pointer = _get_database_pointer(value) if run_cache is not None else None
+    database_object = run_cache.get(pointer, None) if pointer else None
+    if database_object is not None and hasattr(target_class, "from_database_dict"):
+        value_cleaned = target_class.from_database_dict(value, database_object)
+    else:
+        value_cleaned = target_class.from_dynamic(value)
+
+    # Workflows often edit their inputs in place (e.g. removing sites from a
+    # structure), so the cached object is never handed out directly.
+    if cache_key is not None:
+        run_cache[cache_key] = value_cleaned
+        return _copy_cached_value(value_cleaned)
+    return value_cleaned
+
+
+def prefetch_database_entries(parameters: dict):
+    """
+    Loads the database entries for all parameters that point to the database,
+    using a single query for each table. Entries are stored in the active
+    `parameter_cache`, where `deserialize_parameter` will use them rather than
+    querying each entry separately. If no cache is active, nothing is done.
+
+    For example, the following inputs require one query instead of two:
+
+    ``` python
+    {
+        "supercell_start": {"database_table": "MatprojStructure", "database_id": "mp-1"},
+        "supercell_end": {"database_table": "MatprojStructure", "database_id": "mp-2"},
+    }
+    ```
+    """
+    run_cache = _run_cache.get()
+    if run_cache is None:
+        return
+
+    # group the pointers that still need loading by table and the column
+    # they are looked up by
+    queries = {}
+    for parameter, value in parameters.items():
+        pointer = _get_database_pointer(value)
+        if not pointer or pointer in run_cache:
+            continue
+        if get_parameter_class(parameter) is None:
+            continue
+        _, table_name, column, column_value = pointer
+        values, structure_fields = queries.setdefault(
+            (table_name, column), (set(), set())
+        )
+        values.add(column_value)
+        if value.get("structure_field"):
+            structure_fields.add(value["structure_field"])
+
+    if not queries:
+        return
+
+    # This is a local import to keep the module light
+    from simmate.database.base_data_types import DatabaseTable
+
+    for (table_name, column), (values, structure_fields) in queries.items():
+        table = DatabaseTable.get_table(table_name)
+
+        # structures stored in related tables (e.g. structure_final) are
+        # loaded in the same query
+        related_fields = [
+            field
+            for field in structure_fields
+            if table._meta.get_field(field).is_relation
+        ]
+
+        entries = table.objects.filter(**{f"{column}__in": values})
+        if related_fields:
+            entries = entries.select_related(*related_fields)
+
+        for entry in entries:
+            key = ("database", table_name, column, str(getattr(entry, column)))
+            run_cache[key] = entry
+
+
+_run_cache = contextvars.ContextVar("simmate_parameter_cache", default=None)
+
+
+@contextlib.contextmanager
+def parameter_cache():
+    """
+    Starts a cache of deserialized parameters that lasts until the context
+    exits. If a cache is already active (e.g. when a workflow calls another
+    workflow), then the existing cache is shared rather than starting a new one.
+
+    This is used by `Workflow.run`, so you typically don't need to call it
+    directly.
+    """
+    if _run_cache.get() is not None:
+        yield
+        return
+
+    token = _run_cache.set({})
+    try:
+        yield
+    finally:
+        _run_cache.reset(token)
+
+
+def _get_cache_key(target_class: type, value) -> tuple:
+    # The key is based on the value's contents rather than the object itself,
+    # so edits to an input dictionary will never return an outdated result.
+    # Strings that are filenames are never cached because the file can
+    # change, and relative paths depend on the working directory.
+    if isinstance(value, str):
+        return None if Path(value).exists() else (target_class, value)
+    if isinstance(value, (dict, list)):
+        try:
+            return (target_class, json.dumps(value, sort_keys=True))
+        except TypeError:
+            return None
+    # Database entries are often passed between workflows (e.g. the result of
+    # one stage is the input of the next). The stored structure is included
+    # in case the entry was updated since it was last converted.
+    if hasattr(value, "table_name") and value.pk is not None:
+        return (
+            target_class,
+            value.table_name,
+            value.pk,
+            getattr(value, "structure", None),
+        )
+    return None
+
+
+def _copy_cached_value(value):
+    # Any database entry attached to the object (see `from_database_dict`) is
+    # shared rather than copied. Structures also have a faster copy method
+    # than deepcopy.
+    database_object = getattr(value, "database_object", None)
+    if isinstance(value, IStructure):
+        value_copy = value.copy()
+        if database_object is not None:
+            value_copy.database_object = database_object
+        return value_copy
+    memo = {id(database_object): database_object} if database_object else {}
+    return copy.deepcopy(value, memo)
+
+
+def _get_database_pointer(value) -> tuple:
+    # Gives a key for dictionaries that point to a database entry. This follows
+    # the same priority as `DatabaseTable.from_dict` for picking the column
+    # that is used to look up the entry.
+    if not isinstance(value, dict) or "database_table" not in value:
+        return None
+    for key, column in [
+        ("database_id", "id"),
+        ("run_id", "run_id"),
+        ("directory", "directory"),
+    ]:
+        if value.get(key):
+            return ("database", value["database_table"], column, str(value[key]))
+    return None
@@ -17,7 +17,9 @@
 # catch error with a non-monitor
 # test max_errors limit
 
+import asyncio
 import shutil
+import time
 
 import pytest
 
@@ -26,6 +28,11 @@ from simmate.workflow_engine.s3_workflow import (
     CommandNotFoundError,
     MaxCorrectionsError,
     NonZeroExitError,
+    execute_concurrently,
+)
+from simmate.workflow_engine.file_watcher import (
+    DirectoryWatcher,
+    InotifyDirectoryWatcher,
 )
 
 # ----------------------------------------------------------------------------
@@ -245,6 +252,164 @@ def test_s3workflow_8(tmp_path):
     )
 
 
+def test_s3workflow_concurrent(tmp_path):
+    # supervise several commands at once from a single process
+
+    class Customized__Testing__DummyWorkflow(S3Workflow):
+        use_database = False
+        command = "echo dummy"
+        polling_timestep = 0
+        monitor_freq = 2
+        error_handlers = [AlwaysPassesMonitor()]
+
+    jobs = [
+        (Customized__Testing__DummyWorkflow, tmp_path / f"job_{n}", "sleep 0.1")
+        for n in range(3)
+    ]
+    results = execute_concurrently(jobs)
+    assert results == [[], [], []]
+
+
+def test_s3workflow_output_streams(tmp_path, capsys):
+    # stdout is streamed as the command runs, while stderr is captured and
+    # reported when the command fails
+
+    class Customized__Testing__DummyWorkflow(S3Workflow):
+        use_database = False
+        command = "echo 'dummy output'; echo 'dummy error' 1>&2; exit 3"
+        monitor = False
+
+    with pytest.raises(NonZeroExitError, match="dummy error"):
+        Customized__Testing__DummyWorkflow.run_config(directory=tmp_path)
+    assert "dummy output" in capsys.readouterr().out
+
+
+def test_s3workflow_output_streams_split_characters(capsys, mocker):
+    # a character that is split between two chunks of output is kept intact
+
+    output = "dummy é output".encode()
+    split = output.index("é".encode()) + 1
+
+    async def run():
+        stdout = asyncio.StreamReader()
+        stderr = asyncio.StreamReader()
+
+        async def write_output():
+            stdout.feed_data(output[:split])
+            await asyncio.sleep(0.01)
+            stdout.feed_data(output[split:])
+            stdout.feed_eof()
+            stderr.feed_eof()
+
+        process = mocker.Mock(stdout=stdout, stderr=stderr, wait=mocker.AsyncMock())
+        await asyncio.gather(
+            write_output(),
+            S3Workflow._read_process_output(process),
+        )
+
+    asyncio.run(run())
+    assert capsys.readouterr().out == "dummy é output"
+
+
+def test_s3workflow_execute_in_event_loop(tmp_path):
+    # the synchronous method still works when an event loop is running
+
+    class Customized__Testing__DummyWorkflow(S3Workflow):
+        use_database = False
+        command = "echo dummy"
+        monitor = False
+
+    async def run_in_loop():
+        return Customized__Testing__DummyWorkflow.execute(tmp_path, "echo dummy")
+
+    assert asyncio.run(run_in_loop()) == []
+
+
+def test_s3workflow_monitor_timestep(tmp_path):
+    # a monitor with its own schedule should catch the error while the
+    # command is still running
+
+    class FastFailsMonitor(AlwaysFailsMonitor):
+        monitor_timestep = 0
+
+    class Customized__Testing__DummyWorkflow(S3Workflow):
+        use_database = False
+        command = "sleep 30"
+        max_corrections = 1
+        error_handlers = [FastFailsMonitor()]
+
+    pytest.raises(
+        MaxCorrectionsError,
+        Customized__Testing__DummyWorkflow.run_config,
+        directory=tmp_path,
+    )
+
+
+@pytest.mark.parametrize("use_inotify", [True, False])
+def test_s3workflow_file_events(tmp_path, mocker, use_inotify):
+    # a monitor should be woken as soon as its file is written to, even
+    # though its normal schedule would only check after a very long time
+
+    mocker.patch.object(
+        InotifyDirectoryWatcher,
+        "is_available",
+        return_value=use_inotify and InotifyDirectoryWatcher.is_available(),
+    )
+
+    class ErrorInFileMonitor(ErrorHandler):
+        is_monitor = True
+        filename_to_check = "output.txt"
+        possible_error_messages = ["EXAMPLE ERROR"]
+
+        def correct(self, directory):
+            return "ExampleCorrection"
+
+    class Customized__Testing__DummyWorkflow(S3Workflow):
+        use_database = False
+        command = "sleep 0.2; echo 'EXAMPLE ERROR' > output.txt; sleep 30"
+        polling_timestep = 0.1
+        monitor_freq = 10000
+        monitor_file_events = True
+        max_corrections = 1
+        error_handlers = [ErrorInFileMonitor()]
+
+    pytest.raises(
+        MaxCorrectionsError,
+        Customized__Testing__DummyWorkflow.run_config,
+        directory=tmp_path,
+    )
+
+
+def test_s3workflow_file_events_cleanup(tmp_path, mocker):
+    # the watcher is always stopped and the wait between checks ends as soon
+    # as the process exits
+
+    mocker.patch.object(InotifyDirectoryWatcher, "is_available", return_value=False)
+    stop = mocker.spy(DirectoryWatcher, "stop")
+
+    class SlowMonitor(AlwaysPassesMonitor):
+        filename_to_check = "output.txt"
+        monitor_timestep = 30
+
+    class Customized__Testing__DummyWorkflow(S3Workflow):
+        use_database = False
+        command = "sleep 0.2; echo dummy > output.txt; sleep 0.3"
+        polling_timestep = 0.1
+        monitor_file_events = True
+        error_handlers = [SlowMonitor()]
+
+    start = time.time()
+    Customized__Testing__DummyWorkflow.run_config(directory=tmp_path)
+    assert time.time() - start < 10
+    assert stop.call_count == 1
+
+    # a monitor that fails still stops the watcher
+    mocker.patch.object(SlowMonitor, "check", side_effect=ValueError)
+    with pytest.raises(ValueError):
+        Customized__Testing__DummyWorkflow.run_config(directory=tmp_path)
+    assert stop.call_count == 2
+
+
 # !!! Unitests to use with Prefect Executor
 # Test as a subflow
 # from prefect import flow
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+
+from pathlib import Path
+
+import cloudpickle
+import pytest
+
+from simmate.toolkit import Composition, Structure
+from simmate.website.test_app.models import TestStructure
+from simmate.workflow_engine.serialization import (
+    deserialize_parameter,
+    get_parameter_serializer,
+    parameter_cache,
+    prefetch_database_entries,
+    register_parameter_serializer,
+    serialize_parameter,
+)
+
+
+def test_serialize_parameter(sample_structures):
+
+    structure = sample_structures["NaCl_mp-22862_primitive"]
+
+    # builtins are returned as-is, including inside of containers
+    assert serialize_parameter(None) is None
+    assert serialize_parameter([1, "a", 2.0]) == [1, "a", 2.0]
+    assert serialize_parameter((1, 2)) == (1, 2)
+
+    # fast paths for common toolkit types and paths
+    assert serialize_parameter(structure) == structure.as_dict()
+    assert serialize_parameter(Composition("Na2Cl2")) == "Na2 Cl2"
+    assert serialize_parameter(Path("example/dir")) == "example/dir"
+    assert serialize_parameter(
+        {"directory": Path("example"), "structures": [structure]}
+    ) == {"directory": "example", "structures": [structure.as_dict()]}
+
+    # unknown types use as_dict/to_dict or are pickled as a last resort
+    class ExampleWithDict(list):
+        def as_dict(self):
+            return {"example": True}
+
+    class ExampleUnknown:
+        a = 123
+
+    assert serialize_parameter(ExampleWithDict()) == {"example": True}
+    value = serialize_parameter(ExampleUnknown())
+    assert cloudpickle.loads(value).a == 123
+
+    # new types can be registered
+    @register_parameter_serializer(ExampleUnknown)
+    def serialize_example(value):
+        return value.a
+
+    try:
+        assert serialize_parameter(ExampleUnknown()) == 123
+    finally:
+        from simmate.workflow_engine import serialization
+
+        serialization.PARAMETER_SERIALIZERS.pop(ExampleUnknown)
+        get_parameter_serializer.cache_clear()
+
+
+def test_deserialize_parameter(sample_structures, mocker, tmp_path):
+
+    structure = sample_structures["NaCl_mp-22862_primitive"]
+    structure_dict = structure.as_dict()
+    spy = mocker.spy(Structure, "from_dynamic")
+
+    # objects of the correct type and unknown parameters are not converted
+    assert deserialize_parameter("structure", structure) is structure
+    assert deserialize_parameter("command", "vasp_std") == "vasp_std"
+    assert spy.call_count == 0
+
+    # without a cache, every call is converted
+    structure_1 = deserialize_parameter("structure", structure_dict)
+    structure_2 = deserialize_parameter("structure", structure_dict)
+    assert structure_1 == structure_2 == structure
+    assert spy.call_count == 2
+
+    # within a cache, repeated inputs are converted once. Nested caches (from
+    # workflows calling other workflows) share the outer cache.
+    with parameter_cache():
+        structure_1 = deserialize_parameter("structure", structure_dict)
+        with parameter_cache():
+            structure_2 = deserialize_parameter("supercell_start", structure_dict)
+        assert structure_1 == structure_2
+        assert spy.call_count == 3
+
+        # each caller gets its own copy, so edits never leak between them
+        assert structure_1 is not structure_2
+        structure_1.remove_species(["Na"])
+        structure_3 = deserialize_parameter("structure", structure_dict)
+        assert structure_3 == structure
+        assert spy.call_count == 3
+
+        # the cache is based on content, so edits to the input are caught
+        structure_dict["lattice"]["matrix"][0][0] += 1
+        structure_3 = deserialize_parameter("structure", structure_dict)
+        assert structure_3 != structure
+        assert spy.call_count == 4
+
+        # filenames are never cached, because the file can change
+        filename = tmp_path / "POSCAR"
+        structure.to(filename=str(filename), fmt="poscar")
+        deserialize_parameter("structure", str(filename))
+        structure_3.to(filename=str(filename), fmt="poscar")
+        assert deserialize_parameter("structure", str(filename)) == structure_3
+        assert spy.call_count == 6
+
+    # the cache is cleared once the run is done
+    deserialize_parameter("structure", structure_dict)
+    assert spy.call_count == 7
+
+
+@pytest.mark.django_db
+def test_prefetch_database_entries(django_assert_num_queries):
+
+    structures_db = list(TestStructure.objects.order_by("id")[:2])
+    pointers = {
+        "supercell_start": structures_db[0].to_dict(),
+        "supercell_end": structures_db[1].to_dict(),
+        "command": "example",
+    }
+    # full import paths are needed because this table is only used in tests
+    for pointer in pointers.values():
+        if isinstance(pointer, dict):
+            pointer["database_table"] = "simmate.website.test_app.models.TestStructure"
+
+    # without a cache, each pointer is a separate query
+    with django_assert_num_queries(2):
+        for parameter, value in pointers.items():
+            deserialize_parameter(parameter, value)
+
+    # with a cache, there is one query per table and then none for the rest
+    # of the run, including when database entries are passed between workflows
+    with parameter_cache():
+        with django_assert_num_queries(1):
+            prefetch_database_entries(pointers)
+            supercell_start = deserialize_parameter(
+                "supercell_start", pointers["supercell_start"]
+            )
+            supercell_end = deserialize_parameter(
+                "supercell_end", pointers["supercell_end"]
+            )
+        assert supercell_start.database_object == structures_db[0]
+        assert supercell_end == structures_db[1].to_toolkit()
+
+        with django_assert_num_queries(0):
+            prefetch_database_entries(pointers)
+            structure = deserialize_parameter("structure", pointers["supercell_end"])
+            assert structure == supercell_end
+            assert structure.database_object == supercell_end.database_object
+            structure_1 = deserialize_parameter("structure", structures_db[0])
+            structure_2 = deserialize_parameter("structure", structures_db[0])
+            assert structure_1 == structure_2
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+from django.db import OperationalError, connection
+
+from simmate.database.utilities import reconnect_on_failure
+from simmate.workflow_engine.execution import SimmateExecutor, SimmateWorker
+from simmate.workflow_engine.execution.database import WorkItem
+
+
+def add_numbers(a, b):
+    return a + b
+
+
+@pytest.fixture
+def no_reconnect_wait(mocker):
+    # Tests run inside of a transaction, which would normally block retries,
+    # so we hide the test's connections from the reconnect utilities. We also
+    # skip the wait between retries.
+    connections = mocker.patch("simmate.database.utilities.connections")
+    connections.all.return_value = []
+    return mocker.patch("simmate.database.utilities.time")
+
+
+def test_reconnect_on_failure(no_reconnect_wait):
+
+    ncalls = 0
+
+    @reconnect_on_failure(max_retries=2)
+    def flaky_query(nfailures):
+        nonlocal ncalls
+        ncalls += 1
+        if ncalls <= nfailures:
+            raise OperationalError("connection already closed")
+        return "success"
+
+    assert flaky_query(nfailures=2) == "success"
+    assert ncalls == 3
+    assert no_reconnect_wait.sleep.call_count == 2
+
+    # the error is raised once we run out of retries
+    ncalls = 0
+    with pytest.raises(OperationalError):
+        flaky_query(nfailures=3)
+    assert ncalls == 3
+
+    # other errors are never retried
+    @reconnect_on_failure
+    def bad_query():
+        nonlocal ncalls
+        ncalls += 1
+        raise ValueError
+
+    ncalls = 0
+    with pytest.raises(ValueError):
+        bad_query()
+    assert ncalls == 1
+
+
+@pytest.mark.django_db
+def test_reconnect_on_failure_in_transaction():
+
+    # Reconnecting within a transaction would lose its changes, so these are
+    # never retried
+    ncalls = 0
+
+    @reconnect_on_failure
+    def flaky_query():
+        nonlocal ncalls
+        ncalls += 1
+        raise OperationalError("connection already closed")
+
+    with pytest.raises(OperationalError):
+        flaky_query()
+    assert ncalls == 1
+
+
+@pytest.mark.django_db
+def test_worker_many_short_tasks(no_reconnect_wait):
+
+    # Simulates a worker that runs thousands of short tasks while its
+    # connection is repeatedly dropped by the database (or a pooler).
+    ntasks = 2000
+    nqueries = 0
+
+    def drop_connections(execute, sql, params, many, context):
+        nonlocal nqueries
+        nqueries += 1
+        if nqueries % 500 == 0:
+            raise OperationalError("connection already closed")
+        return execute(sql, params, many, context)
+
+    SimmateExecutor.submit_many(
+        add_numbers,
+        [dict(a=n, b=1) for n in range(ntasks)],
+        tags=["stress-test"],
+    )
+
+    worker = SimmateWorker(
+        close_on_empty_queue=True,
+        waittime_on_empty_queue=0,
+        tags=["stress-test"],
+    )
+    with connection.execute_wrapper(drop_connections):
+        worker.start()
+
+    # every task finished exactly once despite the dropped connections
+    assert no_reconnect_wait.sleep.call_count == nqueries // 500
+    assert WorkItem.objects.filter(status="F").count() == ntasks
+    results = sorted(w.result() for w in WorkItem.objects.all())
+    assert results == list(range(1, ntasks + 1))
@@ -1,9 +1,11 @@
 # -*- coding: utf-8 -*-
 
+import cloudpickle
 import pytest
 
 from simmate.website.test_app.models import TestCalculation
 from simmate.workflow_engine import Workflow
+from simmate.workflow_engine.execution import WorkItem
 
 
 class DummyProject__DummyCaclulator__DummyPreset(Workflow):
@@ -123,6 +125,35 @@ def test_deserialize_parameters(mocker):
     Workflow._deserialize_parameters(**example_parameters)
 
 
+@pytest.mark.django_db
+def test_workflow_run_cloud_many(mocker, sample_structures):
+
+    mocker.patch.object(DummyFlow, "use_database", True)
+    structure = sample_structures["C_mp-48_primitive"]
+
+    # the same as calling run_cloud for each set of parameters
+    parameters_list = [dict(structure=structure, source={"n": n}) for n in range(3)]
+    states = DummyFlow.run_cloud_many(parameters_list, tags=["dummy"])
+    assert len(states) == 3
+    assert all(state.status == "P" and state.tags == ["dummy"] for state in states)
+
+    # futures are given in order and each run is registered
+    for n, state in enumerate(states):
+        workitem = WorkItem.objects.get(id=state.pk)
+        kwargs = cloudpickle.loads(workitem.kwargs)
+        assert kwargs["source"] == {"n": n}
+        calculation = TestCalculation.objects.get(run_id=kwargs["run_id"])
+        assert calculation.workflow_name == DummyFlow.name_full
+        assert calculation.source == {"n": n}
+
+    # the workitems match those from run_cloud
+    state = DummyFlow.run_cloud(structure=structure)
+    workitem_single = WorkItem.objects.get(id=state.pk)
+    assert workitem_single.fxn == workitem.fxn
+    assert cloudpickle.loads(workitem_single.kwargs).keys() == kwargs.keys()
+    assert TestCalculation.objects.count() == 4
+
+
 # !!! These tests below are for the Prefect Executor, which is disabled at the moment
 
 # @task
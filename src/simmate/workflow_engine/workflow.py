@@ -1,13 +1,12 @@
 # -*- coding: utf-8 -*-
 
 import inspect
-import json
 import logging
+import platform
 import re
 import uuid
 from pathlib import Path
 
-import cloudpickle
 import toml
 import yaml
 from django.utils import timezone
@@ -16,6 +15,12 @@ import simmate
 from simmate.database.base_data_types import Calculation
 from simmate.utilities import copy_directory, get_directory, make_archive
 from simmate.workflow_engine.execution import SimmateExecutor, WorkItem
+from simmate.workflow_engine.serialization import (
+    deserialize_parameter,
+    parameter_cache,
+    prefetch_database_entries,
+    serialize_parameter,
+)
 
 
 class DummyState:
@@ -155,58 +160,61 @@ class Workflow:
         """
         # This method is isolated only because we want to wrap it as a prefect
         # workflow in some cases.
-        logging.info(f"Starting '{cls.name_full}'")
-        kwargs_cleaned = cls._load_input_and_register(
-            run_id=run_id,
-            directory=directory,
-            compress_output=compress_output,
-            source=source,
-            started_at=timezone.now(),
-            **kwargs,
-        )
+        # Inputs are converted to python objects several times during a run
+        # (and again by any workflows that this one calls), so we cache them.
+        with parameter_cache():
+            logging.info(f"Starting '{cls.name_full}'")
+            kwargs_cleaned = cls._load_input_and_register(
+                run_id=run_id,
+                directory=directory,
+                compress_output=compress_output,
+                source=source,
+                started_at=timezone.now(),
+                **kwargs,
+            )
 
-        # Finally run the core part of the workflow. This should return a
-        # dictionary object if we have "use_database=True", but can be
-        # any python object if "use_database=False"
-        results = cls.run_config(**kwargs_cleaned)
+            # Finally run the core part of the workflow. This should return a
+            # dictionary object if we have "use_database=True", but can be
+            # any python object if "use_database=False"
+            results = cls.run_config(**kwargs_cleaned)
 
-        # save the result to the database
-        if cls.use_database:
+            # save the result to the database
+            if cls.use_database:
 
-            # make sure the workflow is returning a dictionary that be used
-            # to update the database columns. None is also allowed as it
-            # represents an empty dictionary
-            if not isinstance(results, dict) and results != None:
-                raise Exception(
-                    "When using a database table, your `run_config` method must "
-                    "return a dictionary object. The dictionary is used to "
-                    "update columns in your table entry and is therefore a "
-                    "required format. If you do not want to save to the database "
-                    "(and avoid this message), set `use_database=False`"
+                # make sure the workflow is returning a dictionary that be used
+                # to update the database columns. None is also allowed as it
+                # represents an empty dictionary
+                if not isinstance(results, dict) and results != None:
+                    raise Exception(
+                        "When using a database table, your `run_config` method must "
+                        "return a dictionary object. The dictionary is used to "
+                        "update columns in your table entry and is therefore a "
+                        "required format. If you do not want to save to the database "
+                        "(and avoid this message), set `use_database=False`"
+                    )
+                logging.info("Saving to database and writing outputs")
+                database_entry = cls._update_database_with_results(
+                    results=results if results != None else {},
+                    directory=kwargs_cleaned["directory"],
+                    run_id=kwargs_cleaned["run_id"],
+                    finished_at=timezone.now(),
                 )
-            logging.info("Saving to database and writing outputs")
-            database_entry = cls._update_database_with_results(
-                results=results if results != None else {},
-                directory=kwargs_cleaned["directory"],
-                run_id=kwargs_cleaned["run_id"],
-                finished_at=timezone.now(),
-            )
 
-        # if requested, compresses the directory to a zip file and then removes
-        # the directory.
-        if compress_output:
-            logging.info("Compressing result to a ZIP file.")
-            make_archive(
-                directory=kwargs_cleaned["directory"],
-                files_to_exclude=cls.exlcude_from_archives,
-            )
+            # if requested, compresses the directory to a zip file and then removes
+            # the directory.
+            if compress_output:
+                logging.info("Compressing result to a ZIP file.")
+                make_archive(
+                    directory=kwargs_cleaned["directory"],
+                    files_to_exclude=cls.exlcude_from_archives,
+                )
 
-        # If we made it this far, we successfully completed the workflow run
-        logging.info(f"Completed '{cls.name_full}'")
+            # If we made it this far, we successfully completed the workflow run
+            logging.info(f"Completed '{cls.name_full}'")
 
-        # If we are using the database, then we return the database object.
-        # Otherwise, we want to return the original result from run_config
-        return database_entry if cls.use_database else results
+            # If we are using the database, then we return the database object.
+            # Otherwise, we want to return the original result from run_config
+            return database_entry if cls.use_database else results
 
     @classmethod
     def run_cloud(
@@ -258,6 +266,68 @@ class Workflow:
 
         return state
 
+    @classmethod
+    def run_cloud_many(
+        cls,
+        parameters_list: list[dict],
+        tags: list[str] = None,
+    ) -> list[WorkItem]:
+        """
+        Submits many runs of this workflow to the cloud database at once, where
+        each entry of `parameters_list` gives the kwargs for a single run
+        (i.e. what you would normally pass to `run_cloud`).
+
+        This gives the same result as calling `run_cloud` for each entry, but
+        all calculations are registered and all WorkItems are created with
+        bulk inserts. The WorkItems are returned in the same order as
+        `parameters_list`.
+
+        #### Parameters
+
+        - `parameters_list`:
+            A list of dictionaries, each holding the parameters for one run.
+
+        - `tags`:
+            A list of flags/labels/tags that the workflow runs should be
+            scheduled with. Defaults to the `tags` property of the workflow.
+        """
+
+        logging.info(
+            f"Submitting {len(parameters_list)} new runs of `{cls.name_full}` to cloud"
+        )
+
+        # Load all inputs up front (same as run_cloud), but wait to register
+        # the calculations so that we can do them all at once.
+        kwargs_cleaned_list = [
+            cls._load_input_and_register(
+                setup_directory=False,
+                write_metadata=False,
+                register_run=False,
+                **kwargs,
+            )
+            for kwargs in parameters_list
+        ]
+
+        if cls.use_database:
+            cls._register_calculations_many(kwargs_cleaned_list)
+
+        # Some backends can't pickle input parameters, so we need to serialize
+        # them before submission to the queue.
+        parameters_serialized_list = [
+            cls._serialize_parameters(**kwargs_cleaned)
+            for kwargs_cleaned in kwargs_cleaned_list
+        ]
+
+        states = SimmateExecutor.submit_many(
+            cls._run_full,
+            kwargs_list=parameters_serialized_list,
+            tags=tags or cls.tags,
+        )
+
+        logging.info(f"Successfully submitted {len(states)} runs")
+
+        return states
+
     @classmethod
     def run_config(cls, **kwargs) -> any:
         """
@@ -667,6 +737,7 @@ class Workflow:
         cls,
         setup_directory: bool = True,
         write_metadata: bool = True,
+        register_run: bool = True,
         **parameters: any,
     ) -> dict:
         """
@@ -818,7 +889,7 @@ class Workflow:
             parameters_cleaned.get("run_id", None) or cls._get_new_run_id()
         )
 
-        if cls.use_database:
+        if cls.use_database and register_run:
             cls._register_calculation(**parameters_cleaned)
 
         # ---------------------------------------------------------------------
@@ -931,6 +1002,57 @@ class Workflow:
         `run_prefect_cloud` method and `load_input_and_register` task.
         """
 
+        # load/create the calculation for this workflow run
+        calculation = cls.database_table.from_run_context(
+            workflow_name=cls.name_full,
+            workflow_version=cls.version,
+            **cls._get_registration_kwargs(**kwargs),
+        )
+
+        return calculation
+
+    @classmethod
+    def _register_calculations_many(cls, kwargs_list: list[dict]):
+        """
+        The same as calling `_register_calculation` for each entry of
+        `kwargs_list`, but new calculations are saved with a single bulk insert.
+        Runs that are already registered are left as-is.
+
+        Note, unlike `_register_calculation`, start/finish times are not
+        handled here because this is only used when submitting new runs.
+        """
+
+        # check which runs are registered already in a single query
+        run_ids = [kwargs["run_id"] for kwargs in kwargs_list]
+        existing_ids = set(
+            cls.database_table.objects.filter(run_id__in=run_ids).values_list(
+                "run_id", flat=True
+            )
+        )
+
+        calculations = []
+        for kwargs in kwargs_list:
+            if kwargs["run_id"] in existing_ids:
+                continue
+            register_kwargs = cls._get_registration_kwargs(**kwargs)
+            register_kwargs.pop("started_at", None)
+            calculations.append(
+                cls.database_table.from_toolkit(
+                    computer_system=platform.node(),
+                    workflow_name=cls.name_full,
+                    workflow_version=cls.version,
+                    **register_kwargs,
+                )
+            )
+        cls.database_table.objects.bulk_create(calculations)
+
+    @classmethod
+    def _get_registration_kwargs(cls, **kwargs) -> dict:
+        """
+        Gives the kwargs used to create this workflow's database entry from
+        the full input parameters (which should be deserialized and cleaned).
+        """
+
         # grab the registration kwargs from the parameters provided and then
         # convert them to a python object format for the database method
         register_kwargs = {
@@ -940,6 +1062,9 @@ class Workflow:
             add_defaults=False, **register_kwargs
         )
 
+        # the run_id is always used to register
+        register_kwargs_cleaned["run_id"] = kwargs.get("run_id", None)
+
         # as an extra, the start time is always registered for ALL calc if given
         if "started_at" in kwargs.keys():
             register_kwargs_cleaned["started_at"] = kwargs["started_at"]
@@ -955,21 +1080,9 @@ class Workflow:
         # SPECIAL CASE: for customized workflows we need to convert the inputs
         # back to json before saving to the database.
         if "workflow_base" in register_kwargs_cleaned:
-            parameters_serialized = cls._serialize_parameters(**register_kwargs_cleaned)
-            calculation = cls.database_table.from_run_context(
-                workflow_name=cls.name_full,
-                workflow_version=cls.version,
-                **parameters_serialized,
-            )
-        else:
-            # load/create the calculation for this workflow run
-            calculation = cls.database_table.from_run_context(
-                workflow_name=cls.name_full,
-                workflow_version=cls.version,
-                **register_kwargs_cleaned,
-            )
+            return cls._serialize_parameters(**register_kwargs_cleaned)
 
-        return calculation
+        return register_kwargs_cleaned
 
     # -------------------------------------------------------------------------
     # Methods that hanlde serialization and deserialization of input parameters.
@@ -997,55 +1110,19 @@ class Workflow:
         run_prefect_cloud() method.
         """
 
-        # TODO: consider moving this into prefect's core code as a contribution.
-        # This alternatively might be a pydantic contribution
-
-        # Because many flows allow object-type inputs (such as structure object),
-        # we need to serialize these inputs before scheduling them with prefect
-        # cloud. To do this, I only check for two potential methods:
-        #     as_dict
-        #     to_dict
-        # These were chosen based on common pymatgen methods, but I may change
-        # this in the future. As another alternative, I could also cloudpickle
-        # input objects when they are not JSON serializable.
-        # OPTIMIZE: Prefect current tries to JSON serialize within their
-        # client.create_flow_run method. In the future, we may want to move
-        # this functionality there.
-
+        # Values are serialized based on their type (e.g. Structure objects
+        # use `as_dict`). See the `serialization` module for the full list
+        # and for how to register new types.
         parameters_serialized = {}
         for parameter_key, parameter_value in parameters.items():
-
-            try:
-                json.dumps(parameter_value)
-            except TypeError:
-
-                # Special cases
-                if parameter_key == "directory":
-                    # convert Path to str
-                    parameter_value = str(parameter_value)
-                elif parameter_key == "source" and isinstance(parameter_value, dict):
-                    # recursive call to this function
-                    parameter_value = cls._serialize_parameters(**parameter_value)
-                elif parameter_key == "composition":
-                    # convert Composition to str
-                    parameter_value = str(parameter_value)
-
-                # preferred serializiation
-                elif hasattr(parameter_value, "as_dict"):
-                    parameter_value = parameter_value.as_dict()
-                elif hasattr(parameter_value, "to_dict"):
-                    parameter_value = parameter_value.to_dict()
-
-                # workflow_base and input_parameters are special cases that
-                # may require a refactor (for customized workflows)
-                elif parameter_key == "workflow_base":
-                    parameter_value = parameter_value.name_full
-                elif parameter_key == "input_parameters":
-                    # recursive call to this function
-                    parameter_value = cls._serialize_parameters(**parameter_value)
-
-                else:
-                    parameter_value = cloudpickle.dumps(parameter_value)
+            # workflow_base is a special case that may require a refactor
+            # (for customized workflows)
+            if parameter_key == "workflow_base" and not isinstance(
+                parameter_value, str
+            ):
+                parameter_value = parameter_value.name_full
+            else:
+                parameter_value = serialize_parameter(parameter_value)
             parameters_serialized[parameter_key] = parameter_value
         return parameters_serialized
 
@@ -1059,9 +1136,6 @@ class Workflow:
         converts all parameters to appropriate python objects
         """
 
-        from simmate.toolkit import Composition, Structure
-        from simmate.toolkit.diffusion import MigrationHop, MigrationImages
-
         parameters_cleaned = parameters.copy()
 
         #######
@@ -1092,24 +1166,14 @@ class Workflow:
             cls._update_with_defaults(parameters_cleaned)
 
         # The remaining checks look to intialize input to toolkit objects using
-        # the from_dynamic methods.
-        # OPTIMIZE: if I have proper typing and parameter itrospection, I could
-        # potentially grab the from_dynamic method on the fly -- rather than
-        # doing these repeated steps here.
-        parameter_mappings = {
-            "structure": Structure,
-            "composition": Composition,
-            "migration_hop": MigrationHop,
-            "migration_images": MigrationImages,
-            "supercell_start": Structure,
-            "supercell_end": Structure,
-        }
-
-        for parameter, target_class in parameter_mappings.items():
-            if parameter in parameters.keys():
-                parameter_orig = parameters.get(parameter, None)
-                parameters_cleaned[parameter] = target_class.from_dynamic(
-                    parameter_orig
+        # the from_dynamic methods (see `serialization.PARAMETER_CLASSES`).
+        # Any inputs that point to the database are loaded up front, using a
+        # single query for each table.
+        with parameter_cache():
+            prefetch_database_entries(parameters)
+            for parameter, parameter_orig in parameters.items():
+                parameters_cleaned[parameter] = deserialize_parameter(
+                    parameter, parameter_orig
                 )
 
         # directory and source are two extra parameters that cant be used in the
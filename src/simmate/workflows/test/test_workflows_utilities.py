@@ -4,6 +4,7 @@ import pytest
 
 from simmate.conftest import copy_test_files
 from simmate.workflow_engine import Workflow
+from simmate.workflows import utilities
 from simmate.workflows.utilities import (
     get_all_workflow_names,
     get_all_workflow_types,
@@ -11,6 +12,7 @@ from simmate.workflows.utilities import (
     get_unique_parameters,
     get_workflow,
     get_workflow_names_by_type,
+    get_workflow_registry,
     load_results_from_directories,
 )
 
@@ -132,6 +134,55 @@ def test_get_workflow():
     assert get_workflow("static-energy.vasp.matproj") == workflow
 
 
+def test_workflow_registry(tmp_path, mocker):
+
+    mocker.patch.object(utilities, "WORKFLOW_REGISTRY_DIRECTORY", tmp_path)
+    mocker.patch.dict(utilities._workflow_registries, clear=True)
+    spy = mocker.spy(utilities, "_iter_app_workflows")
+
+    # the first call builds and saves the manifest
+    registry = get_workflow_registry()
+    assert spy.call_count == 1
+    assert len(list(tmp_path.iterdir())) == 1
+    assert registry["static-energy.vasp.matproj"] == {
+        "module": "simmate.calculators.vasp.workflows",
+        "attribute": "StaticEnergy__Vasp__Matproj",
+        "name_type": "static-energy",
+        "name_calculator": "vasp",
+        "name_preset": "matproj",
+        "use_database": True,
+    }
+
+    # a new session loads the saved manifest without importing any apps
+    utilities._workflow_registries.clear()
+    saved_registry = get_workflow_registry()
+    assert saved_registry == registry
+    assert get_workflow("static-energy.vasp.matproj").name_full == (
+        "static-energy.vasp.matproj"
+    )
+    assert spy.call_count == 1
+
+    # a stale entry is rebuilt before giving up
+    saved_registry["static-energy.vasp.matproj"]["attribute"] = "NotAWorkflow"
+    assert get_workflow("static-energy.vasp.matproj").name_full == (
+        "static-energy.vasp.matproj"
+    )
+    assert spy.call_count == 2
+
+    # a different list of apps gives a separate manifest
+    get_workflow_registry(["simmate.calculators.bader.apps.BaderConfig"])
+    assert len(list(tmp_path.iterdir())) == 2
+
+    # editing an app's workflows gives a new manifest
+    stamp = utilities._get_workflow_files_stamp(utilities.SIMMATE_APPS)
+    stamp[0][-1] += 1
+    mocker.patch.object(utilities, "_get_workflow_files_stamp", return_value=stamp)
+    utilities._workflow_registries.clear()
+    get_workflow_registry()
+    assert spy.call_count == 4
+    assert len(list(tmp_path.iterdir())) == 3
+
+
 # This is for the test below on custom workflows
 WORKFLOW_SCRIPT = """
 from simmate.workflow_engine import Workflow
@@ -232,6 +283,7 @@ def test_get_unique_paramters():
         "validator_kwargs",
         "validator_name",
         "variable_range",
+        "warm_start",
         "workflow_base",
         "write_summary_files",
     ]
@@ -6,36 +6,46 @@ functions for grabbing all available workflows as well as dynamically loading
 a workflow using its name.
 """
 
+import hashlib
 import importlib
+import importlib.util
+import json
 import logging
+import os
 import shutil
 import sys
+import tempfile
 from inspect import getmembers, isclass
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 import yaml
 
 from simmate.configuration.django.settings import SIMMATE_APPS
 from simmate.utilities import get_directory, make_archive
-from simmate.workflow_engine import Workflow
 
+# Importing the workflow engine sets up django and loads every database table,
+# which takes several seconds. Workflow is only used for type hints here, so
+# we avoid that import. This lets commands like `simmate workflows list-all`
+# run from the registry alone.
+if TYPE_CHECKING:
+    from simmate.workflow_engine import Workflow
 
-def get_all_workflows(
-    apps_to_search: list[str] = SIMMATE_APPS,
-    as_dict: bool = False,
-) -> list[Workflow]:
+
+def _iter_app_workflows(apps_to_search: list[str]):
     """
-    Goes through a list of apps and grabs all workflow objects available.
-    By default, this will grab all installed SIMMATE_APPs
+    Goes through a list of apps and yields `(module_name, attribute_name, workflow)`
+    for every workflow object available. This is the slow part of loading
+    workflows because it imports every app's workflows module.
     """
-    app_workflows = []
     for app_name in apps_to_search:
         # modulename is by cutting off the "apps.AppConfig" part of the config
         # path. For example, "simmate.calculators.vasp.apps.VaspConfig" would
         # give an app_modulename of "simmate.calculators.vasp"
         app_modulename = ".".join(app_name.split(".")[:-2])
+        module_name = f"{app_modulename}.workflows"
         try:
-            app_module = importlib.import_module(f"{app_modulename}.workflows")
+            app_module = importlib.import_module(module_name)
         except Exception as error:
             logging.critical(
                 f"Failed to load workflows from {app_name}. Did you make sure "
@@ -51,15 +61,34 @@ def get_all_workflows(
         if hasattr(app_module, "__all__"):
             for workflow_name in app_module.__all__:
                 workflow = getattr(app_module, workflow_name)
-                if workflow not in app_workflows:
-                    app_workflows.append(workflow)
+                yield module_name, workflow_name, workflow
 
         # otherwise we load ALL class objects from the module -- assuming the
         # user properly limited these to just Workflow objects.
         else:
             # a tuple is returned by getmembers so c[0] is the string name while
             # c[1] is the python class object.
-            app_workflows += [c[1] for c in getmembers(app_module) if isclass(c[1])]
+            for attribute_name, workflow in getmembers(app_module):
+                if isclass(workflow):
+                    yield module_name, attribute_name, workflow
+
+
+def get_all_workflows(
+    apps_to_search: list[str] = SIMMATE_APPS,
+    as_dict: bool = False,
+) -> list["Workflow"]:
+    """
+    Goes through a list of apps and grabs all workflow objects available.
+    By default, this will grab all installed SIMMATE_APPs
+
+    Note, this imports every app's workflows. If you only need workflow names
+    or a single workflow, `get_workflow_registry` and `get_workflow` are
+    much faster.
+    """
+    app_workflows = []
+    for _, _, workflow in _iter_app_workflows(apps_to_search):
+        if workflow not in app_workflows:
+            app_workflows.append(workflow)
 
     return (
         app_workflows
@@ -68,11 +97,158 @@ def get_all_workflows(
     )
 
 
+WORKFLOW_REGISTRY_DIRECTORY: Path = Path.home() / "simmate" / "workflow_registry"
+"""
+Where workflow registry manifests are saved (see `get_workflow_registry`).
+Set to None to keep the registry in memory only.
+"""
+
+# registries that have already been loaded in this python session
+_workflow_registries: dict[str, dict] = {}
+
+
+def get_workflow_registry(
+    apps_to_search: list[str] = SIMMATE_APPS,
+    rebuild: bool = False,
+) -> dict[str, dict]:
+    """
+    Gives a manifest of all available workflows, where each workflow name
+    maps to where it can be imported from and its metadata. For example:
+    ``` python
+    {
+        "static-energy.vasp.matproj": {
+            "module": "simmate.calculators.vasp.workflows",
+            "attribute": "StaticEnergy__Vasp__Matproj",
+            "name_type": "static-energy",
+            "name_calculator": "vasp",
+            "name_preset": "matproj",
+            "use_database": True,
+        },
+        ...
+    }
+    ```
+
+    Building this requires importing every app's workflows, so the result is
+    saved to `WORKFLOW_REGISTRY_DIRECTORY` and reused by later python sessions
+    (e.g. each call to the `simmate` command). The saved manifest is specific
+    to the installed simmate version, the list of apps, and the location and
+    last-modified time of each app's workflows files, so it is rebuilt
+    automatically when any of these change. To force a rebuild from the
+    command line, use `simmate workflows list-all --rebuild`.
+
+    #### Parameters
+
+    - `apps_to_search`:
+        The apps to find workflows in. Defaults to all installed SIMMATE_APPS
+
+    - `rebuild`:
+        Whether to ignore any saved manifest and import every app again.
+        This is useful when you are editing the workflows of an app.
+        The default is False.
+    """
+
+    # The manifest changes when the apps, their workflow files, or the simmate
+    # version change.
+    import simmate
+
+    registry_key = hashlib.sha256(
+        json.dumps(
+            [
+                simmate.__version__,
+                list(apps_to_search),
+                _get_workflow_files_stamp(apps_to_search),
+            ]
+        ).encode()
+    ).hexdigest()
+
+    if registry_key in _workflow_registries and not rebuild:
+        return _workflow_registries[registry_key]
+
+    filename = (
+        Path(WORKFLOW_REGISTRY_DIRECTORY) / f"{registry_key}.json"
+        if WORKFLOW_REGISTRY_DIRECTORY
+        else None
+    )
+
+    # try loading a manifest saved by a previous session
+    registry = None
+    if filename and filename.exists() and not rebuild:
+        try:
+            with filename.open() as file:
+                registry = json.load(file)
+        except Exception:
+            # a corrupt file is simply rebuilt below
+            logging.warning(f"Failed to read workflow registry at {filename}")
+
+    if registry is None:
+        registry = {}
+        for module_name, attribute_name, workflow in _iter_app_workflows(
+            apps_to_search
+        ):
+            registry[workflow.name_full] = dict(
+                module=module_name,
+                attribute=attribute_name,
+                name_type=workflow.name_type,
+                name_calculator=workflow.name_calculator,
+                name_preset=workflow.name_preset,
+                use_database=workflow.use_database,
+            )
+
+        if filename:
+            # write to a temporary file and then move it into place. This keeps
+            # other processes from ever reading a partially-written file.
+            filename.parent.mkdir(parents=True, exist_ok=True)
+            file_descriptor, temp_filename = tempfile.mkstemp(dir=filename.parent)
+            with os.fdopen(file_descriptor, "w") as file:
+                json.dump(registry, file)
+            os.replace(temp_filename, filename)
+
+    _workflow_registries[registry_key] = registry
+    return registry
+
+
+def _get_workflow_files_stamp(apps_to_search: list[str]) -> list:
+    """
+    Gives the path, number of python files, and latest modified time for each
+    app's workflows module. This lets us detect when workflows are added or
+    edited (e.g. in an editable install or a user's custom app) without
+    importing any of the modules.
+    """
+    stamp = []
+    for app_name in apps_to_search:
+        app_modulename = ".".join(app_name.split(".")[:-2])
+        module_name = f"{app_modulename}.workflows"
+        try:
+            spec = importlib.util.find_spec(module_name)
+        except (ImportError, ValueError):
+            spec = None
+        if not spec or not spec.origin or not Path(spec.origin).exists():
+            # errors for missing modules are raised when building the registry
+            stamp.append([module_name, None])
+            continue
+
+        # for packages, any file in the package can define workflows
+        origin = Path(spec.origin)
+        filenames = (
+            list(origin.parent.rglob("*.py"))
+            if spec.submodule_search_locations
+            else [origin]
+        )
+        stamp.append(
+            [
+                str(origin),
+                len(filenames),
+                max(filename.stat().st_mtime for filename in filenames),
+            ]
+        )
+    return stamp
+
+
 def get_all_workflow_names(apps_to_search: list[str] = SIMMATE_APPS) -> list[str]:
     """
     Returns a list of all the workflows of all types.
     """
-    flow_names = [flow.name_full for flow in get_all_workflows(apps_to_search)]
+    flow_names = list(get_workflow_registry(apps_to_search).keys())
     flow_names.sort()
     return flow_names
 
@@ -87,9 +263,9 @@ def get_all_workflow_types() -> list[str]:
     """
     workflow_types = []
 
-    for flow in get_all_workflows():
-        if flow.name_type not in workflow_types:
-            workflow_types.append(flow.name_type)
+    for flow in get_workflow_registry().values():
+        if flow["name_type"] not in workflow_types:
+            workflow_types.append(flow["name_type"])
 
     workflow_types.sort()
 
@@ -114,9 +290,12 @@ def get_calculators_by_type(
             )
 
     calculator_names = []
-    for flow in get_all_workflows():
-        if flow.name_type == flow_type and flow.name_calculator not in calculator_names:
-            calculator_names.append(flow.name_calculator)
+    for flow in get_workflow_registry().values():
+        if (
+            flow["name_type"] == flow_type
+            and flow["name_calculator"] not in calculator_names
+        ):
+            calculator_names.append(flow["name_calculator"])
 
     calculator_names.sort()
     return calculator_names
@@ -145,20 +324,20 @@ def get_workflow_names_by_type(
 
     workflow_names = []
 
-    for flow in get_all_workflows():
+    for name_full, flow in get_workflow_registry().items():
 
-        if flow.name_type != flow_type:
+        if flow["name_type"] != flow_type:
             continue
-        if calculator_name and flow.name_calculator != calculator_name:
+        if calculator_name and flow["name_calculator"] != calculator_name:
             continue  # Skip those that don't match
 
-        if remove_no_database_flows and not flow.use_database:
+        if remove_no_database_flows and not flow["use_database"]:
             continue
 
         if full_name:
-            workflow_name = flow.name_full
+            workflow_name = name_full
         else:
-            workflow_name = flow.name_preset
+            workflow_name = flow["name_preset"]
 
         workflow_names.append(workflow_name)
 
@@ -166,7 +345,23 @@ def get_workflow_names_by_type(
     return workflow_names
 
 
-def get_workflow(workflow_name: str) -> Workflow:
+def _load_workflow_from_registry(registry: dict, workflow_name: str) -> "Workflow":
+    # Only the module for this workflow's app is imported. Gives None if the
+    # workflow can't be found where the registry says it is.
+    entry = registry.get(workflow_name, None)
+    if not entry:
+        return None
+    try:
+        module = importlib.import_module(entry["module"])
+    except ModuleNotFoundError:
+        return None
+    workflow = getattr(module, entry["attribute"], None)
+    if workflow is None or getattr(workflow, "name_full", None) != workflow_name:
+        return None
+    return workflow
+
+
+def get_workflow(workflow_name: str) -> "Workflow":
     """
     This is a utility for that grabs a workflow from the simmate workflows.
 
@@ -225,9 +420,18 @@ def get_workflow(workflow_name: str) -> Workflow:
 
         return workflow
 
-    # otherwise the app should be registered and available in the SIMMATE_APPS
-    workflow_dict = get_all_workflows(as_dict=True)
-    workflow = workflow_dict.get(workflow_name, None)
+    # otherwise the app should be registered and available in the SIMMATE_APPS.
+    # We use the registry so that we only import the app this workflow
+    # belongs to.
+    workflow = _load_workflow_from_registry(get_workflow_registry(), workflow_name)
+
+    # The saved registry can be out of date if an app's workflows were edited
+    # (e.g. a workflow was added or renamed), so we rebuild it before giving up.
+    if not workflow:
+        workflow = _load_workflow_from_registry(
+            get_workflow_registry(rebuild=True),
+            workflow_name,
+        )
 
     # make sure we have a proper workflow name provided and were able to load
     # it successfully